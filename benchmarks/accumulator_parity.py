@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Check the streaming FlightAccumulator against the batch compute_advanced_metrics().
+
+Synthetic flights (with missing voltage/GPS/attitude values) are fed to the accumulator
+in random-size batches, and its finalize() output is compared with the batch metrics
+within the tolerances documented in src/services/flight_accumulator.py.
+Exits with status 1 on any mismatch.
+
+    python3 -m benchmarks.accumulator_parity --flights 50
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.services.flight_accumulator import FlightAccumulator, compare_metrics, rows_to_columns
+from src.services.flight_service import compute_advanced_metrics
+from src.services.telemetry_storage import PACKET_FIELDS
+
+
+def synthetic_rows(rng: np.random.Generator, n: int) -> list[tuple]:
+    t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    steps = rng.integers(5_000, 40_000, size=n).cumsum()   # 25–200 Hz jitter, in µs
+    throttle = np.clip(0.5 + 0.4 * np.sin(np.arange(n) / 50) + rng.normal(0, 0.05, n), 0, 1)
+
+    def maybe(value, p_missing):
+        return None if rng.random() < p_missing else float(value)
+
+    return [
+        (
+            t0 + timedelta(microseconds=int(steps[i])),
+            float(throttle[i]),
+            maybe(16.8 - i * 1e-4, 0.05),                  # voltage
+            maybe(10 + 40 * throttle[i], 0.05),            # current
+            None if rng.random() < 0.05 else i,            # mah_drawn
+            maybe(45.0 + i * 1e-5, 0.1),                   # latitude
+            maybe(7.0 + i * 1e-5, 0.1),                    # longitude
+            100.0, None, None, None,                       # altitude, vx, vy, vz
+            maybe(rng.normal(0, 30), 0.02),                # roll
+            maybe(rng.normal(0, 30), 0.02),                # pitch
+            maybe(rng.normal(0, 90), 0.02),                # yaw
+            -60,
+            {},
+        )
+        for i in range(n)
+    ]
+
+
+def batch_frame(rows: list[tuple]) -> pd.DataFrame:
+    """Same defaults as the flight-end loader"""
+    records = [dict(zip(PACKET_FIELDS, r)) for r in rows]
+    return pd.DataFrame([
+        {
+            "ts": r["ts"],
+            "throttle": r["throttle"] or 0.0,
+            "voltage": r["voltage"],
+            "current": r["current"] or 0.0,
+            "mah_drawn": r["mah_drawn"] or 0,
+            "roll": r["roll"] or 0.0,
+            "pitch": r["pitch"] or 0.0,
+            "yaw": r["yaw"] or 0.0,
+            "vx": r["vx"] or 0.0,
+            "vy": r["vy"] or 0.0,
+            "vz": r["vz"] or 0.0,
+            "latitude": r["latitude"],
+            "longitude": r["longitude"],
+        } for r in records
+    ])
+
+
+def main(n_flights: int, max_len: int, seed: int) -> int:
+    rng = np.random.default_rng(seed)
+    failures = 0
+    batch_time = stream_time = 0.0
+
+    for flight in range(n_flights):
+        rows = synthetic_rows(rng, int(rng.integers(2, max_len)))
+
+        start = time.perf_counter()
+        expected = compute_advanced_metrics(batch_frame(rows))
+        batch_time += time.perf_counter() - start
+
+        # Feed the accumulator in random-size batches, round-tripping its state like Redis does
+        state = FlightAccumulator().dumps()
+        i = 0
+        while i < len(rows):
+            size = int(rng.integers(1, 500))
+            accumulator = FlightAccumulator.loads(state)
+            accumulator.update(rows_to_columns(rows[i:i + size], PACKET_FIELDS))
+            state = accumulator.dumps()
+            i += size
+
+        start = time.perf_counter()
+        streamed = FlightAccumulator.loads(state).finalize()
+        stream_time += time.perf_counter() - start
+
+        mismatches = compare_metrics(streamed, expected)
+        if mismatches:
+            failures += 1
+            print(f"flight {flight} ({len(rows)} rows):")
+            for line in mismatches:
+                print(f"    {line}")
+
+    print(f"{n_flights - failures}/{n_flights} flights within tolerance")
+    print(f"end-of-flight cost: batch {batch_time / n_flights * 1e3:.2f} ms, finalize {stream_time / n_flights * 1e3:.2f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=50)
+    parser.add_argument("--max-len", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(main(args.flights, args.max_len, args.seed))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Benchmark the NumPy analytics kernel against the previous DataFrame implementation.
+
+For each synthetic flight size it reports wall time and tracemalloc peak of both
+implementations and checks that they return identical metrics.
+
+    python3 -m benchmarks.bench_analytics_kernel --sizes 1000 10000 100000 1000000 10000000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.services.analytics_kernel import compute_flight_metrics
+
+
+def legacy_compute_advanced_metrics(df: pd.DataFrame) -> dict:
+    """Reference: the DataFrame implementation the kernel replaced (mutates df)"""
+    if df.empty:
+        return {}
+
+    df["ts_sec"] = (df["ts"] - df["ts"].min()).dt.total_seconds()
+
+    metrics = {}
+
+    # === Energy & Power ===
+    if "voltage" in df.columns and "current" in df.columns and df[["voltage", "current"]].notna().all(axis=1).any():
+        df["power_w"] = df["voltage"] * df["current"]
+        metrics["peak_power_w"] = float(df["power_w"].max())
+        metrics["average_power_w"] = float(df["power_w"].mean())
+        # Integrated energy from power curve (more accurate than mah_drawn)
+        dt = df["ts"].diff().dt.total_seconds().fillna(0)
+        metrics["total_wh"] = float((df["power_w"] * dt / 3600).sum())
+        metrics["total_mah_from_power"] = metrics["total_wh"] * 1000 / df["voltage"].mean() if df["voltage"].mean() > 0 else None
+
+    if df["mah_drawn"].notna().any():
+        metrics["total_mah"] = int(df["mah_drawn"].max() - df["mah_drawn"].min())
+
+    metrics["min_voltage"] = float(df["voltage"].min()) if df["voltage"].notna().any() else None
+
+    # === Stability ===
+    for axis in ["roll", "pitch", "yaw"]:
+        if axis in df.columns and df[axis].notna().any():
+            metrics[f"{axis}_std_dev"] = float(df[axis].std())
+            metrics[f"{axis}_max_rate"] = float(df[axis].abs().max())
+
+    # === Throttle Smoothness (lower = smoother pilot) ===
+    df["throttle_change"] = df["throttle"].diff().abs()
+    metrics["throttle_jerk_score"] = float(df["throttle_change"].mean())  # lower = better
+    metrics["average_throttle"] = float(df["throttle"].mean())
+
+    # === Aggressiveness / Pilot Fingerprint ===
+    metrics["throttle_90th_percentile"] = float(np.percentile(df["throttle"], 90))
+    time_above_80 = len(df[df["throttle"] > 0.8]) / len(df) * 100
+    metrics["percent_time_full_throttle"] = float(time_above_80)
+
+    # === Efficiency (if GPS present) ===
+    if df[["latitude", "longitude"]].notna().all(axis=1).any():
+        R = 6371000  # Earth radius in meters
+
+        lat1 = df["latitude"].shift(1)
+        lon1 = df["longitude"].shift(1)
+        lat2 = df["latitude"]
+        lon2 = df["longitude"]
+
+        dlat = np.radians(lat2 - lat1)
+        dlon = np.radians(lon2 - lon1)
+        a = np.sin(dlat/2)**2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dlon/2)**2
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+        df["segment_dist_m"] = R * c
+        total_distance_km = df["segment_dist_m"].sum() / 1000
+
+        if total_distance_km > 0.01 and metrics.get("total_wh"):
+            metrics["wh_per_km"] = round(metrics["total_wh"] / total_distance_km, 3)
+            metrics["total_distance_km"] = round(total_distance_km, 3)
+
+    # === Freestyle vs Racing Score (heuristic) ===
+    high_g_force_proxy = (df[["roll", "pitch"]].abs() > 45).any(axis=1).mean()
+    metrics["freestyle_score"] = round(high_g_force_proxy * 100, 1)  # higher = more acrobatic
+
+    metrics["flight_duration_s"] = int(df["ts_sec"].max())
+
+    return metrics
+
+
+def synthetic_columns(n: int, seed: int = 0) -> dict[str, np.ndarray]:
+    """A 50 Hz flight with a few missing voltage/GPS samples"""
+    rng = np.random.default_rng(seed)
+    ts_us = 1_735_689_600_000_000 + np.arange(n, dtype=np.int64) * 20_000 + rng.integers(0, 500, n)
+    throttle = np.clip(0.5 + 0.4 * np.sin(np.arange(n) / 500) + rng.normal(0, 0.05, n), 0, 1)
+    voltage = 16.8 - np.arange(n) * (4.0 / n)
+    voltage[rng.random(n) < 0.01] = np.nan
+    latitude = 45.0 + np.cumsum(rng.normal(0, 1e-5, n))
+    longitude = 7.0 + np.cumsum(rng.normal(0, 1e-5, n))
+    latitude[rng.random(n) < 0.01] = np.nan
+    return {
+        "ts_us": ts_us,
+        "throttle": throttle,
+        "voltage": voltage,
+        "current": 5 + 60 * throttle,
+        "mah_drawn": np.floor(np.arange(n) * 0.05),
+        "roll": rng.normal(0, 30, n),
+        "pitch": rng.normal(0, 30, n),
+        "yaw": rng.normal(0, 90, n),
+        "latitude": latitude,
+        "longitude": longitude,
+    }
+
+
+def columns_frame(columns: dict[str, np.ndarray]) -> pd.DataFrame:
+    data = {"ts": pd.to_datetime(columns["ts_us"], unit="us", utc=True)}
+    data.update((name, values) for name, values in columns.items() if name != "ts_us")
+    return pd.DataFrame(data)
+
+
+def measure(fn, arg) -> tuple[dict, float, float]:
+    start = time.perf_counter()
+    result = fn(arg)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def same(a: dict, b: dict) -> bool:
+    if a.keys() != b.keys():
+        return False
+    return all(a[k] == b[k] or (a[k] != a[k] and b[k] != b[k]) for k in a)
+
+
+def main(sizes: list[int]) -> int:
+    print(f"{'samples':>10} | {'dataframe ms':>12} {'peak MiB':>9} | {'kernel ms':>10} {'peak MiB':>9} | identical")
+    ok = True
+    for n in sizes:
+        columns = synthetic_columns(n)
+        # The legacy implementation adds columns to its input: give it a fresh frame each run
+        legacy, legacy_s, legacy_peak = measure(lambda c: legacy_compute_advanced_metrics(columns_frame(c)), columns)
+        kernel, kernel_s, kernel_peak = measure(compute_flight_metrics, columns)
+        identical = same(legacy, kernel)
+        ok &= identical
+        print(
+            f"{n:>10,} | {legacy_s * 1e3:>12.1f} {legacy_peak / 2**20:>9.1f} | "
+            f"{kernel_s * 1e3:>10.1f} {kernel_peak / 2**20:>9.1f} | {identical}"
+        )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+    sys.exit(main(args.sizes))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Storage size and scan speed of one flight: telemetry_raw row store vs its Parquet archive.
+
+Seeds a flight into the last (still empty) daily partition created ahead, measures that
+partition (heap + indexes), archives the flight to a temporary directory, then loads
+the analytics columns both ways.
+Needs the PostgreSQL from docker-compose and the tables from `python3 -m src.db.init_db`.
+The default size is a 30-minute flight at 50 Hz.
+
+    python3 -m benchmarks.bench_archive --rows 90000
+"""
+import argparse
+import asyncio
+import math
+import secrets
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import delete, text
+
+from src.core.config import settings
+from src.db.partitions import partition_name, today
+from src.db.session import AsyncSessionLocal
+from src.db.models.drone import Drone
+from src.db.models.flight import Flight
+from src.services.flight_archive import archive_flight, read_flight_archive
+from src.services.flight_loader import load_flight_columns
+from src.services.telemetry_storage import insert_telemetry
+
+
+async def partition_size(partition: str) -> tuple[int, int]:
+    """(rows, bytes of heap + indexes) of one telemetry partition"""
+    async with AsyncSessionLocal() as db:
+        rows = await db.scalar(text(f"SELECT count(*) FROM {partition}"))
+        size = await db.scalar(text(f"SELECT pg_total_relation_size('{partition}')"))
+    return rows, size
+
+
+async def timed_load(flight_id, repeat: int) -> tuple[float, dict]:
+    best = math.inf
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            columns = await load_flight_columns(db, flight_id)
+            best = min(best, time.perf_counter() - start)
+    return best, columns
+
+
+async def main(n_rows: int, repeat: int) -> None:
+    # A partition of its own, so its size is the flight's size
+    day = today() + timedelta(days=settings.TELEMETRY_PARTITION_DAYS_AHEAD)
+    partition = partition_name(day)
+    rows_before, _ = await partition_size(partition)
+    if rows_before:
+        raise SystemExit(f"{partition} is not empty, run `python3 -m src.db.partitions` first")
+    t0 = datetime.combine(day, datetime.min.time(), timezone.utc)
+    async with AsyncSessionLocal() as db:
+        drone = Drone(name="bench-archive", api_key=secrets.token_urlsafe(32))
+        db.add(drone)
+        await db.flush()
+        flight = Flight(drone_id=drone.id, start_ts=t0, end_ts=t0 + timedelta(milliseconds=20 * n_rows))
+        db.add(flight)
+        await db.flush()
+
+        rng = np.random.default_rng(0)
+        rows = [
+            (t0 + timedelta(milliseconds=20 * i), round(float(rng.uniform(0.2, 0.9)), 3), 16.8 - i * 1e-5,
+             20.0 + float(rng.normal(0, 2)), i // 10, 45.0 + i * 1e-6, 7.0 + i * 1e-6, 100.0 + float(rng.normal(0, 1)),
+             1.5, -0.5, 0.1, float(rng.normal(0, 20)), float(rng.normal(0, 20)), float(i % 360), -60, {})
+            for i in range(n_rows)
+        ]
+        for i in range(0, n_rows, 10_000):
+            chunk = rows[i:i + 10_000]
+            await insert_telemetry(db, drone.id, chunk, [flight.id] * len(chunk))
+        await db.commit()
+        del rows
+    _, row_store = await partition_size(partition)
+
+    try:
+        pg_time, pg_columns = await timed_load(flight.id, repeat)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            async with AsyncSessionLocal() as db:
+                start = time.perf_counter()
+                uri = await archive_flight(db, flight.id, base_uri=archive_dir, delete_raw=False)
+                archive_time = time.perf_counter() - start
+            parquet = sum(p.stat().st_size for p in Path(archive_dir).rglob("*.parquet"))
+
+            parquet_time, parquet_columns = await timed_load(flight.id, repeat)
+            for name, values in pg_columns.items():
+                assert np.array_equal(values, parquet_columns[name], equal_nan=True), f"{name} differs"
+
+            start = time.perf_counter()
+            table = read_flight_archive(uri)
+            full_read = time.perf_counter() - start
+
+        print(f"{n_rows:,} rows")
+        print(f"  telemetry_raw: {row_store / 2**20:7.2f} MiB  ({row_store / n_rows:6.1f} B/row, heap + indexes)")
+        print(f"  parquet:       {parquet / 2**20:7.2f} MiB  ({parquet / n_rows:6.1f} B/row, {row_store / parquet:4.1f}x smaller)")
+        print(f"  archive write: {archive_time * 1e3:7.1f} ms")
+        print(f"  load analytics columns, postgres: {pg_time * 1e3:7.1f} ms  ({n_rows / pg_time:,.0f} rows/s)")
+        print(f"  load analytics columns, parquet:  {parquet_time * 1e3:7.1f} ms  ({n_rows / parquet_time:,.0f} rows/s)")
+        print(f"  read every column, parquet:       {full_read * 1e3:7.1f} ms  ({table.num_rows / full_read:,.0f} rows/s)")
+    finally:
+        async with AsyncSessionLocal() as db:
+            # The partition held only this flight: TRUNCATE leaves no dead tuples behind
+            await db.execute(text(f"TRUNCATE {partition}"))
+            await db.execute(delete(Flight).where(Flight.drone_id == drone.id))
+            await db.execute(delete(Drone).where(Drone.id == drone.id))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=90_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
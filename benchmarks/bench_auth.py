@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Per-request API key authentication overhead: one DB query per request (legacy)
+vs the two-tier cache (in-process LRU hit, Redis hit).
+
+Needs the PostgreSQL and Redis from docker-compose and the tables from `python3 -m src.db.init_db`.
+
+    python3 -m benchmarks.bench_auth --drones 100 --requests 5000
+"""
+import argparse
+import asyncio
+import random
+import secrets
+import statistics
+import time
+from types import SimpleNamespace
+
+from redis.asyncio import Redis
+from sqlalchemy import delete, select
+
+from src.core.auth_cache import ApiKeyCache
+from src.core.config import settings
+from src.core.security import get_current_drone
+from src.db.session import AsyncSessionLocal
+from src.db.models.drone import Drone
+
+
+async def legacy_auth(request, api_key, db):
+    result = await db.execute(select(Drone).where(Drone.api_key == api_key))
+    return result.scalar_one_or_none()
+
+
+async def run(name, auth, request, keys, before=None) -> None:
+    latencies = []
+    for api_key in keys:
+        if before:
+            before()
+        # One session per request, as get_db does
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            drone = await auth(request, api_key, db)
+            latencies.append(time.perf_counter() - start)
+        assert drone is not None
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:>12}: mean {statistics.fmean(latencies) * 1e6:8.1f} µs"
+        f"  p50 {latencies[len(latencies) // 2] * 1e6:8.1f} µs  p99 {p99 * 1e6:8.1f} µs"
+    )
+
+
+async def main(n_drones: int, n_requests: int) -> None:
+    redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    cache = ApiKeyCache(redis)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(auth_cache=cache)))
+
+    drones = [Drone(name=f"bench-auth-{i}", api_key=secrets.token_urlsafe(32)) for i in range(n_drones)]
+    async with AsyncSessionLocal() as db:
+        db.add_all(drones)
+        await db.commit()
+    keys = [random.choice(drones).api_key for _ in range(n_requests)]
+
+    try:
+        await run("db", legacy_auth, request, keys)
+        # Fill Redis once, then time Redis hits (local tier cleared) and local hits
+        await run("cache fill", get_current_drone, request, [d.api_key for d in drones])
+        await run("redis hit", get_current_drone, request, keys, before=cache._local.clear)
+        await run("local hit", get_current_drone, request, keys)
+    finally:
+        for drone in drones:
+            await cache.invalidate(drone.api_key)
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Drone).where(Drone.id.in_([d.id for d in drones])))
+            await db.commit()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drones", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.drones, args.requests))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Memory of the streaming flight export (GET /v1/flights/{id}) along a long flight.
+
+Seeds one flight (1M rows by default, ~5.5 h at 50 Hz), then drains the export
+encoders the endpoint streams, from telemetry_raw and from the Parquet archive.
+Python heap (tracemalloc) and Arrow memory are sampled every ~10 % of the rows:
+both stay at one page whatever the number of rows already sent. Exits with status 1
+when the last sample is above the first by more than --max-growth-mib.
+Needs the PostgreSQL from docker-compose and the tables from `python3 -m src.db.init_db`.
+
+    python3 -m benchmarks.bench_export --rows 1000000 --formats ndjson csv arrow --max-growth-mib 8
+"""
+import argparse
+import asyncio
+import secrets
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+from sqlalchemy import delete, select
+
+from src.db.session import AsyncSessionLocal
+from src.db.models.drone import Drone
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.services.flight_archive import archive_flight
+from src.services.flight_export import EXPORT_FORMATS, flight_batches
+from src.services.telemetry_storage import insert_telemetry
+
+
+SEED_CHUNK_ROWS = 50_000
+
+
+async def seed_flight(n_rows: int) -> tuple[Drone, Flight]:
+    t0 = datetime.now(timezone.utc) - timedelta(milliseconds=20 * n_rows)
+    async with AsyncSessionLocal() as db:
+        drone = Drone(name="bench-export", api_key=secrets.token_urlsafe(32))
+        db.add(drone)
+        await db.flush()
+        flight = Flight(
+            drone_id=drone.id, start_ts=t0, end_ts=t0 + timedelta(milliseconds=20 * n_rows),
+            computed_metrics={"peak_power_w": 900.0},
+        )
+        db.add(flight)
+        await db.flush()
+        for lo in range(0, n_rows, SEED_CHUNK_ROWS):
+            rows = [
+                (t0 + timedelta(milliseconds=20 * i), 0.5, 16.8 - i * 1e-6, 20.0, i // 50, 45.0 + i * 1e-7,
+                 7.0 + i * 1e-7, 100.0, 1.5, -0.5, 0.1, float(i % 90), float(i % 60), float(i % 360), -60, {"seq": i})
+                for i in range(lo, min(lo + SEED_CHUNK_ROWS, n_rows))
+            ]
+            await insert_telemetry(db, drone.id, rows, [flight.id] * len(rows))
+        await db.commit()
+    return drone, flight
+
+
+async def drain(name: str, encoder, flight: Flight, n_rows: int, max_growth_mib: float) -> bool:
+    """Consume the export like the socket would, sampling memory on the way.
+
+    Returns:
+        bool: memory stayed flat (last sample within max_growth_mib of the first)
+    """
+    rows_read = 0
+
+    async def counted():
+        nonlocal rows_read
+        async for batch in flight_batches(flight):
+            rows_read += batch.num_rows
+            yield batch
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte = None
+    sent = 0
+    samples = []
+    every = max(n_rows // 10, 1)
+    next_sample = every
+    async for chunk in encoder(flight, counted()):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        sent += len(chunk)
+        # Every chunk holds the page just read: sample once it is encoded
+        if rows_read >= next_sample:
+            _, peak = tracemalloc.get_traced_memory()
+            samples.append((rows_read, peak, pa.total_allocated_bytes()))
+            tracemalloc.reset_peak()
+            next_sample += every
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"{name}: {sent / 2**20:,.1f} MiB in {elapsed:.1f} s ({n_rows / elapsed:,.0f} rows/s), first byte after {first_byte * 1e3:.1f} ms")
+    for rows, peak, arrow in samples:
+        print(f"    {rows:>10,} rows sent  python peak {peak / 2**20:6.1f} MiB  arrow {arrow / 2**20:6.1f} MiB")
+    if len(samples) < 2:
+        return True
+
+    (_, first_peak, first_arrow), (_, last_peak, last_arrow) = samples[0], samples[-1]
+    growth_mib = max(last_peak - first_peak, last_arrow - first_arrow) / 2**20
+    if growth_mib > max_growth_mib:
+        print(f"    FAIL: memory grew {growth_mib:.1f} MiB between the first and the last sample (max {max_growth_mib} MiB)")
+        return False
+    return True
+
+
+async def main(n_rows: int, formats: list[str], max_growth_mib: float) -> bool:
+    drone, flight = await seed_flight(n_rows)
+    flat = True
+    try:
+        async with AsyncSessionLocal() as db:
+            flight = (await db.execute(select(Flight).where(Flight.id == flight.id))).scalar_one()
+        for name in formats:
+            flat &= await drain(f"{name} (telemetry_raw)", EXPORT_FORMATS[name][2], flight, n_rows, max_growth_mib)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            async with AsyncSessionLocal() as db:
+                await archive_flight(db, flight.id, base_uri=archive_dir, delete_raw=False)
+            async with AsyncSessionLocal() as db:
+                flight = (await db.execute(select(Flight).where(Flight.id == flight.id))).scalar_one()
+            for name in formats:
+                flat &= await drain(f"{name} (parquet archive)", EXPORT_FORMATS[name][2], flight, n_rows, max_growth_mib)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(TelemetryRaw).where(TelemetryRaw.drone_id == drone.id))
+            await db.execute(delete(Flight).where(Flight.drone_id == drone.id))
+            await db.execute(delete(Drone).where(Drone.id == drone.id))
+            await db.commit()
+    return flat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", choices=list(EXPORT_FORMATS), default=list(EXPORT_FORMATS))
+    parser.add_argument("--max-growth-mib", type=float, default=8, help="allowed memory growth, first → last sample")
+    args = parser.parse_args()
+    if not asyncio.run(main(args.rows, args.formats, args.max_growth_mib)):
+        sys.exit(1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Latency and peak Python memory of loading one flight for analytics:
+ORM rows → list of dicts → DataFrame (legacy) vs columnar projection → NumPy arrays.
+
+Needs the PostgreSQL from docker-compose and the tables from `python3 -m src.db.init_db`.
+The default size is a 30-minute flight at 50 Hz.
+
+    python3 -m benchmarks.bench_flight_loader --rows 90000
+"""
+import argparse
+import asyncio
+import secrets
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import delete, select
+
+from src.db.session import AsyncSessionLocal
+from src.db.models.drone import Drone
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.services.flight_loader import load_flight_columns
+from src.services.analytics_kernel import compute_flight_metrics
+from src.services.flight_service import compute_advanced_metrics
+from src.services.telemetry_storage import insert_telemetry
+
+
+async def legacy_load(db, flight_id) -> pd.DataFrame:
+    result = await db.execute(
+        select(TelemetryRaw).where(TelemetryRaw.flight_id == flight_id).order_by(TelemetryRaw.ts)
+    )
+    rows = result.scalars().all()
+    return pd.DataFrame([
+        {
+            "ts": row.ts,
+            "throttle": row.throttle or 0.0,
+            "voltage": row.voltage,
+            "current": row.current or 0.0,
+            "mah_drawn": row.mah_drawn or 0,
+            "roll": row.roll or 0.0,
+            "pitch": row.pitch or 0.0,
+            "yaw": row.yaw or 0.0,
+            "vx": row.vx or 0.0,
+            "vy": row.vy or 0.0,
+            "vz": row.vz or 0.0,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+        } for row in rows
+    ])
+
+
+async def columnar_load(db, flight_id) -> dict:
+    return await load_flight_columns(db, flight_id)
+
+
+async def measure(name, load, flight_id, n_rows):
+    # Timed run first, then a traced run (tracemalloc itself slows allocation down)
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        loaded = await load(db, flight_id)
+        elapsed = time.perf_counter() - start
+    async with AsyncSessionLocal() as db:
+        tracemalloc.start()
+        await load(db, flight_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{name:>9}: {elapsed * 1e3:8.1f} ms  peak {peak / 2**20:7.1f} MiB  ({n_rows / elapsed:,.0f} rows/s)")
+    return loaded
+
+
+async def main(n_rows: int) -> None:
+    t0 = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        drone = Drone(name="bench-loader", api_key=secrets.token_urlsafe(32))
+        db.add(drone)
+        await db.flush()
+        flight = Flight(drone_id=drone.id, start_ts=t0)
+        db.add(flight)
+        await db.flush()
+
+        rows = [
+            (t0 + timedelta(milliseconds=20 * i), 0.5, 16.0 - i * 1e-5, 20.0, i, 45.0 + i * 1e-6,
+             7.0 + i * 1e-6, 100.0, None, None, None, float(i % 90), None, 3.0, -60, {})
+            for i in range(n_rows)
+        ]
+        for i in range(0, n_rows, 10_000):
+            chunk = rows[i:i + 10_000]
+            await insert_telemetry(db, drone.id, chunk, [flight.id] * len(chunk))
+        await db.commit()
+        del rows
+
+    try:
+        legacy = await measure("orm", legacy_load, flight.id, n_rows)
+        columnar = await measure("columnar", columnar_load, flight.id, n_rows)
+        assert compute_advanced_metrics(legacy) == compute_flight_metrics(columnar), "metrics differ"
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(TelemetryRaw).where(TelemetryRaw.drone_id == drone.id))
+            await db.execute(delete(Flight).where(Flight.drone_id == drone.id))
+            await db.execute(delete(Drone).where(Drone.id == drone.id))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=90_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
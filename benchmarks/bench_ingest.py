@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare telemetry_raw write throughput: multi-row INSERT vs binary COPY (both ON CONFLICT DO NOTHING),
+then the cost of a fully retransmitted stream that PostgreSQL skips.
+
+Needs the PostgreSQL from docker-compose and the tables from `python3 -m src.db.init_db`.
+
+    python3 -m benchmarks.bench_ingest --batches 200 --batch-size 500
+"""
+import argparse
+import asyncio
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete
+
+from src.db.session import AsyncSessionLocal
+from src.db.models.drone import Drone
+from src.db.models.telemetry import TelemetryRaw
+from src.schemas.telemetry import TelemetryIngestRequest
+from src.services.telemetry_storage import add_telemetry, copy_telemetry, packet_rows
+
+
+def make_batch(start: datetime, size: int) -> list[TelemetryIngestRequest]:
+    return [
+        TelemetryIngestRequest(
+            ts=start + timedelta(milliseconds=20 * i),
+            throttle=(i % 100) / 100,
+            voltage=16.8 - i * 1e-4,
+            current=20.0 + (i % 7),
+            mah_drawn=i,
+            latitude=45.0 + i * 1e-6,
+            longitude=7.0 + i * 1e-6,
+            altitude=100.0,
+            roll=(i % 90) - 45.0,
+            pitch=(i % 60) - 30.0,
+            yaw=float(i % 360),
+            rssi=-60,
+        )
+        for i in range(size)
+    ]
+
+
+async def run(write, drone_id, batches: list[list[tuple]]) -> float:
+    start = time.perf_counter()
+    for rows in batches:
+        async with AsyncSessionLocal() as db:
+            await write(db, drone_id, rows)
+            await db.commit()
+    return time.perf_counter() - start
+
+
+async def main(n_batches: int, batch_size: int) -> None:
+    # One drone per run: the same rows for the same drone would be skipped as duplicates
+    async with AsyncSessionLocal() as db:
+        drones = [Drone(name="bench-ingest", api_key=secrets.token_urlsafe(32)) for _ in range(2)]
+        db.add_all(drones)
+        await db.commit()
+
+    t0 = datetime.now(timezone.utc)
+    batches = [
+        packet_rows(make_batch(t0 + timedelta(seconds=b * batch_size), batch_size))
+        for b in range(n_batches)
+    ]
+    total = n_batches * batch_size
+
+    try:
+        for drone, (name, write) in zip(drones, (("insert", add_telemetry), ("copy", copy_telemetry))):
+            elapsed = await run(write, drone.id, batches)
+            print(f"{name:>22}: {total} rows in {elapsed:.2f}s → {total / elapsed:,.0f} rows/s")
+        elapsed = await run(copy_telemetry, drones[1].id, batches)
+        print(f"{'copy, all duplicates':>22}: {total} rows in {elapsed:.2f}s → {total / elapsed:,.0f} rows/s")
+    finally:
+        async with AsyncSessionLocal() as db:
+            for drone in drones:
+                await db.execute(delete(TelemetryRaw).where(TelemetryRaw.drone_id == drone.id))
+                await db.execute(delete(Drone).where(Drone.id == drone.id))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.batches, args.batch_size))
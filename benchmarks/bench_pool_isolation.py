@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Ingest write latency while bulk analytics reads run: one shared connection pool (the former
+single engine) vs the separate ingest / analytics pools of src/db/session.py.
+
+Writers COPY a telemetry batch every --interval-ms each, timed from the session request
+(pool wait included) to the commit. Readers scan a --rows flight in a loop, through the
+ingest pool ("shared") or the analytics pool ("split"); "idle" runs the writers alone.
+Pool sizes come from DB_POOLS in config.yaml: the default 16 readers exceed both the
+analytics pool (queued there) and, next to the writers, the ingest pool.
+
+Needs the PostgreSQL from docker-compose and the tables from `python3 -m src.db.init_db`.
+
+    python3 -m benchmarks.bench_pool_isolation --writers 8 --readers 16 --duration 10
+"""
+import argparse
+import asyncio
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from src.db.session import AnalyticsSessionLocal, AsyncSessionLocal, analytics_engine, engine
+from src.db.models.drone import Drone
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.services.telemetry_storage import copy_telemetry, insert_telemetry
+
+
+def telemetry_row(ts: datetime, i: int) -> tuple:
+    return (ts, 0.5, 16.0 - i * 1e-5, 20.0, i, 45.0 + i * 1e-6,
+            7.0 + i * 1e-6, 100.0, None, None, None, float(i % 90), None, 3.0, -60, {})
+
+
+async def writer(drone_id, t0: datetime, batch_size: int, interval_s: float, stop: float, latencies: list, errors: list) -> None:
+    n = 0
+    while time.perf_counter() < stop:
+        rows = [telemetry_row(t0 + timedelta(milliseconds=20 * (n + i)), n + i) for i in range(batch_size)]
+        n += batch_size
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await copy_telemetry(db, drone_id, rows)
+                await db.commit()
+            latencies.append(time.perf_counter() - start)
+        except PoolTimeout:
+            errors.append(time.perf_counter() - start)
+        await asyncio.sleep(max(0.0, interval_s - (time.perf_counter() - start)))
+
+
+async def reader(session_factory, flight_id, stop: float, loads: list) -> None:
+    # Aggregate scan of the whole flight: the connection is held while PostgreSQL reads every row
+    query = (
+        select(func.count(), func.avg(TelemetryRaw.current), func.max(TelemetryRaw.voltage),
+               func.percentile_cont(0.95).within_group(TelemetryRaw.current))
+        .where(TelemetryRaw.flight_id == flight_id)
+    )
+    while time.perf_counter() < stop:
+        async with session_factory() as db:
+            await db.execute(query)
+        loads.append(1)
+
+
+async def sample_pools(stop: float, peaks: dict) -> None:
+    while time.perf_counter() < stop:
+        for name, e in (("ingest", engine), ("analytics", analytics_engine)):
+            peaks[name] = max(peaks.get(name, 0), e.sync_engine.pool.checkedout())
+        await asyncio.sleep(0.01)
+
+
+def pct(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+async def run(name, session_factory, writer_drones, flight_id, args) -> None:
+    stop = time.perf_counter() + args.duration
+    latencies, errors, loads, peaks = [], [], [], {}
+    t0 = datetime.now(timezone.utc)
+    tasks = [
+        writer(drone_id, t0, args.batch_size, args.interval_ms / 1000, stop, latencies, errors)
+        for drone_id in writer_drones
+    ]
+    if session_factory is not None:
+        tasks += [reader(session_factory, flight_id, stop, loads) for _ in range(args.readers)]
+    await asyncio.gather(sample_pools(stop, peaks), *tasks)
+
+    latencies.sort()
+    print(
+        f"{name:>7}: ingest p50 {pct(latencies, 0.5) * 1e3:7.1f} ms  p99 {pct(latencies, 0.99) * 1e3:7.1f} ms"
+        f"  max {(latencies[-1] if latencies else float('nan')) * 1e3:7.1f} ms  pool timeouts {len(errors):>3}"
+        f"  | {len(loads):>4} flight scans  | peak in use: ingest {peaks.get('ingest', 0)}, analytics {peaks.get('analytics', 0)}"
+    )
+
+
+async def main(args) -> None:
+    t0 = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        drones = [Drone(name="bench-pools", api_key=secrets.token_urlsafe(32)) for _ in range(1 + 3 * args.writers)]
+        db.add_all(drones)
+        await db.flush()
+        flight = Flight(drone_id=drones[0].id, start_ts=t0)
+        db.add(flight)
+        await db.flush()
+        for i in range(0, args.rows, 10_000):
+            chunk = [telemetry_row(t0 + timedelta(milliseconds=20 * j), j) for j in range(i, min(i + 10_000, args.rows))]
+            await insert_telemetry(db, drones[0].id, chunk, [flight.id] * len(chunk))
+        await db.commit()
+
+    try:
+        # Fresh writer drones per scenario: the same rows for the same drone would be duplicates
+        for k, (name, session_factory) in enumerate((
+            ("idle", None),
+            ("shared", AsyncSessionLocal),
+            ("split", AnalyticsSessionLocal),
+        )):
+            writer_drones = [d.id for d in drones[1 + k * args.writers:1 + (k + 1) * args.writers]]
+            await run(name, session_factory, writer_drones, flight.id, args)
+    finally:
+        async with AsyncSessionLocal() as db:
+            for drone in drones:
+                await db.execute(delete(TelemetryRaw).where(TelemetryRaw.drone_id == drone.id))
+            await db.execute(delete(Flight).where(Flight.id == flight.id))
+            await db.execute(delete(Drone).where(Drone.id.in_([d.id for d in drones])))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=90_000, help="rows of the scanned flight")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Startup time and resident memory of one API process per ROLE (and of a worker), before any request.
+
+Each run is a fresh interpreter: wall time from spawn to `src.main` imported (app built,
+routers mounted), RSS right after, and which of the heavy libraries got loaded. No
+database or Redis connection is opened (they start in the app lifespan).
+
+    python3 -m benchmarks.bench_roles --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from src.api.v1.api import ROLE_ROUTERS
+
+
+HEAVY_MODULES = ("numpy", "pyarrow", "pandas")
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+rss_kib = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(json.dumps({{"import_s": imported, "rss_mib": rss_kib / 1024, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, role: str | None) -> dict:
+    env = {**os.environ, "ROLE": role} if role else dict(os.environ)
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(module=module, heavy=HEAVY_MODULES)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["wall_s"] = time.perf_counter() - start
+    return result
+
+
+def main(runs: int) -> None:
+    targets = [(f"api ROLE={role}", "src.main", role) for role in ROLE_ROUTERS] + [("worker", "src.worker", None)]
+    for name, module, role in targets:
+        results = [measure(module, role) for _ in range(runs)]
+        print(
+            f"{name:>18}: startup {statistics.median(r['wall_s'] for r in results) * 1e3:7.0f} ms"
+            f" (imports {statistics.median(r['import_s'] for r in results) * 1e3:5.0f} ms)"
+            f"  RSS {statistics.median(r['rss_mib'] for r in results):6.1f} MiB"
+            f"  loads {', '.join(results[0]['heavy']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per role (median reported)")
+    args = parser.parse_args()
+    main(args.runs)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Bandwidth and CPU per packet: JSON + pydantic vs the binary wire format (application/x-telemetry-v1).
+
+Measures what the API does with a request body before the DB write: parse + validate,
+then build the row tuples handed to ingest_rows(). No services needed.
+
+    python3 -m benchmarks.bench_wire_format --batch-size 500 --repeat 200
+"""
+import argparse
+import gzip
+import time
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from src.schemas.telemetry import TelemetryBatch
+from src.services.telemetry_storage import packet_rows
+from src.services.wire_format import decode_records, encode_packets, records_to_rows
+
+
+def make_packets(size: int) -> list[dict]:
+    t0 = datetime.now(timezone.utc).replace(microsecond=0)
+    return [
+        {
+            "ts": t0 + timedelta(milliseconds=20 * i),
+            "throttle": round((i % 100) / 100, 2),
+            "voltage": round(16.8 - i * 1e-3, 3),
+            "current": round(20.0 + (i % 7) * 0.1, 1),
+            "mah_drawn": i,
+            "latitude": 45.0 + i * 1e-6,
+            "longitude": 7.0 + i * 1e-6,
+            "altitude": 100.0,
+            "vx": 1.5,
+            "vy": -0.5,
+            "vz": 0.1,
+            "roll": round((i % 90) - 45.0, 1),
+            "pitch": round((i % 60) - 30.0, 1),
+            "yaw": float(i % 360),
+            "rssi": -60,
+        }
+        for i in range(size)
+    ]
+
+
+def timed(decode, body: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decode(body)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(batch_size: int, repeat: int) -> None:
+    packets = make_packets(batch_size)
+    json_body = orjson.dumps(packets)
+    binary_body = encode_packets(packets)
+
+    formats = {
+        "json": (json_body, lambda body: packet_rows(TelemetryBatch.validate_json(body))),
+        "binary": (binary_body, lambda body: records_to_rows(decode_records(body))),
+    }
+    print(f"{batch_size} packets per batch")
+    for name, (body, decode) in formats.items():
+        per_batch = timed(decode, body, repeat)
+        print(
+            f"{name:>7}: {len(body) / batch_size:6.1f} B/packet ({len(gzip.compress(body)) / batch_size:5.1f} gzipped)"
+            f"  {per_batch / batch_size * 1e6:6.2f} µs/packet  ({batch_size / per_batch:,.0f} packets/s per core)"
+        )
+    # Decode + range checks only, for consumers that stay columnar
+    per_batch = timed(decode_records, binary_body, repeat)
+    print(f"{'records':>7}: {'':>32}  {per_batch / batch_size * 1e6:6.2f} µs/packet (decode + validate, no rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.batch_size, args.repeat)
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Drone fleet load generator: how many drones one node sustains.
+
+Every simulated drone flies on a loop: it idles on the ground, takes off (throttle above
+HIGH_THROTTLE_THRESHOLD), cruises along a circular GPS track while its battery sags
+under load, lands, and idles for more than IDLE_TIMEOUT_SECONDS so that the server
+closes the flight and the workers compute its metrics. Each drone sends its packets
+every --batch-ms at --rate-hz, through one of the ingest paths:
+
+    http    POST /v1/telemetry, JSON
+    wire    POST /v1/telemetry, binary records (application/x-telemetry-v1)
+    ws      /v1/telemetry/ws, one JSON text frame per batch, latency = until the ack
+
+Reported every --report-s and at the end: packets stored/s against the offered rate,
+p50/p99 batch latency, flight close → metrics stored latency (flights table, polled),
+and the database / Redis calls per 1000 packets.
+
+By default the API, one worker and Redis (fakeredis) run inside this process, behind a
+real uvicorn socket; only PostgreSQL is needed (`python3 -m src.db.init_db`). Calls are
+counted exactly from the SQLAlchemy / Redis client spans (tracing adds a few % of CPU).
+Against a running node (docker-compose services, `uvicorn`, `python3 -m src.worker`)
+pass its URL: calls are then the server-side counters (pg_stat_database transactions,
+Redis total_commands_processed) of DATABASE_URL / REDIS_URL.
+
+    python3 -m benchmarks.loadgen --drones 20 --rate-hz 50 --batch-ms 200 --duration 120
+    python3 -m benchmarks.loadgen --target http://127.0.0.1:8000 --transport wire --drones 200
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import numpy as np
+import orjson
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import settings
+from src.db.models.flight import Flight
+from src.services.flight_detection import HIGH_THROTTLE_THRESHOLD, IDLE_TIMEOUT_SECONDS
+from src.services.wire_format import CONTENT_TYPE as WIRE_CONTENT_TYPE, encode_packets
+
+
+METRICS_POLL_S = 0.25
+EARTH_M_PER_DEG = 111_320.0
+BATTERY_MAH = 5000
+CELLS = 4
+
+
+# === Flight profile ===
+
+@dataclass
+class DroneSim:
+    """One drone's telemetry, generated in real time: ground → takeoff → cruise → landing → ground..."""
+    rate_hz: float
+    flight_s: float
+    ground_s: float
+    seed: int
+    t: float = 0.0                            # seconds since the drone started
+    ts0: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    mah: float = 0.0
+    last_high_t: float | None = None
+    flight_starts: list[float] = field(default_factory=list)
+
+    def __post_init__(self):
+        rng = random.Random(self.seed)
+        self.rng = np.random.default_rng(self.seed)
+        self.flight_s *= rng.uniform(0.7, 1.3)
+        self.ground_s *= rng.uniform(1.0, 1.3)
+        self.phase_offset = rng.uniform(0, self.ground_s)
+        self.home = (45.0 + rng.uniform(-0.5, 0.5), 7.0 + rng.uniform(-0.5, 0.5))
+        self.radius_m = rng.uniform(50, 300)
+        self.speed_ms = rng.uniform(8, 20)
+        self.cruise_alt = rng.uniform(30, 100)
+        self.in_flight = False
+
+    def throttle_at(self, t: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Throttle + seconds into the current flight (-1 on the ground) of each sample"""
+        cycle = self.ground_s + self.flight_s
+        u = (t + self.phase_offset) % cycle - self.ground_s      # < 0: on the ground
+        airborne = u >= 0
+        ramp = np.clip(np.minimum(u, self.flight_s - u) / 3.0, 0.0, 1.0)   # 3 s takeoff / landing
+        cruise = 0.45 + 0.15 * np.sin(u / 7.0) + 0.08 * self.rng.standard_normal(t.size)
+        punch = (np.sin(u * 1.3) > 0.97) * 0.3
+        air = np.clip(0.15 + ramp * (cruise + punch - 0.15), 0.12, 1.0)
+        ground = np.clip(0.03 + 0.01 * self.rng.standard_normal(t.size), 0.0, 0.06)
+        return np.where(airborne, air, ground), np.where(airborne, u, -1.0)
+
+    def packets(self, n: int) -> tuple[list[dict], int]:
+        """Next n packets, and how many flights the server will close on them"""
+        dt = 1 / self.rate_hz
+        t = self.t + dt * np.arange(n)
+        self.t += dt * n
+        throttle, u = self.throttle_at(t)
+
+        # Battery: 4S pack, open-circuit voltage falls with the charge drawn, sags under current
+        current = 1.5 + 55 * throttle ** 1.5 + 0.5 * self.rng.standard_normal(n)
+        mah = self.mah + np.cumsum(current) * dt / 3.6
+        self.mah = float(mah[-1])
+        if self.mah > 0.8 * BATTERY_MAH and u[-1] < 0:
+            self.mah = 0.0    # battery swapped on the ground
+        soc = np.clip(1 - mah / BATTERY_MAH, 0, 1)
+        voltage = CELLS * (3.5 + 0.7 * soc) - current * 0.012 * CELLS
+
+        # Circular track around home, altitude following the takeoff / landing ramp
+        angle = np.maximum(u, 0) * self.speed_ms / self.radius_m
+        north = self.radius_m * (np.cos(angle) - 1)
+        east = self.radius_m * np.sin(angle)
+        lat = self.home[0] + north / EARTH_M_PER_DEG
+        lon = self.home[1] + east / (EARTH_M_PER_DEG * math.cos(math.radians(self.home[0])))
+        alt = np.where(u >= 0, np.clip(np.minimum(u, self.flight_s - u) / 5.0, 0, 1) * self.cruise_alt, 0.0)
+        vx = np.where(u >= 0, -self.speed_ms * np.sin(angle), 0.0)
+        vy = np.where(u >= 0, self.speed_ms * np.cos(angle), 0.0)
+        attitude = 5 + 20 * throttle
+        roll = attitude * self.rng.standard_normal(n)
+        pitch = attitude * self.rng.standard_normal(n)
+        yaw = np.degrees(angle) % 360
+
+        closes = 0
+        for i in range(n):
+            # Mirror of the server's detection: count the packets that end a flight
+            if throttle[i] > HIGH_THROTTLE_THRESHOLD:
+                if not self.in_flight:
+                    self.in_flight = True
+                self.last_high_t = t[i]
+            elif self.in_flight and t[i] - self.last_high_t >= IDLE_TIMEOUT_SECONDS:
+                self.in_flight = False
+                closes += 1
+
+        ts = [self.ts0 + timedelta(seconds=float(x)) for x in t]
+        packets = [
+            {
+                "ts": ts[i], "throttle": round(float(throttle[i]), 4), "voltage": round(float(voltage[i]), 3),
+                "current": round(float(current[i]), 2), "mah_drawn": int(mah[i]),
+                "latitude": float(lat[i]), "longitude": float(lon[i]), "altitude": round(float(alt[i]), 2),
+                "vx": round(float(vx[i]), 2), "vy": round(float(vy[i]), 2), "vz": 0.0,
+                "roll": round(float(roll[i]), 2), "pitch": round(float(pitch[i]), 2), "yaw": round(float(yaw[i]), 2),
+                "rssi": int(-55 - 20 * self.rng.random()),
+            }
+            for i in range(n)
+        ]
+        return packets, closes
+
+
+# === Measurements ===
+
+class Stats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.window_latencies: list[float] = []
+        self.stored = 0
+        self.window_stored = 0
+        self.offered = 0
+        self.errors: Counter = Counter()
+        self.close_sent: dict[str, deque] = defaultdict(deque)   # drone → times its closing batches were acked
+        self.close_to_metrics: list[float] = []
+
+    def batch_done(self, latency: float, stored: int) -> None:
+        self.latencies.append(latency)
+        self.window_latencies.append(latency)
+        self.stored += stored
+        self.window_stored += stored
+
+
+def pct(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) * 1e3 if values else float("nan")
+
+
+class CallCounter(SpanExporter):
+    """Span exporter counting the SQL statements and Redis round trips of ingest requests and flight jobs.
+
+    Only spans inside a trace are counted: queue polling and pub/sub listeners are not load.
+    """
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+
+    def export(self, spans):
+        for span in spans:
+            if span.parent is None:
+                continue
+            scope = span.instrumentation_scope.name if span.instrumentation_scope else ""
+            if scope.endswith("sqlalchemy") and span.name != "connect":
+                self.calls["db"] += 1
+            elif scope.endswith("redis"):
+                self.calls["redis"] += 1
+        return SpanExportResult.SUCCESS
+
+    async def snapshot(self) -> Counter:
+        return Counter(self.calls)
+
+
+class ServerCounters:
+    """Calls seen by the servers themselves (remote target): PostgreSQL transactions, Redis commands"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.redis = None
+
+    async def snapshot(self) -> Counter:
+        from redis.asyncio import Redis
+
+        self.redis = self.redis or Redis.from_url(settings.REDIS_URL)
+        async with self.engine.connect() as conn:
+            xacts = await conn.scalar(text(
+                "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+            ))
+        info = await self.redis.info("stats")
+        return Counter({"db transactions": int(xacts), "redis": int(info["total_commands_processed"])})
+
+
+# === Drivers ===
+
+async def drive_http(client: httpx.AsyncClient, api_key: str, batches, stats: Stats, wire: bool) -> None:
+    headers = {"X-API-Key": api_key}
+    if wire:
+        headers["Content-Type"] = WIRE_CONTENT_TYPE
+    async for packets, closes, drone_id in batches:
+        body = encode_packets(packets) if wire else orjson.dumps(packets)
+        start = time.perf_counter()
+        try:
+            response = await client.post("/v1/telemetry/", content=body, headers=headers)
+        except httpx.HTTPError as e:
+            stats.errors[type(e).__name__] += 1
+            continue
+        if response.status_code != 201:
+            stats.errors[response.status_code] += 1
+            continue
+        stats.batch_done(time.perf_counter() - start, response.json()["ingested"])
+        for _ in range(closes):
+            stats.close_sent[drone_id].append(time.perf_counter())
+
+
+async def drive_ws(ws_url: str, api_key: str, batches, stats: Stats) -> None:
+    import websockets
+
+    async with websockets.connect(f"{ws_url}/v1/telemetry/ws", additional_headers={"X-API-Key": api_key}) as ws:
+        in_flight: deque = deque()     # (packets sent so far, send time, closes, drone)
+        sent = 0
+        stored = 0
+
+        async def read_acks():
+            nonlocal stored
+            async for message in ws:
+                ack = orjson.loads(message)
+                if ack.get("type") != "ack":
+                    stats.errors[ack.get("type", "?")] += 1
+                    continue
+                now = time.perf_counter()
+                while in_flight and in_flight[0][0] <= ack["stored"]:
+                    count, start, closes, drone_id = in_flight.popleft()
+                    stats.batch_done(now - start, count - stored)
+                    stored = count
+                    for _ in range(closes):
+                        stats.close_sent[drone_id].append(now)
+
+        reader = asyncio.create_task(read_acks())
+        async for packets, closes, drone_id in batches:
+            sent += len(packets)
+            in_flight.append((sent, time.perf_counter(), closes, drone_id))
+            await ws.send(orjson.dumps(packets).decode())
+        # Let the last acks in
+        deadline = time.perf_counter() + 5
+        while in_flight and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        reader.cancel()
+
+
+async def drone_batches(sim: DroneSim, drone_id: str, batch_s: float, start: float, end: float, stats: Stats):
+    """Batches on the drone's clock; a driver that falls behind sends late, never skips"""
+    per_batch = max(1, round(sim.rate_hz * batch_s))
+    next_at = start
+    while next_at < end:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        packets, closes = sim.packets(per_batch)
+        stats.offered += len(packets)
+        yield packets, closes, drone_id
+        next_at += batch_s
+
+
+async def poll_metrics(engine, drone_ids: list[str], stats: Stats, stop: asyncio.Event) -> None:
+    """Time from the ack of a flight's closing batch until its computed_metrics are stored"""
+    done: set = set()
+    while not stop.is_set():
+        async with engine.connect() as conn:
+            rows = (await conn.execute(
+                select(Flight.id, Flight.drone_id)
+                .where(Flight.drone_id.in_(drone_ids), Flight.metrics_version.is_not(None))
+                .order_by(Flight.start_ts)
+            )).all()
+        now = time.perf_counter()
+        for flight_id, drone_id in rows:
+            if flight_id in done:
+                continue
+            done.add(flight_id)
+            pending = stats.close_sent[str(drone_id)]
+            if pending:
+                stats.close_to_metrics.append(now - pending.popleft())
+        await asyncio.sleep(METRICS_POLL_S)
+
+
+# === In-process node ===
+
+async def poll_jobs(redis_client, executor, stop: asyncio.Event) -> None:
+    """run_worker() with a poll interval: fakeredis answers XREADGROUP BLOCK at once, the loop would spin"""
+    from src.services.job_queue import JobQueue
+    from src.worker import process
+
+    queue = JobQueue(redis_client)
+    while not stop.is_set():
+        jobs = await queue.read("loadgen", count=settings.WORKER_CONCURRENCY, block_ms=1)
+        if jobs:
+            await asyncio.gather(*(process(job, queue, redis_client, executor) for job in jobs))
+        else:
+            await asyncio.sleep(METRICS_POLL_S)
+
+
+async def start_node(counter: CallCounter | None):
+    """API (uvicorn on a free local port) + one worker + fakeredis, in this event loop"""
+    import socket
+
+    import fakeredis
+    import uvicorn
+
+    from src.core.auth_cache import ApiKeyCache
+    from src.core.tracing import setup_tracing
+    from src.services.analytics_executor import AnalyticsExecutor
+    from src.services.job_queue import JobQueue
+    from src.services.live_hub import LiveHub
+
+    if counter is not None:
+        setup_tracing("loadgen", exporter=counter)
+    from src.main import app
+
+    server = fakeredis.FakeServer()
+    redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    app.state.redis = redis
+    app.state.jobs = JobQueue(redis)
+    await app.state.jobs.ensure_group()
+    app.state.auth_cache = ApiKeyCache(redis)
+    await app.state.auth_cache.start()
+    app.state.live_hub = LiveHub(fakeredis.aioredis.FakeRedis(server=server))
+    await app.state.live_hub.start()
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    uv = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    serving = asyncio.create_task(uv.serve())
+    while not uv.started:
+        await asyncio.sleep(0.01)
+
+    executor = AnalyticsExecutor(kind="thread")
+    executor.start()
+    stop = asyncio.Event()
+    worker = asyncio.create_task(poll_jobs(redis, executor, stop))
+
+    async def shutdown():
+        stop.set()
+        await worker
+        await executor.shutdown()
+        await app.state.live_hub.stop()
+        await app.state.auth_cache.stop()
+        uv.should_exit = True
+        await serving
+
+    return f"http://127.0.0.1:{port}", shutdown
+
+
+# === Main ===
+
+async def main(args) -> None:
+    counter = CallCounter() if args.target == "inprocess" else None
+    shutdown = None
+    base_url = args.target
+    if args.target == "inprocess":
+        base_url, shutdown = await start_node(counter)
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=2)
+    counters = counter or ServerCounters(engine)
+
+    client = httpx.AsyncClient(base_url=base_url, timeout=30, limits=httpx.Limits(max_connections=args.drones))
+    drones = []
+    for i in range(args.drones):
+        drone = (await client.post("/v1/drones/", json={"name": f"loadgen-{i}"})).json()
+        drones.append((drone["id"], drone["api_key"]))
+
+    stats = Stats()
+    batch_s = args.batch_ms / 1000
+    offered_rate = args.drones * args.rate_hz
+    print(
+        f"{args.drones} drones × {args.rate_hz:g} Hz = {offered_rate:,.0f} packets/s offered, "
+        f"{max(1, round(args.rate_hz * batch_s))} packets per {args.transport} batch, {args.duration:g} s against {base_url}"
+    )
+
+    stop = asyncio.Event()
+    poller = asyncio.create_task(poll_metrics(engine, [d for d, _ in drones], stats, stop))
+    calls_before = await counters.snapshot()
+    start = time.perf_counter() + 0.5
+    end = start + args.duration
+    tasks = []
+    for i, (drone_id, api_key) in enumerate(drones):
+        sim = DroneSim(args.rate_hz, args.flight_s, args.ground_s, seed=args.seed + i)
+        # Spread the drones over one batch period
+        batches = drone_batches(sim, drone_id, batch_s, start + batch_s * i / args.drones, end, stats)
+        if args.transport == "ws":
+            ws_url = base_url.replace("http", "ws", 1)
+            tasks.append(asyncio.create_task(drive_ws(ws_url, api_key, batches, stats)))
+        else:
+            tasks.append(asyncio.create_task(drive_http(client, api_key, batches, stats, args.transport == "wire")))
+
+    async def report():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(args.report_s)
+            now = time.perf_counter()
+            lat, stats.window_latencies = stats.window_latencies, []
+            stored, stats.window_stored = stats.window_stored, 0
+            print(
+                f"[{now - start:6.1f} s] {stored / (now - last):8,.0f} packets/s  "
+                f"p50 {pct(lat, 50):6.1f} ms  p99 {pct(lat, 99):6.1f} ms  "
+                f"flights closed→metrics {len(stats.close_to_metrics)}  errors {sum(stats.errors.values())}"
+            )
+            last = now
+
+    reporter = asyncio.create_task(report())
+    await asyncio.gather(*tasks, return_exceptions=False)
+    elapsed = time.perf_counter() - start
+    # Flights closed by the last batches still get their metrics
+    await asyncio.sleep(min(args.drain_s, args.duration))
+    reporter.cancel()
+    stop.set()
+    await poller
+    calls = await counters.snapshot() - calls_before
+
+    closes = sum(len(q) for q in stats.close_sent.values()) + len(stats.close_to_metrics)
+    print(f"\n=== {args.transport}, {args.drones} drones, {elapsed:.1f} s ===")
+    print(f"packets stored     {stats.stored:,} of {stats.offered:,} offered → {stats.stored / elapsed:,.0f}/s sustained (offered {offered_rate:,.0f}/s)")
+    print(f"batch latency      p50 {pct(stats.latencies, 50):.1f} ms  p99 {pct(stats.latencies, 99):.1f} ms  max {pct(stats.latencies, 100):.1f} ms  ({len(stats.latencies):,} batches)")
+    print(f"close → metrics    p50 {pct(stats.close_to_metrics, 50):.0f} ms  p99 {pct(stats.close_to_metrics, 99):.0f} ms  ({len(stats.close_to_metrics)} of {closes} closed flights)")
+    if stats.stored:
+        print("calls              " + "  ".join(f"{name} {count:,} ({count * 1000 / stats.stored:.1f}/1k packets)" for name, count in sorted(calls.items())))
+    if stats.errors:
+        print(f"errors             {dict(stats.errors)}")
+
+    if not args.keep:
+        for drone_id, api_key in drones:
+            await client.delete(f"/v1/drones/{drone_id}", headers={"X-API-Key": api_key})
+    await client.aclose()
+    await engine.dispose()
+    if shutdown is not None:
+        await shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="inprocess", help="inprocess, or the URL of a running API")
+    parser.add_argument("--transport", choices=("http", "wire", "ws"), default="http")
+    parser.add_argument("--drones", type=int, default=20)
+    parser.add_argument("--rate-hz", type=float, default=50, help="packets per second per drone")
+    parser.add_argument("--batch-ms", type=float, default=200, help="each drone sends its packets every batch-ms")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load")
+    parser.add_argument("--flight-s", type=float, default=30, help="mean airborne time per flight")
+    parser.add_argument("--ground-s", type=float, default=IDLE_TIMEOUT_SECONDS + 5, help="mean time on the ground between flights")
+    parser.add_argument("--drain-s", type=float, default=10, help="wait for the last flights' metrics")
+    parser.add_argument("--report-s", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the drones and their data")
+    asyncio.run(main(parser.parse_args()))
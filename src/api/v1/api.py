@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
+from importlib import import_module
+
 from fastapi import APIRouter
 
-from src.api.v1.drones import router as drones_router
-from src.api.v1.telemetry import router as telemetry_router
-from src.api.v1.flight import router as flight_router
+
+# Router modules mounted by each deployable role (settings.ROLE). A module is only imported
+# when its role is served: an ingest process never loads pyarrow (flight export).
+ROLE_ROUTERS = {
+    "ingest": ("telemetry",),               # POST /telemetry, /telemetry/gateway, /telemetry/ws
+    "api": ("drones", "live"),              # drone management, live telemetry fan-out
+    "analytics": ("flight",),               # flight listing, series, export, recompute
+}
+ROLE_ROUTERS["all"] = tuple(name for names in ROLE_ROUTERS.values() for name in names)
 
 
-router = APIRouter(prefix="/v1")
+def build_router(role: str = "all") -> APIRouter:
+    if role not in ROLE_ROUTERS:
+        raise ValueError(f"Unknown ROLE {role!r}, expected one of {', '.join(ROLE_ROUTERS)}")
 
-# Include routers
-router.include_router(drones_router)
-router.include_router(telemetry_router)
-router.include_router(flight_router)
+    router = APIRouter(prefix="/v1")
+    # Include routers
+    for name in ROLE_ROUTERS[role]:
+        router.include_router(import_module(f"src.api.v1.{name}").router)
+    return router
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, status, HTTPException
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.session import get_db
 from src.db.models.drone import Drone
 from src.schemas.drone import DroneRequest, DroneResponse
 import secrets
-from src.core.security import get_current_drone
+from src.core.auth_cache import DroneIdentity
+from src.core.security import get_auth_cache, get_current_drone
+from src.services.dedup import duplicate_counts
 
 
 router = APIRouter(prefix="/drones", tags=["drones"])
@@ -46,7 +48,7 @@ Future: if you add user_id → returns all drones of that user.
 """
 @router.post("/", response_model=list[DroneResponse])
 async def get_register_drones(
-    drone: Drone = Depends(get_current_drone),  # TODO to authenticated drone
+    drone: DroneIdentity = Depends(get_current_drone),  # TODO to authenticated drone
     db: AsyncSession = Depends(get_db)
 ):
     # For now: just return the current one (clean & works)
@@ -61,7 +63,7 @@ async def get_register_drones(
 @router.post("/{drone_id}", response_model=DroneResponse)
 async def get_register_drone(
     drone_id: str,
-    current_drone: Drone = Depends(get_current_drone),  # TODO authenticated drone
+    current_drone: DroneIdentity = Depends(get_current_drone),  # TODO authenticated drone
     db: AsyncSession = Depends(get_db)
 ):
     # Convert string to UUID if needed (our id is UUID)
@@ -85,3 +87,62 @@ async def get_register_drone(
         name=current_drone.name,
         api_key=current_drone.api_key  # optional: remove in prod
     )
+
+
+def own_drone_id(drone_id: str, current_drone: DroneIdentity):
+    """Parse drone_id and check it is the authenticated drone"""
+    from uuid import UUID
+    try:
+        target_id = UUID(drone_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid drone ID format")
+    if current_drone.id != target_id:
+        raise HTTPException(status_code=403, detail="You can only access your own drone")
+    return target_id
+
+
+"""Issue a new API key; the old one stops working immediately (DB + auth cache)."""
+@router.post("/{drone_id}/rotate-key", response_model=DroneResponse)
+async def rotate_drone_key(
+    request: Request,
+    drone_id: str,
+    current_drone: DroneIdentity = Depends(get_current_drone),
+    db: AsyncSession = Depends(get_db)
+):
+    target_id = own_drone_id(drone_id, current_drone)
+
+    api_key = secrets.token_urlsafe(32)
+    await db.execute(update(Drone).where(Drone.id == target_id).values(api_key=api_key))
+    await db.commit()
+
+    # Drop the old key from every API process' cache
+    await get_auth_cache(request).invalidate(current_drone.api_key)
+
+    return DroneResponse(id=str(target_id), name=current_drone.name, api_key=api_key)
+
+
+"""Delete the drone with its flights and telemetry (ON DELETE CASCADE) and revoke its API key."""
+@router.delete("/{drone_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_drone(
+    request: Request,
+    drone_id: str,
+    current_drone: DroneIdentity = Depends(get_current_drone),
+    db: AsyncSession = Depends(get_db)
+):
+    target_id = own_drone_id(drone_id, current_drone)
+
+    await db.execute(delete(Drone).where(Drone.id == target_id))
+    await db.commit()
+
+    await get_auth_cache(request).invalidate(current_drone.api_key)
+
+
+"""Ingest counters of the drone: retransmitted rows dropped by the Redis seen-set and by the database."""
+@router.get("/{drone_id}/ingest-stats")
+async def get_ingest_stats(
+    request: Request,
+    drone_id: str,
+    current_drone: DroneIdentity = Depends(get_current_drone),
+):
+    target_id = own_drone_id(drone_id, current_drone)
+    return {"drone_id": str(target_id), "duplicates_dropped": await duplicate_counts(request.app.state.redis, target_id)}
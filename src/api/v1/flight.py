@@ -1,51 +1,189 @@
 #!/usr/bin/env python3
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+import uuid
+import base64
+from datetime import datetime, timezone
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.session import get_db
-from src.db.models.drone import Drone
-from src.core.security import get_current_drone
+from src.db.session import ReadSessionLocal, get_db, get_read_db
+from src.core.auth_cache import DroneIdentity
+from src.core.config import settings
+from src.core.security import get_current_drone, get_streaming_drone
 from src.db.models.flight import Flight
+from src.services.flight_export import EXPORT_FORMATS, flight_batches, flight_document
+from src.services.rollups import RESOLUTION_LABELS, load_series, pick_resolution, resolution_label
+
+
+router = APIRouter(prefix="/flights", tags=["flights"])
+
+# computed_metrics keys returned by the flight listing unless ?metrics= says otherwise
+LIST_METRICS = ("peak_power_w", "wh_per_km", "freestyle_score")
+
+
+def encode_cursor(start_ts: datetime, flight_id: uuid.UUID) -> str:
+    """Opaque page cursor: the (start_ts, id) of the last flight sent"""
+    return base64.urlsafe_b64encode(orjson.dumps([start_ts, str(flight_id)])).decode()
 
 
-router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        start_ts, flight_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(start_ts), uuid.UUID(flight_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
 
 
-@router.get("/", response_model=list[dict])
+"""
+Flights of the drone, newest first, one page per call.
+
+Args:
+    limit: page size
+    cursor: X-Next-Cursor of the previous page (absent on the last page)
+    metrics: comma-separated keys of computed_metrics to return, extracted in the database
+"""
+@router.get("/")
 async def list_flights(
-    drone: Drone = Depends(get_current_drone),
-    db: AsyncSession = Depends(get_db),
-    limit: int = 50,
-    offset: int = 0
+    drone: DroneIdentity = Depends(get_current_drone),
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    metrics: str = Query(",".join(LIST_METRICS), pattern=r"^(\w+(,\w+)*)?$"),
 ):
-    # Query flights
-    result = await db.execute(
-        select(Flight)
+    keys = list(dict.fromkeys(filter(None, metrics.split(","))))
+    query = (
+        select(
+            Flight.id, Flight.start_ts, Flight.end_ts, Flight.duration_s, Flight.total_mah,
+            # computed_metrics -> 'key': only the requested values leave the database
+            *(Flight.computed_metrics[key].label(f"metric_{i}") for i, key in enumerate(keys)),
+        )
         .where(Flight.drone_id == drone.id)
-        .order_by(Flight.start_ts.desc())
+        .order_by(Flight.start_ts.desc(), Flight.id.desc())
         .limit(limit)
-        .offset(offset)
     )
+    # Keyset: seek past the last flight of the previous page instead of counting OFFSET rows
+    if cursor is not None:
+        try:
+            start_ts, flight_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(Flight.start_ts, Flight.id) < tuple_(start_ts, flight_id))
 
-    flights = result.scalars().all()
+    rows = (await db.execute(query)).all()
     flights_list = [
         {
-            "id": str(f.id),
-            "start_ts": f.start_ts.isoformat(),
-            "end_ts": f.end_ts.isoformat() if f.end_ts else None,
-            "duration_s": f.duration_s,
-            "total_mah": f.total_mah,
-            "peak_power_w": f.computed_metrics.get("peak_power_w"),
-            "wh_per_km": f.computed_metrics.get("wh_per_km"),
-            "freestyle_score": f.computed_metrics.get("freestyle_score"),
-            # add more as you like
+            "id": str(row.id),
+            "start_ts": row.start_ts,
+            "end_ts": row.end_ts,
+            "duration_s": row.duration_s,
+            "total_mah": row.total_mah,
+            **{key: row[5 + i] for i, key in enumerate(keys)},
         }
-        for f in flights
+        for row in rows
     ]
 
-    return flights_list
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].start_ts, rows[-1].id)
+    return Response(content=orjson.dumps(flights_list), media_type="application/json", headers=headers)
+
 
+"""
+Time series of a flight for charts, from the precomputed rollups (min / max / mean per bucket).
 
+Args:
+    resolution: "auto" picks the finest level whose bucket count fits `max_points`,
+        or one of the levels explicitly ("1s", "10s", "1m")
+    max_points: point budget of the chart
+"""
+@router.get("/{flight_id}/series")
+async def get_flight_series(
+    flight_id: uuid.UUID,
+    resolution: str = Query("auto", pattern=f"^(auto|{'|'.join(RESOLUTION_LABELS)})$"),
+    max_points: int = Query(settings.SERIES_MAX_POINTS, ge=1, le=10000),
+    drone: DroneIdentity = Depends(get_current_drone),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Check if the flight exists and belongs to the drone
+    flight = (await db.execute(
+        select(Flight.start_ts, Flight.end_ts)
+        .where(Flight.id == flight_id, Flight.drone_id == drone.id)
+    )).first()
+    if flight is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+
+    if resolution == "auto":
+        end_ts = flight.end_ts or datetime.now(timezone.utc)
+        resolution_s = pick_resolution((end_ts - flight.start_ts).total_seconds(), max_points)
+    else:
+        resolution_s = RESOLUTION_LABELS[resolution]
 
+    series = await load_series(db, flight_id, resolution_s)
+    # Plain lists of floats: orjson straight to bytes, no jsonable_encoder pass
+    return Response(
+        content=orjson.dumps({"flight_id": flight_id, "resolution": resolution_label(resolution_s), **series}),
+        media_type="application/json",
+    )
+
+
+"""
+Full flight: metadata + analytics, streamed with all its raw telemetry.
+
+Args:
+    format: "ndjson" (flight document line, then one line per packet), "csv" (packets only)
+        or "arrow" (Arrow IPC stream, flight document in the schema metadata)
+    raw: false → only the flight document, as plain JSON
+"""
+@router.get("/{flight_id}")
+async def export_flight(
+    flight_id: uuid.UUID,
+    format: str = Query("ndjson", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    raw: bool = True,
+    drone: DroneIdentity = Depends(get_streaming_drone),
+):
+    # Check if the flight exists and belongs to the drone. Own short session: a dependency
+    # session would stay checked out (transaction open) until the client read the last byte
+    async with ReadSessionLocal() as db:
+        flight = (await db.execute(
+            select(Flight).where(Flight.id == flight_id, Flight.drone_id == drone.id)
+        )).scalar_one_or_none()
+    if flight is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+
+    if not raw:
+        return flight_document(flight)
+
+    # Rows are read page by page while streaming, never the whole flight at once
+    media_type, extension, encoder = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encoder(flight, flight_batches(flight)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="flight_{flight_id}.{extension}"'},
+    )
+
+
+"""
+Recompute the analytics of one flight from its stored telemetry (e.g. after a metric changed).
+Queued for the workers: the new computed_metrics show up once the job ran.
+"""
+@router.post("/{flight_id}/recompute", status_code=status.HTTP_202_ACCEPTED)
+async def recompute_flight(
+    flight_id: uuid.UUID,
+    request: Request,
+    drone: DroneIdentity = Depends(get_current_drone),
+    db: AsyncSession = Depends(get_db),
+):
+    # Check if the flight exists, belongs to the drone and is closed
+    flight = (await db.execute(
+        select(Flight.end_ts).where(Flight.id == flight_id, Flight.drone_id == drone.id)
+    )).first()
+    if flight is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+    if flight.end_ts is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Flight still in progress")
 
+    job_id = await request.app.state.jobs.enqueue("flight_recompute", flight_id=str(flight_id))
+    return {"flight_id": str(flight_id), "job_id": job_id, "status": "queued"}
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Live telemetry of a drone: latest packet, SSE and WebSocket push (fed by ingest through Redis pub/sub)."""
+import asyncio
+from fastapi import APIRouter, Depends, Query, Response, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.requests import HTTPConnection
+
+from src.core.auth_cache import DroneIdentity
+from src.core.config import settings
+from src.core.security import authenticate_websocket, get_current_drone, get_streaming_drone
+
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+
+
+def get_live_hub(request: HTTPConnection):
+    """Live fan-out hub created in the app lifespan"""
+    return request.app.state.live_hub
+
+
+@router.get("/live")
+async def get_live_telemetry(
+    request: Request,
+    drone: DroneIdentity = Depends(get_current_drone)
+):
+    # The cached packet is already JSON: pass the bytes through
+    data = await get_live_hub(request).latest(drone.id)
+    if not data:
+        return {"status": "no recent telemetry"}
+
+    return Response(content=data, media_type="application/json")
+
+
+"""Server-Sent Events push of the latest packet (one `data:` event per frame).
+
+Slow clients only get the newest frame, at most max_hz per second (capped by LIVE_MAX_RATE_HZ).
+"""
+@router.get("/live/stream")
+async def stream_live_telemetry(
+    request: Request,
+    max_hz: float | None = Query(None, gt=0),
+    # Not get_current_drone: its session would stay checked out for the whole subscription
+    drone: DroneIdentity = Depends(get_streaming_drone)
+):
+    hub = get_live_hub(request)
+    subscriber = await hub.subscribe(drone.id, max_hz)
+
+    async def events():
+        try:
+            async for frame in subscriber.frames(heartbeat=settings.LIVE_SSE_HEARTBEAT_S):
+                # Check if the connection went quiet: a comment line keeps proxies from closing it
+                yield b"data: " + frame + b"\n\n" if frame is not None else b": ping\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+"""WebSocket push of the latest packet: one binary frame (raw JSON bytes) per update."""
+@router.websocket("/live/ws")
+async def websocket_live_telemetry(websocket: WebSocket, max_hz: float | None = Query(None, gt=0)):
+    drone = await authenticate_websocket(websocket)
+    if not drone:
+        return
+
+    hub = get_live_hub(websocket)
+    subscriber = await hub.subscribe(drone.id, max_hz)
+
+    async def send_frames():
+        async for frame in subscriber.frames():
+            await websocket.send_bytes(frame)
+
+    async def wait_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(send_frames()), asyncio.create_task(wait_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hub.unsubscribe(subscriber)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
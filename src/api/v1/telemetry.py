@@ -1,33 +1,89 @@
 #!/usr/bin/env python3
-import json
-import orjson
-import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Request, WebSocket
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from starlette.requests import HTTPConnection
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.session import get_db
-from src.db.models.telemetry import TelemetryRaw
-from src.db.models.drone import Drone
-from src.core.security import get_current_drone
-from src.schemas.telemetry import TelemetryIngestRequest
-from src.services.flight_service import handle_flight_detection_and_analytics
+from src.core.auth_cache import DroneIdentity
+from src.core.config import settings
+from src.core.security import authenticate_many, authenticate_websocket, get_auth_cache, get_current_drone
+from src.core.tracing import stage
+from src.schemas.telemetry import GatewayIngestRequest, TelemetryBatch, TelemetryIngestRequest
+from src.services.drone_lanes import DroneBusy
+from src.services.ingest_service import ingest_gateway_rows, ingest_rows
+from src.services.stream_ingest import TelemetryStream
+from src.services.telemetry_storage import packet_rows
+from src.services.wire_format import CONTENT_TYPE as WIRE_CONTENT_TYPE, WireFormatError, decode_records, records_to_rows
 
 
 router = APIRouter(prefix="/telemetry", tags=["telemetry"])
 
 
-def get_redis(request: Request):
+def get_redis(request: HTTPConnection):
     """Safe way to get redis_client without circular imports"""
     return request.app.state.redis
 
 
-"""Load telementry to database by receiving a list of TelemetryIngestRequest,
+def get_jobs(request: HTTPConnection):
+    """Flight job queue created in the app lifespan"""
+    return request.app.state.jobs
+
+
+MAX_PACKETS_PER_REQUEST = 500
+
+# Both body formats in the OpenAPI docs (the body is parsed by hand to pick one)
+INGEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": TelemetryIngestRequest.model_json_schema()},
+            },
+            WIRE_CONTENT_TYPE: {
+                "schema": {"type": "string", "format": "binary", "description": "70-byte records, see wire_format.py"},
+            },
+        },
+    },
+}
+
+
+def parse_ingest_body(content_type: str, body: bytes) -> list[tuple]:
+    """Decode a JSON or binary (application/x-telemetry-v1) batch into rows
+
+    Raises:
+        RequestValidationError: invalid JSON packets (422, same body as FastAPI's)
+        HTTPException: invalid binary records (422)
+    """
+    if content_type == WIRE_CONTENT_TYPE:
+        try:
+            return records_to_rows(decode_records(body))
+        except WireFormatError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    try:
+        packets = TelemetryBatch.validate_json(body)
+    except ValidationError as e:
+        raise body_validation_error(e)
+    return packet_rows(packets)
+
+
+def body_validation_error(e: ValidationError) -> RequestValidationError:
+    """pydantic error of a hand-parsed body → FastAPI's 422 response"""
+    return RequestValidationError(
+        [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+    )
+
+
+"""Load telementry to database by receiving a list of TelemetryIngestRequest (JSON) or
+   a batch of binary records (Content-Type: application/x-telemetry-v1),
    and set in redis the last packet received from the drone
 
 Args:
-    packets (list[TelemetryIngestRequest]): _description_
-    drone (Drone, optional): _description_. Defaults to Depends(get_current_drone).
+    request (Request): raw body, JSON or binary depending on Content-Type
+    drone (DroneIdentity, optional): _description_. Defaults to Depends(get_current_drone).
     db (AsyncSession, optional): _description_. Defaults to Depends(get_db).
 
 Raises:
@@ -36,81 +92,113 @@ Raises:
 Returns:
     dict: ingested: [int] length of packets
 """
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", status_code=status.HTTP_201_CREATED, openapi_extra=INGEST_OPENAPI)
 async def ingest_telemetry(
     request: Request,
-    packets: list[TelemetryIngestRequest],
-    drone: Drone = Depends(get_current_drone),
+    drone: DroneIdentity = Depends(get_current_drone),
     db: AsyncSession = Depends(get_db),
-    background: BackgroundTasks = None,
 ):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    body = await request.body()
+    with stage("parse"):
+        rows = parse_ingest_body(content_type, body)
+
     # Check if there are no packets
-    if len(packets) == 0:
+    if len(rows) == 0:
         return JSONResponse({"ingested": 0})
 
     # Check if there are more than 500 packets
-    if len(packets) > 500:
-        raise HTTPException(status_code=413, detail="Max 500 packets per request")
-
-    # Create TelemetryRaw list of packets
-    db_packets = [
-        TelemetryRaw(
-            drone_id=drone.id,
-            ts=p.ts,
-            throttle=p.throttle,
-            voltage=p.voltage,
-            current=p.current,
-            mah_drawn=p.mah_drawn,
-            latitude=p.latitude,
-            longitude=p.longitude,
-            altitude=p.altitude,
-            vx=p.vx,
-            vy=p.vy,
-            vz=p.vz,
-            roll=p.roll,
-            pitch=p.pitch,
-            yaw=p.yaw,
-            rssi=p.rssi,
-            extra=p.extra,
+    if len(rows) > MAX_PACKETS_PER_REQUEST:
+        raise HTTPException(status_code=413, detail=f"Max {MAX_PACKETS_PER_REQUEST} packets per request")
+
+    # Detect flights, bulk write the batch stamped with its flight ids, update live cache
+    try:
+        closed_flights = await ingest_rows(db, get_redis(request), drone.id, rows)
+    except DroneBusy as e:
+        # Another node is stuck on this drone's previous batch: the drone resends later
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+
+    # Hand the flights this batch closed to the analytics workers (durable queue)
+    await get_jobs(request).enqueue_many("flight_closed", [{"flight_id": str(f)} for f in closed_flights])
+
+    return {"ingested": len(rows)}
+
+
+"""Ingest the packets a ground station relays for many drones, in one request.
+
+Each drone is authenticated by its own API key (cache first, one query for the misses);
+entries with an unknown key are skipped and listed in `rejected` (their index). All the
+accepted rows go through one ingest pipeline: one COPY, one commit, one Redis round trip
+for the locks and states and one for the writes and live fan-out of every drone.
+
+Body:
+    {"drones": [{"api_key": "...", "packets": [TelemetryIngestRequest, ...]}, ...]}
+
+Returns:
+    dict: ingested (total), drones (drone_id → rows), rejected (indexes of unknown keys)
+"""
+@router.post(
+    "/gateway",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": GatewayIngestRequest.model_json_schema()}}}},
+)
+async def ingest_gateway_telemetry(request: Request, db: AsyncSession = Depends(get_db)):
+    body = await request.body()
+    with stage("parse"):
+        try:
+            payload = GatewayIngestRequest.model_validate_json(body)
+        except ValidationError as e:
+            raise body_validation_error(e)
+
+    # Check the request size
+    if len(payload.drones) > settings.GATEWAY_MAX_DRONES:
+        raise HTTPException(status_code=413, detail=f"Max {settings.GATEWAY_MAX_DRONES} drones per request")
+    if sum(len(entry.packets) for entry in payload.drones) > settings.GATEWAY_MAX_PACKETS:
+        raise HTTPException(status_code=413, detail=f"Max {settings.GATEWAY_MAX_PACKETS} packets per request")
+
+    drones = await authenticate_many(get_auth_cache(request), db, [entry.api_key for entry in payload.drones])
+    if payload.drones and not drones:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API-Key",
+            headers={"WWW-Authenticate": "API-Key"},
         )
-        for p in packets
-    ]
-
-    # Add db_packets to database
-    db.add_all(db_packets)
-    await db.commit()
-
-    # Update live cache with the latest packet
-    latest_packet = packets[-1].model_dump()
-    latest_packet["drone_id"] = str(drone.id)
-    redis = get_redis(request)
-    await redis.set(
-        f"drone:{drone.id}:live",
-        orjson.dumps(latest_packet).decode(),
-        ex=60,  # expire after 60 seconds of no data
-    )
 
-    # Trigger flight session detection + analytics in background (non-blocking)
-    background.add_task(
-        handle_flight_detection_and_analytics,
-        drone.id,
-        [p.model_dump() for p in packets],   # send raw dicts (with proper ts strings)
-        request,
-    )
+    batches, rejected = {}, []
+    for i, entry in enumerate(payload.drones):
+        drone = drones.get(entry.api_key)
+        if drone is None:
+            rejected.append(i)
+            continue
+        # The same drone twice in one request: one batch
+        batches.setdefault(drone.id, []).extend(packet_rows(entry.packets))
 
-    return {"ingested": len(packets)}
+    try:
+        closed_flights = await ingest_gateway_rows(db, get_redis(request), batches)
+    except DroneBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
 
+    await get_jobs(request).enqueue_many("flight_closed", [{"flight_id": str(f)} for f in closed_flights])
 
-@router.get("/live")
-async def get_live_telemetry(
-    request: Request,
-    drone: Drone = Depends(get_current_drone)
-):
-    # Get redis instance
-    redis = get_redis(request)
+    return {
+        "ingested": sum(len(rows) for rows in batches.values()),
+        "drones": {str(drone_id): len(rows) for drone_id, rows in batches.items()},
+        "rejected": rejected,
+    }
 
-    data = await redis.get(f"drone:{drone.id}:live")
-    if not data:
-        return {"status": "no recent telemetry"}
 
-    return json.loads(data)
+"""Stream telemetry over one persistent WebSocket, authenticated once at the handshake.
+
+Send the API key as the X-API-Key header (browsers, which cannot set headers, offer the
+subprotocols ["api-key", API_KEY]), then JSON packets or arrays of packets as text frames, or
+application/x-telemetry-v1 records as binary frames. The server stores
+them in micro-batches and answers with acks, see TelemetryStream.
+"""
+@router.websocket("/ws")
+async def stream_telemetry(websocket: WebSocket):
+    drone = await authenticate_websocket(websocket)
+    if not drone:
+        return
+
+    stream = TelemetryStream(websocket, drone.id, get_redis(websocket), get_jobs(websocket))
+    await stream.run()
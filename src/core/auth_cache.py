@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import orjson
+
+from src.core.config import settings
+from src.core.metrics import AUTH_CACHE_HITS, AUTH_CACHE_MISSES
+
+
+INVALIDATION_CHANNEL = "auth:invalidate"
+# Value left by invalidate() for a revoked key: never JSON, read as a miss
+REVOKED = "revoked"
+
+
+@dataclass(frozen=True, slots=True)
+class DroneIdentity:
+    """What the handlers need from the authenticated drone (never attached to a DB session)"""
+    id: uuid.UUID
+    name: str
+    api_key: str
+
+
+def key_digest(api_key: str) -> str:
+    """API keys are never used as Redis keys or log lines, only their SHA-256"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def redis_key(digest: str) -> str:
+    return f"auth:apikey:{digest}"
+
+
+def decode_entry(data: bytes | str | None) -> dict | None:
+    """Cached {id, name}, None for a missing or revoked key"""
+    if data is None or data in (REVOKED, REVOKED.encode()):
+        return None
+    return orjson.loads(data)
+
+
+class ApiKeyCache:
+    """Two-tier API key → DroneIdentity cache.
+
+    - L1: in-process LRU (OrderedDict) with a short TTL, no I/O at all on a hit
+    - L2: Redis, shared by every API process, with a longer TTL
+    - invalidate(): replaces the Redis entry by a REVOKED tombstone and drops the key
+      from every process' L1 (pub/sub); the L1 TTL bounds staleness if an invalidation
+      message is ever missed
+    - set() is SET NX, and fills L1 only if it won: a miss that read the drone before a
+      rotation and writes it back after invalidate() finds the tombstone, not a free slot
+
+    Only positive lookups are cached, an unknown key always reaches the database.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        max_size: int = settings.AUTH_CACHE_SIZE,
+        local_ttl: float = settings.AUTH_CACHE_TTL_S,
+        redis_ttl: int = settings.AUTH_CACHE_REDIS_TTL_S,
+    ):
+        self.redis = redis_client
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._local: OrderedDict[str, tuple[float, DroneIdentity]] = OrderedDict()
+        self._listener: asyncio.Task | None = None
+
+    def _get_local(self, digest: str) -> DroneIdentity | None:
+        entry = self._local.get(digest)
+        if entry is None:
+            return None
+        expires_at, identity = entry
+        if expires_at < time.monotonic():
+            del self._local[digest]
+            return None
+        self._local.move_to_end(digest)
+        return identity
+
+    def _set_local(self, digest: str, identity: DroneIdentity) -> None:
+        self._local[digest] = (time.monotonic() + self.local_ttl, identity)
+        self._local.move_to_end(digest)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, api_key: str) -> DroneIdentity | None:
+        digest = key_digest(api_key)
+        identity = self._get_local(digest)
+        if identity is not None:
+            AUTH_CACHE_HITS.labels("local").inc()
+            return identity
+
+        cached = decode_entry(await self.redis.get(redis_key(digest)))
+        if cached is not None:
+            AUTH_CACHE_HITS.labels("redis").inc()
+            identity = DroneIdentity(id=uuid.UUID(cached["id"]), name=cached["name"], api_key=api_key)
+            self._set_local(digest, identity)
+            return identity
+
+        AUTH_CACHE_MISSES.inc()
+        return None
+
+    async def get_many(self, api_keys: list[str]) -> dict[str, DroneIdentity]:
+        """get() of several keys: local hits first, one MGET for the others. Unknown keys are left out."""
+        found, missing = {}, {}
+        for api_key in set(api_keys):
+            digest = key_digest(api_key)
+            identity = self._get_local(digest)
+            if identity is not None:
+                AUTH_CACHE_HITS.labels("local").inc()
+                found[api_key] = identity
+            else:
+                missing[api_key] = digest
+        if not missing:
+            return found
+
+        for (api_key, digest), data in zip(missing.items(), await self.redis.mget([redis_key(d) for d in missing.values()])):
+            cached = decode_entry(data)
+            if cached is None:
+                AUTH_CACHE_MISSES.inc()
+                continue
+            AUTH_CACHE_HITS.labels("redis").inc()
+            found[api_key] = DroneIdentity(id=uuid.UUID(cached["id"]), name=cached["name"], api_key=api_key)
+            self._set_local(digest, found[api_key])
+        return found
+
+    async def set(self, identity: DroneIdentity) -> None:
+        await self.set_many([identity])
+
+    async def set_many(self, identities: list[DroneIdentity]) -> None:
+        """Cache drones read from the database, unless their key was revoked meanwhile"""
+        pipe = self.redis.pipeline(transaction=False)
+        for identity in identities:
+            value = orjson.dumps({"id": str(identity.id), "name": identity.name})
+            pipe.set(redis_key(key_digest(identity.api_key)), value, ex=self.redis_ttl, nx=True)
+        for identity, stored in zip(identities, await pipe.execute()):
+            # Not stored: already cached (the next get() fills L1) or revoked
+            if stored:
+                self._set_local(key_digest(identity.api_key), identity)
+
+    async def invalidate(self, api_key: str) -> None:
+        """Call after rotating a key or deleting a drone (after the DB commit)"""
+        digest = key_digest(api_key)
+        self._local.pop(digest, None)
+        pipe = self.redis.pipeline(transaction=True)
+        # Outlives any entry a concurrent miss could still write (set() is NX)
+        pipe.set(redis_key(digest), REVOKED, ex=self.redis_ttl)
+        pipe.publish(INVALIDATION_CHANNEL, digest)
+        await pipe.execute()
+
+    async def start(self) -> None:
+        """Listen for invalidations published by the other API processes"""
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._local.pop(message["data"], None)
+        finally:
+            await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+            await pubsub.aclose()
@@ -4,14 +4,64 @@ from functools import lru_cache
 import yaml
 
 
+# Parsed once per process (libyaml when available): everything else reads `settings`
 CONFIG_FILEPATH = "src/config/config.yaml"
 with open(CONFIG_FILEPATH, "r") as file:
-    config = yaml.safe_load(file)
+    config = yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
 
 
 class Settings(BaseSettings):
+    DEBUG: bool = config.get("DEBUG", False)
+    ROLE: str = config.get("ROLE", "all")
     DATABASE_URL: str = config.get("DATABASE_URL")
     REDIS_URL: str = config.get("REDIS_URL")
+    DATABASE_READ_URL: str = config.get("DATABASE_READ_URL") or ""
+    DB_POOLS: dict[str, dict] = config.get("DB_POOLS", {})
+    TELEMETRY_COPY: bool = config.get("TELEMETRY_COPY", True)
+    DEDUP_WINDOW_S: int = config.get("DEDUP_WINDOW_S", 120)
+    DETECTION_REDIS_LOCK: bool = config.get("DETECTION_REDIS_LOCK", True)
+    DETECTION_LOCK_TTL_MS: int = config.get("DETECTION_LOCK_TTL_MS", 10000)
+    DETECTION_LOCK_WAIT_S: float = config.get("DETECTION_LOCK_WAIT_S", 5)
+    GATEWAY_MAX_DRONES: int = config.get("GATEWAY_MAX_DRONES", 64)
+    GATEWAY_MAX_PACKETS: int = config.get("GATEWAY_MAX_PACKETS", 10000)
+    FLIGHT_SWEEP_IDLE_S: float = config.get("FLIGHT_SWEEP_IDLE_S", 30)
+    FLIGHT_SWEEP_INTERVAL_S: float = config.get("FLIGHT_SWEEP_INTERVAL_S", 5)
+    FLIGHT_SWEEP_BATCH: int = config.get("FLIGHT_SWEEP_BATCH", 100)
+    FLIGHT_SWEEP_LEASE_S: float = config.get("FLIGHT_SWEEP_LEASE_S", 60)
+    TELEMETRY_PARTITION_DAYS_AHEAD: int = config.get("TELEMETRY_PARTITION_DAYS_AHEAD", 7)
+    TELEMETRY_RETENTION_DAYS: int = config.get("TELEMETRY_RETENTION_DAYS", 90)
+    TELEMETRY_RETENTION_MODE: str = config.get("TELEMETRY_RETENTION_MODE", "drop")
+    ROLLUP_RESOLUTIONS_S: list[int] = config.get("ROLLUP_RESOLUTIONS_S", [1, 10, 60])
+    SERIES_MAX_POINTS: int = config.get("SERIES_MAX_POINTS", 500)
+    ARCHIVE_ENABLED: bool = config.get("ARCHIVE_ENABLED", True)
+    ARCHIVE_URI: str = config.get("ARCHIVE_URI", "data/archive")
+    ARCHIVE_COMPRESSION: str = config.get("ARCHIVE_COMPRESSION", "zstd")
+    ARCHIVE_DELETE_RAW: bool = config.get("ARCHIVE_DELETE_RAW", False)
+    EXPORT_PAGE_ROWS: int = config.get("EXPORT_PAGE_ROWS", 10000)
+    WS_BATCH_SIZE: int = config.get("WS_BATCH_SIZE", 500)
+    WS_BATCH_WINDOW_MS: int = config.get("WS_BATCH_WINDOW_MS", 200)
+    WS_MAX_PENDING_ROWS: int = config.get("WS_MAX_PENDING_ROWS", 2000)
+    LIVE_MAX_RATE_HZ: float = config.get("LIVE_MAX_RATE_HZ", 10)
+    LIVE_SSE_HEARTBEAT_S: float = config.get("LIVE_SSE_HEARTBEAT_S", 15)
+    ANALYTICS_EXECUTOR: str = config.get("ANALYTICS_EXECUTOR", "process")
+    ANALYTICS_WORKERS: int = config.get("ANALYTICS_WORKERS", 2)
+    ANALYTICS_QUEUE_SIZE: int = config.get("ANALYTICS_QUEUE_SIZE", 64)
+    ANALYTICS_JOB_TIMEOUT_S: float = config.get("ANALYTICS_JOB_TIMEOUT_S", 120)
+    RECOMPUTE_WORKERS: int = config.get("RECOMPUTE_WORKERS", 4)
+    RECOMPUTE_CHUNK_FLIGHTS: int = config.get("RECOMPUTE_CHUNK_FLIGHTS", 200)
+    RECOMPUTE_CHECKPOINT_DIR: str = config.get("RECOMPUTE_CHECKPOINT_DIR", "data/recompute")
+    JOB_MAX_DELIVERIES: int = config.get("JOB_MAX_DELIVERIES", 5)
+    JOB_CLAIM_IDLE_MS: int = config.get("JOB_CLAIM_IDLE_MS", 300000)
+    JOB_RECOVERY_INTERVAL_S: float = config.get("JOB_RECOVERY_INTERVAL_S", 300)
+    JOB_RECOVERY_AFTER_S: float = config.get("JOB_RECOVERY_AFTER_S", 900)
+    JOB_RECOVERY_WINDOW_S: float = config.get("JOB_RECOVERY_WINDOW_S", 86400)
+    WORKER_CONCURRENCY: int = config.get("WORKER_CONCURRENCY", 4)
+    WORKER_METRICS_PORT: int = config.get("WORKER_METRICS_PORT", 9101)
+    AUTH_CACHE_SIZE: int = config.get("AUTH_CACHE_SIZE", 10000)
+    AUTH_CACHE_TTL_S: float = config.get("AUTH_CACHE_TTL_S", 30)
+    AUTH_CACHE_REDIS_TTL_S: int = config.get("AUTH_CACHE_REDIS_TTL_S", 300)
+    TRACING_ENABLED: bool = config.get("TRACING_ENABLED", False)
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = config.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
 
 @lru_cache
 def get_settings() -> Settings:
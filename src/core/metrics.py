@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# === Analytics executor ===
+ANALYTICS_QUEUE_DEPTH = Gauge(
+    "analytics_queue_depth",
+    "Analytics jobs waiting for a worker process",
+)
+ANALYTICS_QUEUE_WAIT_SECONDS = Histogram(
+    "analytics_queue_wait_seconds",
+    "Time an analytics job waited in the queue",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+ANALYTICS_JOB_SECONDS = Histogram(
+    "analytics_job_seconds",
+    "Analytics job run time in the worker pool",
+    ["outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+ANALYTICS_JOBS_REJECTED = Counter(
+    "analytics_jobs_rejected_total",
+    "Analytics jobs rejected because the queue was full",
+)
+FLIGHT_ANALYTICS_SECONDS = Histogram(
+    "flight_analytics_seconds",
+    "Flight analytics end to end (accumulator finalize or full reload + crunch, then the UPDATE), by flight length",
+    ["source", "flight_length"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+
+# === Job queue ===
+JOBS_ENQUEUED = Counter(
+    "jobs_enqueued_total",
+    "Jobs added to the Redis Stream job queue",
+    ["kind"],
+)
+JOBS_BACKLOG = Gauge(
+    "jobs_backlog",
+    "Jobs of the flight stream not delivered yet (waiting) or delivered and not acked (pending)",
+    ["state"],
+)
+ACTIVE_FLIGHTS = Gauge(
+    "active_flights",
+    "Open flights tracked by the idle sweeper (flights:active)",
+)
+FLIGHT_JOBS_RECOVERED = Counter(
+    "flight_jobs_recovered_total",
+    "flight_closed jobs queued again for closed flights left without analytics",
+)
+JOB_SECONDS = Histogram(
+    "job_seconds",
+    "Job handling time in the worker",
+    ["kind", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+
+# === API key auth cache ===
+AUTH_CACHE_HITS = Counter(
+    "auth_cache_hits_total",
+    "API key lookups answered by the cache",
+    ["tier"],
+)
+AUTH_CACHE_MISSES = Counter(
+    "auth_cache_misses_total",
+    "API key lookups that went to the database",
+)
+
+
+# === Ingest pipeline ===
+INGEST_STAGE_SECONDS = Histogram(
+    "ingest_stage_seconds",
+    "Time spent in each step of the ingest pipeline (parse, lane, lock, dedup, detect, insert, rollups, commit, accumulators, redis_writes)",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+INGEST_BATCH_ROWS = Histogram(
+    "ingest_batch_rows",
+    "Packets per ingested batch (POST body or WebSocket micro-batch)",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2000),
+)
+INGEST_ROWS = Counter(
+    "ingest_rows_total",
+    "Telemetry rows stored (rate() = rows ingested per second)",
+)
+
+
+# === Ingest deduplication ===
+INGEST_DUPLICATES = Counter(
+    "ingest_duplicates_dropped_total",
+    "Retransmitted telemetry rows dropped, by the Redis seen-set or by ON CONFLICT in PostgreSQL",
+    ["stage"],
+)
+
+
+# === Flight detection lanes ===
+DETECTION_LOCK_WAIT_SECONDS = Histogram(
+    "detection_lock_wait_seconds",
+    "Time a batch waited for the drone's Redis ingest lock (held by another node)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+FLIGHTS_SWEPT = Counter(
+    "flights_swept_total",
+    "Flights closed by the idle sweeper because their drone went silent",
+)
+
+
+# === WebSocket ingest ===
+WS_CONNECTIONS = Gauge(
+    "ws_ingest_connections",
+    "Open telemetry WebSocket connections",
+)
+WS_BATCH_ROWS = Histogram(
+    "ws_ingest_batch_rows",
+    "Rows per micro-batch flushed from WebSocket streams",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2000),
+)
+WS_FLUSH_SECONDS = Histogram(
+    "ws_ingest_flush_seconds",
+    "Time to store one WebSocket micro-batch",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+WS_BACKPRESSURE_WAITS = Counter(
+    "ws_ingest_backpressure_waits_total",
+    "Times a WebSocket stream stopped reading because its buffer was full",
+)
+
+
+# === Live fan-out ===
+LIVE_SUBSCRIBERS = Gauge(
+    "live_subscribers",
+    "Clients subscribed to live telemetry (SSE + WebSocket)",
+)
+LIVE_FRAMES_SENT = Counter(
+    "live_frames_sent_total",
+    "Live telemetry frames sent to subscribers",
+)
+LIVE_FRAMES_COALESCED = Counter(
+    "live_frames_coalesced_total",
+    "Live telemetry frames replaced by a newer one before a slow subscriber got them",
+)
+
+
+# === Database pools ===
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections checked out of each engine's pool (ingest, analytics, api)",
+    ["pool"],
+)
+DB_POOL_SATURATION = Gauge(
+    "db_pool_saturation",
+    "Checked out / (pool_size + max_overflow): at 1 new sessions wait up to pool_timeout_s",
+    ["pool"],
+)
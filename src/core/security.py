@@ -1,16 +1,57 @@
 #!/usr/bin/env python3
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, WebSocket, status
+from starlette.requests import HTTPConnection
 from sqlalchemy import select
-from src.db.session import AsyncSession, get_db
+from src.db.session import AsyncSession, AsyncSessionLocal, get_db
 from src.db.models.drone import Drone
+from src.core.auth_cache import ApiKeyCache, DroneIdentity
+
+
+def get_auth_cache(request: HTTPConnection) -> ApiKeyCache:
+    """API key cache created in the app lifespan"""
+    return request.app.state.auth_cache
+
+
+async def authenticate(cache: ApiKeyCache, db: AsyncSession, api_key: str) -> DroneIdentity | None:
+    """Resolve an API key to its drone: cache first, then the drones table"""
+    # Check the cache first: no DB round trip for a drone that already authenticated
+    drone = await cache.get(api_key)
+    if drone:
+        return drone
+
+    result = await db.execute(select(Drone.id, Drone.name).where(Drone.api_key == api_key))
+    row = result.one_or_none()
+    if not row:
+        return None
+    drone = DroneIdentity(id=row.id, name=row.name, api_key=api_key)
+    await cache.set(drone)
+    return drone
+
+
+async def authenticate_many(cache: ApiKeyCache, db: AsyncSession, api_keys: list[str]) -> dict[str, DroneIdentity]:
+    """authenticate() of the drones relayed by a gateway: one cache pass, one query for the misses.
+
+    Returns:
+        dict[str, DroneIdentity]: api_key → drone, unknown keys are left out
+    """
+    drones = await cache.get_many(api_keys)
+    missing = set(api_keys) - drones.keys()
+    if not missing:
+        return drones
+
+    result = await db.execute(select(Drone.id, Drone.name, Drone.api_key).where(Drone.api_key.in_(missing)))
+    found = [DroneIdentity(id=row.id, name=row.name, api_key=row.api_key) for row in result]
+    if found:
+        await cache.set_many(found)
+    return {**drones, **{drone.api_key: drone for drone in found}}
 
 
 async def get_current_drone(
+    request: Request,
     api_key: str = Header(..., alias="X-API-Key"),
     db: AsyncSession = Depends(get_db),
-) -> Drone:
-    result = await db.execute(select(Drone).where(Drone.api_key == api_key))
-    drone = result.scalar_one_or_none()
+) -> DroneIdentity:
+    drone = await authenticate(get_auth_cache(request), db, api_key)
     if not drone:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -18,3 +59,51 @@ async def get_current_drone(
             headers={"WWW-Authenticate": "API-Key"},
         )
     return drone
+
+
+async def get_streaming_drone(
+    request: Request,
+    api_key: str = Header(..., alias="X-API-Key"),
+) -> DroneIdentity:
+    """get_current_drone() for streamed responses (exports, SSE).
+
+    FastAPI closes yield dependencies only once the response is fully sent: with
+    Depends(get_db) a cache miss would hold an ingest connection for the whole stream.
+    """
+    async with AsyncSessionLocal() as db:
+        drone = await authenticate(get_auth_cache(request), db, api_key)
+    if not drone:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API-Key",
+            headers={"WWW-Authenticate": "API-Key"},
+        )
+    return drone
+
+
+# Browsers cannot set headers on a WebSocket: they offer ["api-key", KEY] as subprotocols
+# instead. Never in the URL, which servers and tracing write to their logs.
+WS_API_KEY_PROTOCOL = "api-key"
+
+
+def websocket_api_key(websocket: WebSocket) -> tuple[str | None, str | None]:
+    """API key of the handshake (X-API-Key header or subprotocol pair) and the subprotocol to answer"""
+    protocols = websocket.scope.get("subprotocols") or []
+    if WS_API_KEY_PROTOCOL in protocols:
+        i = protocols.index(WS_API_KEY_PROTOCOL)
+        return (protocols[i + 1] if i + 1 < len(protocols) else None), WS_API_KEY_PROTOCOL
+    return websocket.headers.get("x-api-key"), None
+
+
+async def authenticate_websocket(websocket: WebSocket) -> DroneIdentity | None:
+    """Check the API key, then accept the connection (or close it) during the handshake"""
+    api_key, subprotocol = websocket_api_key(websocket)
+    drone = None
+    if api_key:
+        async with AsyncSessionLocal() as db:
+            drone = await authenticate(get_auth_cache(websocket), db, api_key)
+    if not drone:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or missing API-Key")
+        return None
+    await websocket.accept(subprotocol=subprotocol)
+    return drone
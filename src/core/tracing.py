@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""OpenTelemetry traces: FastAPI, SQLAlchemy and Redis spans plus the ingest / analytics stages.
+
+setup_tracing() runs once per process (API module, worker main). With TRACING_ENABLED spans
+are batched to the OTLP/HTTP collector at OTEL_EXPORTER_OTLP_ENDPOINT (Jaeger, Tempo...);
+a script can pass its own exporter instead (e.g. an InMemorySpanExporter, to inspect the
+spans in-process) before importing src.main. Until then every span is the no-op span of
+opentelemetry-api.
+"""
+import time
+from contextlib import contextmanager
+
+from opentelemetry import trace
+
+from src.core.config import settings
+from src.core.metrics import INGEST_STAGE_SECONDS
+
+
+tracer = trace.get_tracer("flight_telemetry")
+
+_provider = None
+
+
+def setup_tracing(service_name: str, app=None, exporter=None):
+    """Install the tracer provider and the library instrumentations (first call), instrument `app`.
+
+    Returns:
+        TracerProvider | None: None when tracing is disabled
+    """
+    global _provider
+    if _provider is None:
+        if exporter is None and not settings.TRACING_ENABLED:
+            return None
+
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+
+        from src.db.session import analytics_engine, engine, read_engine
+
+        _provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        if exporter is None:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)))
+        else:
+            _provider.add_span_processor(SimpleSpanProcessor(exporter))
+        trace.set_tracer_provider(_provider)
+
+        # The instrumentation pins sqlalchemy < 2.1 but only hooks the Engine events, unchanged in 2.1
+        SQLAlchemyInstrumentor().instrument(
+            engines=[e.sync_engine for e in (engine, analytics_engine, read_engine)],
+            tracer_provider=_provider,
+            skip_dep_check=True,
+        )
+        RedisInstrumentor().instrument(tracer_provider=_provider)
+        print(f"[Tracing] {service_name} spans → {'OTLP ' + settings.OTEL_EXPORTER_OTLP_ENDPOINT if exporter is None else type(exporter).__name__}")
+
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+        FastAPIInstrumentor.instrument_app(app, tracer_provider=_provider, excluded_urls="metrics,health")
+    return _provider
+
+
+@contextmanager
+def stage(name: str):
+    """Span + ingest_stage_seconds{stage} sample around one step of the ingest pipeline"""
+    start = time.perf_counter()
+    with tracer.start_as_current_span(f"ingest.{name}"):
+        try:
+            yield
+        finally:
+            INGEST_STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
@@ -2,6 +2,7 @@
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy import text
 from src.db.session import engine
+from src.db.partitions import ensure_partitions
 import asyncio
 
 # Import all the models
@@ -14,6 +15,8 @@ async def create_tables() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        # telemetry_raw is partitioned: it needs its partitions before the first insert
+        await ensure_partitions(conn)
 
     print("All tables created successfully!")
 
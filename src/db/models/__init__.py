@@ -1,5 +1,6 @@
 from .drone import Drone
 from .telemetry import TelemetryRaw
 from .flight import Flight
+from .rollup import FlightRollup
 
-__all__ = ["Drone", "TelemetryRaw", "Flight"]
\ No newline at end of file
+__all__ = ["Drone", "TelemetryRaw", "Flight", "FlightRollup"]
\ No newline at end of file
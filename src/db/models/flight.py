@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from sqlalchemy import ForeignKey, DateTime, Integer, func
+from sqlalchemy import Boolean, ForeignKey, DateTime, Index, Integer, SmallInteger, String, false, func
 from sqlalchemy.dialects.postgresql import UUID, DOUBLE_PRECISION, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base
@@ -16,7 +16,7 @@ class Flight(Base):
 
     # ForeignKey: drones.id
     drone_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("drones.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("drones.id", ondelete="CASCADE")
     )
 
     # Starting/ending timestamp
@@ -33,9 +33,26 @@ class Flight(Base):
 
     # Metrics
     computed_metrics: Mapped[dict | None] = mapped_column(JSONB, default=dict)
+    # METRICS_VERSION of the analytics that produced computed_metrics (NULL: never computed or older)
+    metrics_version: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+
+    # Columnar archive of the flight's telemetry (Parquet file URI), set once the flight is compacted
+    archive_uri: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Its rows left telemetry_raw after archiving (ARCHIVE_DELETE_RAW): only the archive holds them
+    raw_deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=false())
 
     # Created/Updated timespamp
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
-    )
\ No newline at end of file
+    )
+
+
+# Per drone listing, newest first: keyset pages on (start_ts, id) are index seeks.
+# Also serves every other lookup by drone_id (it replaces ix_flights_drone_id).
+Index("ix_flights_drone_id_start_ts", Flight.drone_id, Flight.start_ts.desc(), Flight.id.desc())
+# Closed flights still waiting for their analytics (src/services/job_recovery.py): a handful of rows
+Index(
+    "ix_flights_unanalyzed", Flight.updated_at,
+    postgresql_where=Flight.end_ts.is_not(None) & Flight.metrics_version.is_(None),
+)
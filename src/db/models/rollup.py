@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+from sqlalchemy import DateTime, ForeignKey, Integer, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID, DOUBLE_PRECISION
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+import uuid
+
+
+class FlightRollup(Base):
+    """
+    Per flight time buckets of telemetry at a few fixed resolutions (1 s, 10 s, 1 min), for charts.
+    Sums and non-null counts instead of means, so a bucket can be merged with a later batch.
+    """
+    __tablename__ = "flight_rollups"
+
+    # Primary key: one row per flight, resolution and bucket
+    flight_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("flights.id", ondelete="CASCADE"), primary_key=True
+    )
+    resolution_s: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    bucket: Mapped[DateTime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    # Rows in the bucket
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Throttle
+    throttle_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    throttle_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    throttle_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    throttle_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Battery voltage
+    voltage_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    voltage_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    voltage_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    voltage_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Battery current
+    current_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    current_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    current_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    current_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Power (voltage * current)
+    power_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    power_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    power_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    power_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Attitude: roll
+    roll_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    roll_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    roll_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    roll_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Attitude: pitch
+    pitch_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    pitch_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    pitch_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    pitch_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Attitude: yaw
+    yaw_min: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    yaw_max: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
+    yaw_sum: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False, default=0.0)
+    yaw_n: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
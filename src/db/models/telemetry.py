@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, SmallInteger, func, JSON
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, SmallInteger, func, JSON
 from sqlalchemy.dialects.postgresql import UUID, DOUBLE_PRECISION
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base
@@ -7,18 +7,32 @@ import uuid
 
 
 class TelemetryRaw(Base):
+    """
+    Raw telemetry, range partitioned by day on ts (partitions are managed by src/db/partitions.py).
+    The partition key must be part of the primary key, hence (id, ts).
+    """
     __tablename__ = "telemetry_raw"
+    __table_args__ = (
+        # One row per (drone, ts): retransmitted packets are skipped with ON CONFLICT DO NOTHING.
+        # Also serves per drone time ranges, ts ordered.
+        Index("uq_telemetry_raw_drone_id_ts", "drone_id", "ts", unique=True),
+        # Per flight time ranges, ts ordered
+        Index("ix_telemetry_raw_flight_id_ts", "flight_id", "ts"),
+        # Tiny index for time range scans (rows arrive roughly in ts order)
+        Index("ix_telemetry_raw_ts_brin", "ts", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (ts)"},
+    )
 
     # Primary key
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
     # ForeignKey: drones.id
     drone_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("drones.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("drones.id", ondelete="CASCADE")
     )
 
-    # Timestamp
-    ts: Mapped[DateTime] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
+    # Timestamp (partition key)
+    ts: Mapped[DateTime] = mapped_column(DateTime(timezone=True), primary_key=True, nullable=False)
 
     # Core telemetry (all optional except ts)
     latitude: Mapped[float | None] = mapped_column(DOUBLE_PRECISION)
@@ -46,7 +60,7 @@ class TelemetryRaw(Base):
 
     # Flight ID
     flight_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True), nullable=True, index=True
+        UUID(as_uuid=True), nullable=True
     )
 
     # Further field
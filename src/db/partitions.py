@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Daily range partitions of telemetry_raw: creation ahead of time and retention.
+
+    telemetry_raw                    partitioned parent (RANGE on ts)
+    ├── telemetry_raw_p20261016      [2026-10-16, 2026-10-17) UTC
+    ├── telemetry_raw_p20261017
+    ├── ...                          TELEMETRY_PARTITION_DAYS_AHEAD days ahead
+    └── telemetry_raw_default        anything outside the daily partitions (bad clocks, backfills)
+
+Retention detaches (and by default drops) whole partitions older than
+TELEMETRY_RETENTION_DAYS: a catalog operation, no bulk DELETE, no vacuum debt.
+
+Run it daily (cron, or let the worker do it on startup and every hour):
+
+    python3 -m src.db.partitions
+"""
+import asyncio
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.core.config import settings
+
+
+PARENT = "telemetry_raw"
+DEFAULT_PARTITION = f"{PARENT}_default"
+PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{8}})$")
+
+# Serializes maintenance between workers (pg_advisory_xact_lock key)
+MAINTENANCE_LOCK_ID = 0x7E1E
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT}_p{day:%Y%m%d}"
+
+
+def partition_bounds(day: date) -> tuple[str, str]:
+    return f"{day.isoformat()} 00:00:00+00", f"{(day + timedelta(days=1)).isoformat()} 00:00:00+00"
+
+
+def create_default_partition_sql() -> str:
+    return f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"
+
+
+def create_partition_sql(day: date) -> str:
+    """DDL for one day (indexes and the FK are inherited from the parent)"""
+    start, end = partition_bounds(day)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def existing_partitions(conn: AsyncConnection) -> dict[date, str]:
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": PARENT})
+    partitions = {}
+    for (name,) in result:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+    return partitions
+
+
+async def create_partition(conn: AsyncConnection, day: date) -> None:
+    """Create the partition of `day`, moving over rows the default partition already holds for it"""
+    start, end = partition_bounds(day)
+    name = partition_name(day)
+    in_default = (await conn.execute(
+        text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE ts >= :start AND ts < :end LIMIT 1"),
+        {"start": datetime.fromisoformat(start), "end": datetime.fromisoformat(end)},
+    )).first()
+
+    if not in_default:
+        await conn.execute(text(create_partition_sql(day)))
+        return
+
+    # Attaching would fail while the default partition holds rows of the range: move them first
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    await conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE ts >= '{start}' AND ts < '{end}' RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    days_back: int = 1,
+    days_ahead: int = settings.TELEMETRY_PARTITION_DAYS_AHEAD,
+) -> list[str]:
+    """Create the default partition and the daily partitions from today - days_back to today + days_ahead"""
+    await conn.execute(text(create_default_partition_sql()))
+    existing = await existing_partitions(conn)
+    created = []
+    for offset in range(-days_back, days_ahead + 1):
+        day = today() + timedelta(days=offset)
+        if day not in existing:
+            await create_partition(conn, day)
+            created.append(partition_name(day))
+    return created
+
+
+async def apply_retention(
+    conn: AsyncConnection,
+    retention_days: int = settings.TELEMETRY_RETENTION_DAYS,
+    mode: str = settings.TELEMETRY_RETENTION_MODE,
+) -> list[str]:
+    """Detach ('detach') or drop ('drop') the daily partitions entirely older than retention_days"""
+    if mode not in ("drop", "detach"):
+        raise ValueError(f"Unknown TELEMETRY_RETENTION_MODE {mode!r}")
+
+    cutoff = today() - timedelta(days=retention_days)
+    expired = []
+    for day, name in sorted((await existing_partitions(conn)).items()):
+        if day >= cutoff:
+            break
+        await conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if mode == "drop":
+            await conn.execute(text(f"DROP TABLE {name}"))
+        expired.append(name)
+
+    # Strays in the default partition age out too (a small table, a plain DELETE is fine)
+    await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE ts < :cutoff"), {
+        "cutoff": datetime.combine(cutoff, datetime.min.time(), timezone.utc),
+    })
+    return expired
+
+
+async def maintain_partitions(engine) -> None:
+    """Create upcoming partitions and apply retention, once across all workers"""
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID})
+        created = await ensure_partitions(conn)
+        expired = await apply_retention(conn)
+    if created:
+        print(f"[Partitions] Created {', '.join(created)}")
+    if expired:
+        print(f"[Partitions] Retention ({settings.TELEMETRY_RETENTION_MODE}): {', '.join(expired)}")
+
+
+if __name__ == "__main__":
+    from src.db.session import engine
+
+    asyncio.run(maintain_partitions(engine))
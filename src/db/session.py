@@ -1,22 +1,54 @@
 #!/usr/bin/env python3
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+"""Database engines, one connection pool per workload (sizes: DB_POOLS in config.yaml).
+
+- ingest     engine / AsyncSessionLocal / get_db: telemetry writes, flight detection, auth,
+             drone management; always the primary.
+- analytics  analytics_engine / AnalyticsSessionLocal: worker analytics loads, archiving,
+             recompute backfills. Long scans wait for their own connections, never for
+             the ingest ones. Primary too: jobs read flights right after they close,
+             write their metrics and may delete the rows they archived.
+- api        read_engine / ReadSessionLocal / get_read_db: flight listing, series, exports.
+             Routed to DATABASE_READ_URL (a streaming replica) when set.
+"""
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-import yaml
 
 from src.core.config import settings
+from src.core.metrics import DB_POOL_IN_USE, DB_POOL_SATURATION
 # from models.base import Base   # noqa: F401  (needed for Alembic)
 
 
-CONFIG_FILEPATH = "src/config/config.yaml"
-with open(CONFIG_FILEPATH, "r") as file:
-    config = yaml.safe_load(file)
+DEFAULT_POOL = {"pool_size": 5, "max_overflow": 5, "pool_timeout_s": 30}
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=config.get("DEBUG"),           # set True only for debugging
-    future=True,
-)
+def create_pool_engine(name: str, url: str) -> AsyncEngine:
+    """Engine sized from DB_POOLS[name], reporting its checked out connections"""
+    pool = {**DEFAULT_POOL, **settings.DB_POOLS.get(name, {})}
+    engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,                 # set True only for debugging
+        pool_size=pool["pool_size"],
+        max_overflow=pool["max_overflow"],
+        pool_timeout=pool["pool_timeout_s"],
+        pool_pre_ping=True,
+    )
+    capacity = pool["pool_size"] + pool["max_overflow"]
+
+    def report(returning: int = 0):
+        in_use = max(0, engine.sync_engine.pool.checkedout() - returning)
+        DB_POOL_IN_USE.labels(name).set(in_use)
+        DB_POOL_SATURATION.labels(name).set(in_use / capacity)
+
+    # checkin fires before the connection is back in the pool
+    event.listen(engine.sync_engine, "checkout", lambda *_: report())
+    event.listen(engine.sync_engine, "checkin", lambda *_: report(returning=1))
+    return engine
+
+
+engine = create_pool_engine("ingest", settings.DATABASE_URL)
+analytics_engine = create_pool_engine("analytics", settings.DATABASE_URL)
+read_engine = create_pool_engine("api", settings.DATABASE_READ_URL or settings.DATABASE_URL)
 
 
 AsyncSessionLocal = sessionmaker(
@@ -24,8 +56,24 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+AnalyticsSessionLocal = sessionmaker(
+    bind=analytics_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Read-only session (replica when DATABASE_READ_URL is set): may lag the primary slightly"""
+    async with ReadSessionLocal() as session:
+        yield session
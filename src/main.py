@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from redis.asyncio import Redis
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from src.db.session import get_db
 from src.core.config import settings
-from src.api.v1.api import router as v1_router
+from src.api.v1.api import ROLE_ROUTERS, build_router
+from src.core.auth_cache import ApiKeyCache
+from src.core.tracing import setup_tracing
+from src.services.job_queue import JobQueue
+from src.services.live_hub import LiveHub
 
 
 @asynccontextmanager
@@ -15,7 +20,30 @@ async def lifespan(app: FastAPI):
     redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
     app.state.redis = redis                     # ← this is correct
     print("Redis connected successfully")
+    print(f"[API] Role {settings.ROLE}: {', '.join(ROLE_ROUTERS[settings.ROLE])} routes")
+
+    # Ingest only enqueues, analytics run in the workers (python3 -m src.worker)
+    jobs = JobQueue(redis)
+    await jobs.ensure_group()
+    app.state.jobs = jobs
+
+    # API key → drone cache, kept coherent across processes by pub/sub invalidations
+    auth_cache = ApiKeyCache(redis)
+    await auth_cache.start()
+    app.state.auth_cache = auth_cache
+
+    # Live fan-out: own connection without response decoding, payloads stay raw bytes
+    live_hub = None
+    if "live" in ROLE_ROUTERS[settings.ROLE]:
+        live_redis = Redis.from_url(settings.REDIS_URL)
+        live_hub = LiveHub(live_redis)
+        await live_hub.start()
+        app.state.live_hub = live_hub
     yield
+    if live_hub is not None:
+        await live_hub.stop()
+        await live_redis.close()
+    await auth_cache.stop()
     await redis.close()
     print("Redis disconnected")
 
@@ -28,14 +56,17 @@ app = FastAPI(
 )
 
 
-# Add router
-app.include_router(v1_router)
+# Add the routers of this process' role (ROLE=ingest|api|analytics, default all)
+app.include_router(build_router(settings.ROLE))
+
+# Traces (TRACING_ENABLED): request spans wrap the SQLAlchemy, Redis and ingest stage spans
+setup_tracing("telemetry-api", app)
 
 
 # Root
 @app.get("/")
 async def root():
-    return {"message": "Drone Telemetry Platform is running"}
+    return {"message": "Drone Telemetry Platform is running", "role": settings.ROLE}
 
 
 # Health endpoint
@@ -61,3 +92,9 @@ async def health(db: AsyncSession = Depends(get_db)):
         "db": db_status,
         "redis": redis_status
     }
+
+
+# Prometheus metrics
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from datetime import datetime
 from typing import Optional
 import pytz
@@ -28,3 +28,17 @@ class TelemetryIngestRequest(BaseModel):
         if value.tzinfo is None:
             return value.replace(tzinfo=pytz.UTC)
         return value.astimezone(pytz.UTC)
+
+
+# Validates a whole JSON batch straight from the raw body (no intermediate json.loads)
+TelemetryBatch = TypeAdapter(list[TelemetryIngestRequest])
+
+
+class GatewayDroneBatch(BaseModel):
+    """Packets of one relayed drone, authenticated by its own API key"""
+    api_key: str
+    packets: list[TelemetryIngestRequest]
+
+
+class GatewayIngestRequest(BaseModel):
+    drones: list[GatewayDroneBatch]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from src.core.config import settings
+from src.core.metrics import (
+    ANALYTICS_JOB_SECONDS,
+    ANALYTICS_JOBS_REJECTED,
+    ANALYTICS_QUEUE_DEPTH,
+    ANALYTICS_QUEUE_WAIT_SECONDS,
+)
+from src.services.analytics_kernel import compute_flight_metrics
+
+
+class AnalyticsQueueFull(Exception):
+    """Raised when the bounded analytics queue cannot take another job"""
+
+
+class AnalyticsExecutor:
+    """Runs compute_flight_metrics off the event loop, in worker processes (or threads).
+
+    Jobs go through a bounded queue drained by one dispatcher per worker, so at
+    most `workers` flights are crunched at once and at most `queue_size` wait.
+    Jobs are plain dicts of NumPy arrays, which pickle as raw buffers.
+
+    Each dispatcher owns a single-worker pool and only takes a job once its worker
+    is free, so `job_timeout` counts run time, never time queued behind another job.
+    A job over it is failed; its worker process is killed and replaced. A thread
+    cannot be killed: its dispatcher waits for the abandoned job before the next one.
+    """
+
+    def __init__(
+        self,
+        kind: str = settings.ANALYTICS_EXECUTOR,
+        workers: int = settings.ANALYTICS_WORKERS,
+        queue_size: int = settings.ANALYTICS_QUEUE_SIZE,
+        job_timeout: float = settings.ANALYTICS_JOB_TIMEOUT_S,
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown ANALYTICS_EXECUTOR {kind!r}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.job_timeout = job_timeout
+        self._pools: list[Executor] = []
+        self._queue: asyncio.Queue | None = None
+        self._dispatchers: list[asyncio.Task] = []
+
+    def _new_pool(self) -> Executor:
+        if self.kind == "thread":
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics")
+        # spawn: children only import the NumPy kernel, never a copy of the running app
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        # Spawn the worker now so process start-up never eats into a job timeout
+        pool.submit(int)
+        return pool
+
+    @staticmethod
+    def _kill_pool(pool: Executor) -> None:
+        """Stop a process pool now, running job included (shutdown alone waits for it)"""
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> None:
+        self._pools = [self._new_pool() for _ in range(self.workers)]
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._dispatchers = [asyncio.create_task(self._dispatch(slot)) for slot in range(self.workers)]
+        print(f"[Analytics] {self.kind} executor started with {self.workers} workers")
+
+    async def shutdown(self) -> None:
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        for pool in self._pools:
+            if self.kind == "process":
+                self._kill_pool(pool)
+            else:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pools = []
+
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    async def submit(self, columns: dict[str, np.ndarray]) -> dict:
+        """Queue one flight and wait for its metrics.
+
+        Raises:
+            AnalyticsQueueFull: the queue already holds `queue_size` jobs
+            asyncio.TimeoutError: the job ran longer than `job_timeout`
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((columns, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            ANALYTICS_JOBS_REJECTED.inc()
+            raise AnalyticsQueueFull(f"{self.queue_size} analytics jobs already queued")
+        ANALYTICS_QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def _free_slot(self, slot: int, job: asyncio.Future) -> None:
+        """Give the slot a free worker again after a timed-out job"""
+        if self.kind == "process":
+            self._kill_pool(self._pools[slot])
+            self._pools[slot] = self._new_pool()
+            print(f"[Analytics] Job over {self.job_timeout}s: worker process {slot} killed and replaced")
+            # Wait for the new worker outside of any job timeout
+            await asyncio.wrap_future(self._pools[slot].submit(int))
+        else:
+            print(f"[Analytics] Job over {self.job_timeout}s: worker thread {slot} busy until it ends")
+        # Its result (or BrokenProcessPool) is dropped
+        await asyncio.gather(job, return_exceptions=True)
+
+    async def _dispatch(self, slot: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            columns, future, enqueued_at = await self._queue.get()
+            ANALYTICS_QUEUE_DEPTH.set(self._queue.qsize())
+            ANALYTICS_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - enqueued_at)
+
+            start = time.perf_counter()
+            outcome = "ok"
+            # The slot's worker is idle: the job starts running now, and so does its timeout
+            job = loop.run_in_executor(self._pools[slot], compute_flight_metrics, columns)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(job), timeout=self.job_timeout)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.TimeoutError as e:
+                outcome = "timeout"
+                if not future.done():
+                    future.set_exception(e)
+            except Exception as e:
+                outcome = "error"
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                ANALYTICS_JOB_SECONDS.labels(outcome).observe(time.perf_counter() - start)
+                self._queue.task_done()
+
+            if outcome == "timeout":
+                await self._free_slot(slot, job)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+import numpy as np
+
+
+EARTH_RADIUS_M = 6371000
+
+# Bump whenever a metric is added or its definition changes: flights computed by an
+# older version are picked up by `python3 -m src.services.recompute --stale`
+METRICS_VERSION = 1
+
+
+# The helpers below reproduce pandas' skipna reductions (NaN filled with 0 before a
+# numpy pairwise sum, divided by the count of valid values) so the kernel returns
+# exactly the numbers the DataFrame implementation produced.
+def _nansum(values: np.ndarray, valid: np.ndarray) -> float:
+    return float(np.where(valid, values, 0.0).sum())
+
+
+def _nanmean(values: np.ndarray, valid: np.ndarray) -> float:
+    count = int(np.count_nonzero(valid))
+    return _nansum(values, valid) / count if count else float("nan")
+
+
+def _nanstd(values: np.ndarray, valid: np.ndarray) -> float:
+    count = int(np.count_nonzero(valid))
+    if count < 2:
+        return float("nan")
+    avg = _nansum(values, valid) / count
+    squares = np.where(valid, (avg - values) ** 2, 0.0)
+    return float(np.sqrt(squares.sum() / (count - 1)))
+
+
+def compute_flight_metrics(columns: dict[str, np.ndarray]) -> dict:
+    """Post-flight metrics from plain NumPy columns (array in, dict out, inputs untouched).
+
+    Args:
+        columns (dict[str, np.ndarray]): ts_us (int64 epoch microseconds, sorted) plus float
+            arrays with NaN for missing values: throttle, voltage, current, mah_drawn,
+            roll, pitch, yaw, latitude, longitude. Missing optional columns are skipped.
+
+    Returns:
+        dict: metrics stored in flights.computed_metrics
+    """
+    ts_us = columns["ts_us"]
+    n = ts_us.size
+    if n == 0:
+        return {}
+
+    throttle = columns["throttle"]
+    voltage = columns.get("voltage")
+    current = columns.get("current")
+    mah = columns.get("mah_drawn")
+    latitude = columns.get("latitude")
+    longitude = columns.get("longitude")
+
+    has_voltage = ~np.isnan(voltage) if voltage is not None else np.zeros(n, dtype=bool)
+
+    metrics = {}
+
+    # === Energy & Power ===
+    if voltage is not None and current is not None:
+        power = voltage * current
+        has_power = ~np.isnan(power)
+        if has_power.any():
+            metrics["peak_power_w"] = float(power[has_power].max())
+            metrics["average_power_w"] = _nanmean(power, has_power)
+            # Integrated energy from power curve (more accurate than mah_drawn)
+            dt = np.empty(n)
+            dt[0] = 0.0
+            np.divide(np.diff(ts_us), 1e6, out=dt[1:])
+            metrics["total_wh"] = _nansum(power * dt / 3600, has_power)
+            mean_voltage = _nanmean(voltage, has_voltage)
+            metrics["total_mah_from_power"] = metrics["total_wh"] * 1000 / mean_voltage if mean_voltage > 0 else None
+
+    if mah is not None:
+        has_mah = ~np.isnan(mah)
+        if has_mah.any():
+            metrics["total_mah"] = int(mah[has_mah].max() - mah[has_mah].min())
+
+    metrics["min_voltage"] = float(voltage[has_voltage].min()) if has_voltage.any() else None
+
+    # === Stability ===
+    abs_attitude = {}
+    for axis in ("roll", "pitch", "yaw"):
+        values = columns.get(axis)
+        if values is None:
+            continue
+        valid = ~np.isnan(values)
+        abs_attitude[axis] = np.abs(values)
+        if valid.any():
+            metrics[f"{axis}_std_dev"] = _nanstd(values, valid)
+            metrics[f"{axis}_max_rate"] = float(abs_attitude[axis][valid].max())
+
+    # === Throttle Smoothness (lower = smoother pilot) ===
+    has_throttle = ~np.isnan(throttle)
+    changes = np.empty(n)
+    changes[0] = np.nan
+    np.abs(np.diff(throttle), out=changes[1:])
+    metrics["throttle_jerk_score"] = _nanmean(changes, ~np.isnan(changes))  # lower = better
+    metrics["average_throttle"] = _nanmean(throttle, has_throttle)
+
+    # === Aggressiveness / Pilot Fingerprint ===
+    metrics["throttle_90th_percentile"] = float(np.percentile(throttle, 90))
+    metrics["percent_time_full_throttle"] = float(np.count_nonzero(throttle > 0.8) / n * 100)
+
+    # === Efficiency (if GPS present) ===
+    if latitude is not None and longitude is not None and (~np.isnan(latitude) & ~np.isnan(longitude)).any():
+        lat1 = np.radians(latitude[:-1])
+        lat2 = np.radians(latitude[1:])
+        dlat = np.radians(latitude[1:] - latitude[:-1])
+        dlon = np.radians(longitude[1:] - longitude[:-1])
+        a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+        segment_dist_m = np.empty(n)
+        segment_dist_m[0] = np.nan
+        segment_dist_m[1:] = EARTH_RADIUS_M * (2 * np.arctan2(np.sqrt(a), np.sqrt(1-a)))
+        total_distance_km = _nansum(segment_dist_m, ~np.isnan(segment_dist_m)) / 1000
+
+        if total_distance_km > 0.01 and metrics.get("total_wh"):
+            metrics["wh_per_km"] = round(metrics["total_wh"] / total_distance_km, 3)
+            metrics["total_distance_km"] = round(total_distance_km, 3)
+
+    # === Freestyle vs Racing Score (heuristic) ===
+    high_g_force = np.zeros(n, dtype=bool)
+    for axis in ("roll", "pitch"):
+        if axis in abs_attitude:
+            high_g_force |= abs_attitude[axis] > 45
+    metrics["freestyle_score"] = round(np.count_nonzero(high_g_force) / n * 100, 1)  # higher = more acrobatic
+
+    metrics["flight_duration_s"] = int((ts_us.max() - ts_us.min()) / 1e6)
+
+    return metrics
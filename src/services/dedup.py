@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Drop retransmitted telemetry before it reaches PostgreSQL.
+
+Per drone, Redis keeps:
+
+    drone:{id}:dedup:hwm        newest ts stored (epoch µs). Live telemetry moves forward:
+                                rows past it are new and the check costs this single GET
+    drone:{id}:dedup:{bucket}   one bit per millisecond of a DEDUP_BUCKET_S bucket, set once
+                                the row is committed, kept DEDUP_WINDOW_S behind the mark
+
+Rows at or behind the high-water mark whose bit is set are dropped; the other rows behind it
+(behind_mark()) are looked up in PostgreSQL before flight detection, and the unique
+(drone_id, ts) index with ON CONFLICT DO NOTHING stays the last guard. Bits are set only
+after the commit, so a batch whose transaction failed is never mistaken for a duplicate
+when retried, and timestamps with sub-millisecond digits are left to the database: two
+distinct packets never share a bit.
+"""
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from src.core.config import settings
+from src.core.metrics import INGEST_DUPLICATES
+
+
+DEDUP_BUCKET_S = 10                 # 10,000 bits (1.25 KB) per bucket key
+BUCKET_MS = DEDUP_BUCKET_S * 1000
+HWM_TTL_S = 86400                   # forget drones silent for a day
+_US = timedelta(microseconds=1)
+# Not imported from flight_accumulator: the api role reads ingest stats without NumPy
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def hwm_key(drone_id) -> str:
+    return f"drone:{drone_id}:dedup:hwm"
+
+
+def bucket_key(drone_id, bucket: int) -> str:
+    return f"drone:{drone_id}:dedup:{bucket}"
+
+
+def stats_key(drone_id) -> str:
+    """Per drone ingest counters (HINCRBY)"""
+    return f"drone:{drone_id}:ingest_stats"
+
+
+def epoch_us(ts: datetime) -> int:
+    return (ts - EPOCH) // _US
+
+
+def _bit(ts_us: int) -> tuple[int, int] | None:
+    """(bucket, offset) of a millisecond-aligned timestamp, None otherwise"""
+    if ts_us % 1000:
+        return None
+    ms = ts_us // 1000
+    return ms // BUCKET_MS, ms % BUCKET_MS
+
+
+async def drop_seen(
+    redis_client,
+    drone_id: uuid.UUID,
+    rows: list[tuple],
+    hwm: bytes | str | None,
+    window_s: int = settings.DEDUP_WINDOW_S,
+) -> tuple[list[tuple], int, int]:
+    """Remove the rows of a ts-sorted batch that are already stored, as far as Redis knows.
+
+    The high-water mark is read by the caller, with the flight state (DroneBatch.begin()).
+
+    Returns:
+        tuple[list[tuple], int, int]: rows left, rows dropped, high-water mark (µs, 0 if none)
+    """
+    # The same packet twice in one batch: keep the first
+    unique = [row for i, row in enumerate(rows) if i == 0 or row[0] != rows[i - 1][0]]
+    if hwm is None or window_s <= 0:
+        return unique, len(rows) - len(unique), int(hwm or 0)
+    hwm = int(hwm)
+
+    # Only rows inside the window behind the mark can have a bit to check
+    lowest = hwm - window_s * 1_000_000
+    checks = defaultdict(list)
+    for i, row in enumerate(unique):
+        ts_us = epoch_us(row[0])
+        if lowest <= ts_us <= hwm and (bit := _bit(ts_us)) is not None:
+            checks[bit[0]].append((i, bit[1]))
+    if not checks:
+        return unique, len(rows) - len(unique), hwm
+
+    pipe = redis_client.pipeline(transaction=False)
+    for bucket, offsets in checks.items():
+        pipe.execute_command("BITFIELD", bucket_key(drone_id, bucket), *(
+            arg for _, offset in offsets for arg in ("GET", "u1", offset)
+        ))
+    seen = {
+        i
+        for offsets, bits in zip(checks.values(), await pipe.execute())
+        for (i, _), bit in zip(offsets, bits)
+        if bit
+    }
+    fresh = [row for i, row in enumerate(unique) if i not in seen]
+    return fresh, len(rows) - len(fresh), hwm
+
+
+def behind_mark(rows: list[tuple], hwm: int) -> list[datetime]:
+    """ts of the rows drop_seen() cannot vouch for: at or behind the mark, or all of them without one"""
+    if not hwm:
+        return [row[0] for row in rows]
+    return [row[0] for row in rows if epoch_us(row[0]) <= hwm]
+
+
+def record_stored(
+    pipe,
+    drone_id: uuid.UUID,
+    stored_ts: list[datetime],
+    hwm: int,
+    dropped_redis: int,
+    dropped_db: int,
+    window_s: int = settings.DEDUP_WINDOW_S,
+) -> None:
+    """After the commit: mark the stored rows, move the high-water mark, count the duplicates.
+
+    Queued on `pipe`, the pipeline closing the batch.
+    """
+    if window_s > 0 and stored_ts:
+        stored_us = [epoch_us(ts) for ts in stored_ts]
+        new_hwm = max(hwm, max(stored_us))
+        lowest = new_hwm - window_s * 1_000_000
+        marks = defaultdict(list)
+        for ts_us in stored_us:
+            if ts_us >= lowest and (bit := _bit(ts_us)) is not None:
+                marks[bit[0]].append(bit[1])
+        for bucket, offsets in marks.items():
+            key = bucket_key(drone_id, bucket)
+            pipe.execute_command("BITFIELD", key, *(arg for offset in offsets for arg in ("SET", "u1", offset, 1)))
+            pipe.expire(key, window_s + DEDUP_BUCKET_S)
+        # Batches of a drone are serialized (drone_lanes): nobody moved the mark since it was read
+        if new_hwm > hwm:
+            pipe.set(hwm_key(drone_id), new_hwm, ex=HWM_TTL_S)
+
+    if dropped_redis:
+        INGEST_DUPLICATES.labels("redis").inc(dropped_redis)
+        pipe.hincrby(stats_key(drone_id), "duplicates_redis", dropped_redis)
+    if dropped_db:
+        INGEST_DUPLICATES.labels("database").inc(dropped_db)
+        pipe.hincrby(stats_key(drone_id), "duplicates_database", dropped_db)
+
+
+async def duplicate_counts(redis_client, drone_id: uuid.UUID) -> dict:
+    stats = await redis_client.hgetall(stats_key(drone_id))
+    return {
+        "redis": int(stats.get("duplicates_redis", 0)),
+        "database": int(stats.get("duplicates_database", 0)),
+    }
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""One ingest batch at a time per drone.
+
+Flight detection reads the drone's flight state, writes Flight rows and saves the new
+state: two batches of the same drone running side by side (two POSTs in flight, a POST
+next to a WebSocket stream, two API processes) would both open the same flight.
+
+- In process: DroneLanes hands each drone one FIFO lane (asyncio.Lock). Batches of a
+  drone queue behind each other, other drones are never held up.
+- Across processes / nodes (DETECTION_REDIS_LOCK): the lane also takes the Redis lock
+  `drone:{id}:ingest_lock` (SET NX PX with a random token). It is requested in the same
+  round trip that reads the flight state and the dedup high-water mark, and released by
+  a compare-and-delete script queued on the batch's final pipeline: a node never deletes
+  a lock that expired and was taken over by another one.
+- Once the batch's transaction is committed (DroneBatch.committed), its queued writes go
+  out even if a later step fails: dropping them would leave the next batch detecting from
+  the state before these rows, and open a second flight.
+- A gateway batch (several drones) holds the lanes and locks of all its drones, taken
+  in drone_id order in process and all-or-nothing in Redis, so it cannot deadlock with
+  another one.
+"""
+import asyncio
+import secrets
+import time
+import uuid
+from collections import Counter
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from src.core.config import settings
+from src.core.metrics import DETECTION_LOCK_WAIT_SECONDS, INGEST_STAGE_SECONDS
+from src.core.tracing import stage
+from src.services.dedup import hwm_key
+from src.services.flight_detection import state_key
+
+
+LOCK_RETRY_MIN_S = 0.005
+LOCK_RETRY_MAX_S = 0.1
+
+# Delete the lock only if it still holds our token
+RELEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class DroneBusy(Exception):
+    """The drone's ingest lock stayed taken by another node for DETECTION_LOCK_WAIT_S"""
+
+
+def lock_key(drone_id) -> str:
+    return f"drone:{drone_id}:ingest_lock"
+
+
+class DroneLanes:
+    """Per drone asyncio.Lock, dropped as soon as no batch holds or waits for it"""
+
+    def __init__(self):
+        self._locks: dict[uuid.UUID, asyncio.Lock] = {}
+        self._users: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def lane(self, drone_id: uuid.UUID):
+        lock = self._locks.setdefault(drone_id, asyncio.Lock())
+        self._users[drone_id] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[drone_id] -= 1
+            if not self._users[drone_id]:
+                del self._users[drone_id]
+                del self._locks[drone_id]
+
+
+drone_lanes = DroneLanes()
+
+
+class DroneBatch:
+    """Redis side of a batch: the locks, the reads it starts with and the pipeline it ends with.
+
+    One drone for POST / WebSocket batches, many for a gateway relay: one round trip takes
+    every lock and reads every state, one pipeline writes everything and releases them.
+    """
+
+    def __init__(self, redis_client, drone_ids: list[uuid.UUID], redis_lock: bool = settings.DETECTION_REDIS_LOCK):
+        self.redis = redis_client
+        self.drone_ids = sorted(set(drone_ids))
+        self.token = secrets.token_hex(8) if redis_lock else None
+        self.locked = False
+        # Set by the caller once the rows are committed in PostgreSQL
+        self.committed = False
+        # Every write of the batch, executed once at the end
+        self.pipe = redis_client.pipeline(transaction=False)
+
+    async def begin(
+        self,
+        ttl_ms: int = settings.DETECTION_LOCK_TTL_MS,
+        wait_s: float = settings.DETECTION_LOCK_WAIT_S,
+    ) -> dict[uuid.UUID, tuple[bytes | None, bytes | None]]:
+        """Take the locks (if enabled) and read the flight states + dedup high-water marks, one round trip per try.
+
+        Returns:
+            dict: drone_id → (raw flight state, raw high-water mark), None when missing
+        """
+        with stage("lock"):
+            return await self._begin(ttl_ms, wait_s)
+
+    async def _begin(self, ttl_ms: int, wait_s: float) -> dict[uuid.UUID, tuple[bytes | None, bytes | None]]:
+        start = time.perf_counter()
+        delay = LOCK_RETRY_MIN_S
+        while True:
+            pipe = self.redis.pipeline(transaction=False)
+            if self.token is not None:
+                for drone_id in self.drone_ids:
+                    pipe.set(lock_key(drone_id), self.token, nx=True, px=ttl_ms)
+            for drone_id in self.drone_ids:
+                pipe.get(state_key(drone_id))
+                pipe.get(hwm_key(drone_id))
+            results = await pipe.execute()
+            n_locks = len(self.drone_ids) if self.token is not None else 0
+            acquired, reads = results[:n_locks], results[n_locks:]
+            if all(acquired):
+                self.locked = bool(acquired)
+                DETECTION_LOCK_WAIT_SECONDS.observe(time.perf_counter() - start)
+                return {drone_id: (reads[2 * i], reads[2 * i + 1]) for i, drone_id in enumerate(self.drone_ids)}
+
+            # All or nothing: give back the locks we got, two relays sharing drones never wait on each other
+            taken = [drone_id for drone_id, ok in zip(self.drone_ids, acquired) if ok]
+            if taken:
+                await self._release(self.redis.pipeline(transaction=False), taken).execute()
+
+            # Another node is detecting flights for one of these drones: wait for its batch
+            if time.perf_counter() - start + delay > wait_s:
+                busy = [str(drone_id) for drone_id, ok in zip(self.drone_ids, acquired) if not ok]
+                raise DroneBusy(f"Ingest lock of drone {', '.join(busy)} held for more than {wait_s} s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOCK_RETRY_MAX_S)
+
+    def _release(self, pipe, drone_ids: list[uuid.UUID]):
+        for drone_id in drone_ids:
+            pipe.eval(RELEASE_LUA, 1, lock_key(drone_id), self.token)
+        return pipe
+
+    async def commit(self) -> None:
+        """Queue the lock releases behind the batch writes and send them all"""
+        if self.locked:
+            self._release(self.pipe, self.drone_ids)
+            self.locked = False
+        if len(self.pipe):
+            with stage("redis_writes"):
+                await self.pipe.execute()
+
+    async def abort(self) -> None:
+        """Drop the queued writes and release the locks (the batch failed)"""
+        await self.pipe.reset()
+        if self.locked:
+            self.locked = False
+            await self._release(self.redis.pipeline(transaction=False), self.drone_ids).execute()
+
+
+@asynccontextmanager
+async def drone_batch(redis_client, *drone_ids: uuid.UUID):
+    """Serialize a batch of the drones in this process, then across nodes"""
+    batch = DroneBatch(redis_client, list(drone_ids))
+    start = time.perf_counter()
+    async with AsyncExitStack() as lanes:
+        # Always in drone_id order: two multi-drone batches cannot wait on each other
+        for drone_id in batch.drone_ids:
+            await lanes.enter_async_context(drone_lanes.lane(drone_id))
+        INGEST_STAGE_SECONDS.labels("lane").observe(time.perf_counter() - start)
+        try:
+            yield batch
+        except BaseException:
+            # Rows committed: the flight state, dedup marks and flights:active entry queued for them must follow
+            if batch.committed:
+                await batch.commit()
+            else:
+                await batch.abort()
+            raise
+        await batch.commit()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+import math
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import orjson
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_US = timedelta(microseconds=1)
+
+EARTH_RADIUS_M = 6371000
+THROTTLE_BINS = 1000            # percentile sketch resolution (bin width 0.001)
+ACCUMULATOR_TTL_SECONDS = 24 * 3600
+
+# Documented agreement with the batch compute_advanced_metrics():
+# - counts, integers and rounded scores are identical
+# - float sums/means/std agree to a relative 1e-9 (different summation order)
+# - throttle_90th_percentile comes from a fixed-bin sketch: absolute error ≤ 1 / THROTTLE_BINS
+# - wh_per_km / total_distance_km are rounded to 3 decimals and may differ by one unit in the last digit
+RELATIVE_TOLERANCE = 1e-9
+ABSOLUTE_TOLERANCE = {
+    "throttle_90th_percentile": 1.0 / THROTTLE_BINS,
+    "wh_per_km": 1e-3,
+    "total_distance_km": 1e-3,
+}
+
+AXES = ("roll", "pitch", "yaw")
+
+
+def accumulator_key(flight_id) -> str:
+    return f"flight:{flight_id}:metrics_acc"
+
+
+def ts_to_us(values) -> np.ndarray:
+    """Exact epoch microseconds for an iterable of aware datetimes"""
+    return np.fromiter(((v - EPOCH) // ONE_US for v in values), dtype=np.int64)
+
+
+@dataclass
+class Welford:
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """Merge a whole batch (Chan et al. parallel update)"""
+        if values.size == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        n = self.n + values.size
+        delta = batch_mean - self.mean
+        self.mean += delta * values.size / n
+        self.m2 += batch_m2 + delta * delta * self.n * values.size / n
+        self.n = n
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan")
+
+
+@dataclass
+class FlightAccumulator:
+    """Online version of compute_advanced_metrics(), updated batch by batch.
+
+    Batches must arrive in timestamp order. Inputs follow the analytics loader
+    defaults: missing throttle/current/mah/attitude count as 0, missing
+    voltage/GPS are skipped.
+    """
+    n: int = 0
+    first_ts_us: int | None = None
+    last_ts_us: int | None = None
+    out_of_order: bool = False
+    incomplete: bool = False    # rows of the flight were stored without reaching the accumulator
+
+    # Energy & power
+    power_n: int = 0
+    power_sum: float = 0.0
+    peak_power_w: float | None = None
+    energy_ws: float = 0.0
+    voltage_n: int = 0
+    voltage_sum: float = 0.0
+    min_voltage: float | None = None
+    mah_min: int | None = None
+    mah_max: int | None = None
+
+    # Stability
+    attitude: dict = field(default_factory=lambda: {axis: Welford() for axis in AXES})
+    attitude_max_abs: dict = field(default_factory=lambda: {axis: 0.0 for axis in AXES})
+    freestyle_n: int = 0
+
+    # Throttle
+    last_throttle: float | None = None
+    jerk_sum: float = 0.0
+    throttle_sum: float = 0.0
+    above_80_n: int = 0
+    throttle_hist: list = field(default_factory=lambda: [0] * THROTTLE_BINS)
+
+    # GPS
+    gps_seen: bool = False
+    last_lat: float | None = None
+    last_lon: float | None = None
+    distance_m: float = 0.0
+
+    def update(self, columns: dict[str, np.ndarray]) -> None:
+        """Fold one batch of a flight into the accumulator.
+
+        Args:
+            columns (dict[str, np.ndarray]): ts_us (int64) plus float arrays with NaN for
+                missing values: throttle, voltage, current, mah_drawn, roll, pitch, yaw,
+                latitude, longitude
+        """
+        ts_us = columns["ts_us"]
+        if ts_us.size == 0:
+            return
+        if self.last_ts_us is not None and ts_us[0] < self.last_ts_us:
+            self.out_of_order = True
+
+        throttle = np.nan_to_num(columns["throttle"], nan=0.0)
+        voltage = columns["voltage"]
+        current = np.nan_to_num(columns["current"], nan=0.0)
+
+        # dt to the previous row, the very first row of the flight contributes 0
+        prev_ts = ts_us[0] if self.last_ts_us is None else self.last_ts_us
+        dt = np.diff(ts_us, prepend=prev_ts) / 1e6
+
+        # === Energy & Power ===
+        power = voltage * current
+        has_power = ~np.isnan(power)
+        if has_power.any():
+            valid_power = power[has_power]
+            self.power_n += int(valid_power.size)
+            self.power_sum += float(valid_power.sum())
+            peak = float(valid_power.max())
+            self.peak_power_w = peak if self.peak_power_w is None else max(self.peak_power_w, peak)
+            self.energy_ws += float((valid_power * dt[has_power]).sum())
+
+            has_voltage = ~np.isnan(voltage)
+            self.voltage_n += int(has_voltage.sum())
+            self.voltage_sum += float(voltage[has_voltage].sum())
+            low = float(voltage[has_voltage].min())
+            self.min_voltage = low if self.min_voltage is None else min(self.min_voltage, low)
+
+        mah = np.nan_to_num(columns["mah_drawn"], nan=0.0)
+        self.mah_min = int(mah.min()) if self.mah_min is None else min(self.mah_min, int(mah.min()))
+        self.mah_max = int(mah.max()) if self.mah_max is None else max(self.mah_max, int(mah.max()))
+
+        # === Stability ===
+        abs_attitude = {}
+        for axis in AXES:
+            values = np.nan_to_num(columns[axis], nan=0.0)
+            self.attitude[axis].update(values)
+            abs_attitude[axis] = np.abs(values)
+            self.attitude_max_abs[axis] = max(self.attitude_max_abs[axis], float(abs_attitude[axis].max()))
+        self.freestyle_n += int(((abs_attitude["roll"] > 45) | (abs_attitude["pitch"] > 45)).sum())
+
+        # === Throttle ===
+        prev_throttle = throttle[0] if self.last_throttle is None else self.last_throttle
+        changes = np.abs(np.diff(throttle, prepend=prev_throttle))
+        self.jerk_sum += float(changes.sum())
+        self.throttle_sum += float(throttle.sum())
+        self.above_80_n += int((throttle > 0.8).sum())
+        bins = np.minimum((throttle * THROTTLE_BINS).astype(np.int64), THROTTLE_BINS - 1)
+        hist = np.bincount(bins, minlength=THROTTLE_BINS)
+        self.throttle_hist = (np.asarray(self.throttle_hist, dtype=np.int64) + hist).tolist()
+
+        # === GPS distance (haversine between consecutive rows with a fix) ===
+        lat = columns["latitude"]
+        lon = columns["longitude"]
+        self.gps_seen = self.gps_seen or bool((~np.isnan(lat) & ~np.isnan(lon)).any())
+        prev_lat = np.concatenate(([np.nan if self.last_lat is None else self.last_lat], lat[:-1]))
+        prev_lon = np.concatenate(([np.nan if self.last_lon is None else self.last_lon], lon[:-1]))
+        dlat = np.radians(lat - prev_lat)
+        dlon = np.radians(lon - prev_lon)
+        a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(prev_lat)) * np.cos(np.radians(lat)) * np.sin(dlon / 2) ** 2
+        segment = EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        self.distance_m += float(np.nansum(segment))
+
+        # Carry the last row over to the next batch
+        self.n += int(ts_us.size)
+        if self.first_ts_us is None:
+            self.first_ts_us = int(ts_us[0])
+        self.last_ts_us = int(ts_us[-1])
+        self.last_throttle = float(throttle[-1])
+        self.last_lat = None if np.isnan(lat[-1]) else float(lat[-1])
+        self.last_lon = None if np.isnan(lon[-1]) else float(lon[-1])
+
+    def _throttle_percentile(self, q: float) -> float:
+        """Linear-interpolated percentile (numpy 'linear' method) over the bin sketch"""
+        rank = q / 100 * (self.n - 1)
+        cumulative = np.cumsum(self.throttle_hist)
+        lower = int(np.searchsorted(cumulative, math.floor(rank), side="right"))
+        upper = int(np.searchsorted(cumulative, math.ceil(rank), side="right"))
+        lower_value = (lower + 0.5) / THROTTLE_BINS
+        upper_value = (upper + 0.5) / THROTTLE_BINS
+        return lower_value + (upper_value - lower_value) * (rank - math.floor(rank))
+
+    def finalize(self) -> dict | None:
+        """O(1) metrics in the compute_advanced_metrics() format, None if the state is unusable"""
+        if self.n == 0 or self.out_of_order or self.incomplete:
+            return None
+
+        metrics = {}
+
+        # === Energy & Power ===
+        if self.power_n:
+            metrics["peak_power_w"] = self.peak_power_w
+            metrics["average_power_w"] = self.power_sum / self.power_n
+            metrics["total_wh"] = self.energy_ws / 3600
+            mean_voltage = self.voltage_sum / self.voltage_n
+            metrics["total_mah_from_power"] = metrics["total_wh"] * 1000 / mean_voltage if mean_voltage > 0 else None
+
+        metrics["total_mah"] = int(self.mah_max - self.mah_min)
+        metrics["min_voltage"] = self.min_voltage
+
+        # === Stability ===
+        for axis in AXES:
+            metrics[f"{axis}_std_dev"] = self.attitude[axis].std
+            metrics[f"{axis}_max_rate"] = self.attitude_max_abs[axis]
+
+        # === Throttle Smoothness / Pilot Fingerprint ===
+        metrics["throttle_jerk_score"] = self.jerk_sum / (self.n - 1) if self.n > 1 else float("nan")
+        metrics["average_throttle"] = self.throttle_sum / self.n
+        metrics["throttle_90th_percentile"] = self._throttle_percentile(90)
+        metrics["percent_time_full_throttle"] = self.above_80_n / self.n * 100
+
+        # === Efficiency ===
+        if self.gps_seen:
+            total_distance_km = self.distance_m / 1000
+            if total_distance_km > 0.01 and metrics.get("total_wh"):
+                metrics["wh_per_km"] = round(metrics["total_wh"] / total_distance_km, 3)
+                metrics["total_distance_km"] = round(total_distance_km, 3)
+
+        metrics["freestyle_score"] = round(self.freestyle_n / self.n * 100, 1)
+        metrics["flight_duration_s"] = int((self.last_ts_us - self.first_ts_us) / 1e6)
+
+        return metrics
+
+    def dumps(self) -> bytes:
+        state = asdict(self)
+        state["attitude"] = {axis: asdict(w) for axis, w in self.attitude.items()}
+        return orjson.dumps(state)
+
+    @classmethod
+    def loads(cls, raw: bytes | str) -> "FlightAccumulator":
+        state = orjson.loads(raw)
+        state["attitude"] = {axis: Welford(**w) for axis, w in state["attitude"].items()}
+        return cls(**state)
+
+
+def compare_metrics(streamed: dict, batch: dict) -> list[str]:
+    """List the metrics that disagree beyond the documented tolerance"""
+    mismatches = []
+    for key in sorted(set(streamed) | set(batch)):
+        a, b = streamed.get(key), batch.get(key)
+        if a is None or b is None:
+            if a is not b and not (a is None and b is None):
+                mismatches.append(f"{key}: {a!r} != {b!r}")
+            continue
+        if math.isnan(a) and math.isnan(b):
+            continue
+        tolerance = max(ABSOLUTE_TOLERANCE.get(key, 0.0), RELATIVE_TOLERANCE * max(abs(a), abs(b)))
+        if abs(a - b) > tolerance + 1e-12:
+            mismatches.append(f"{key}: {a!r} != {b!r}")
+    return mismatches
+
+
+def rows_to_columns(rows: list[tuple], fields: tuple[str, ...]) -> dict[str, np.ndarray]:
+    """Accumulator input columns from ingest row tuples (ordered like `fields`)"""
+    index = {name: i for i, name in enumerate(fields)}
+    columns = {"ts_us": ts_to_us(r[index["ts"]] for r in rows)}
+    for name in ("throttle", "voltage", "current", "mah_drawn", *AXES, "latitude", "longitude"):
+        i = index[name]
+        columns[name] = np.array([r[i] for r in rows], dtype=np.float64)
+    return columns
+
+
+async def update_flight_accumulators(
+    redis_client,
+    rows: list[tuple],
+    flight_ids: list[uuid.UUID | None],
+    fields: tuple[str, ...],
+    pipe,
+) -> None:
+    """Fold a ts-sorted batch into the accumulator of every flight it touches.
+
+    The accumulators are read with one MGET, the new ones queued on `pipe`.
+    """
+    # Rows of one flight are contiguous in a sorted batch
+    runs = []
+    start = 0
+    for i in range(1, len(rows) + 1):
+        if i == len(rows) or flight_ids[i] != flight_ids[start]:
+            if flight_ids[start] is not None:
+                runs.append((flight_ids[start], start, i))
+            start = i
+    if not runs:
+        return
+
+    columns = rows_to_columns(rows, fields)
+    keys = [accumulator_key(flight_id) for flight_id, _, _ in runs]
+    states = await redis_client.mget(keys)
+
+    for key, raw, (_, lo, hi) in zip(keys, states, runs):
+        accumulator = FlightAccumulator.loads(raw) if raw else FlightAccumulator()
+        accumulator.update({name: values[lo:hi] for name, values in columns.items()})
+        pipe.set(key, accumulator.dumps(), ex=ACCUMULATOR_TTL_SECONDS)
+
+
+def mark_incomplete(pipe, flight_ids) -> None:
+    """Queue unusable accumulators for flights whose stored rows missed the update.
+
+    Later batches keep folding into them (the flag sticks) and the close falls back to
+    the full reload, instead of finalizing an accumulator that lacks those rows.
+    """
+    state = FlightAccumulator(incomplete=True).dumps()
+    for flight_id in flight_ids:
+        pipe.set(accumulator_key(flight_id), state, ex=ACCUMULATOR_TTL_SECONDS)
+
+
+async def pop_flight_metrics(redis_client, flight_id) -> dict | None:
+    """Finalize and drop the accumulator of a closed flight (None when unavailable)"""
+    key = accumulator_key(flight_id)
+    raw = await redis_client.get(key)
+    if not raw:
+        return None
+    await redis_client.delete(key)
+    return FlightAccumulator.loads(raw).finalize()
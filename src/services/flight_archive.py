@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Columnar archive of closed flights: one zstd Parquet file per flight.
+
+    ARCHIVE_URI/drone_id=<drone>/<flight>.parquet
+
+ARCHIVE_URI is a local directory (the default, memory-mapped on read) or any URI
+pyarrow.fs understands, e.g. an S3-compatible store:
+
+    s3://telemetry-archive/flights?endpoint_override=localhost:9000&scheme=http
+
+The worker archives each flight after its analytics (`flight_archive` job) and stores
+the file URI on Flight.archive_uri; with ARCHIVE_DELETE_RAW the flight's rows then
+leave telemetry_raw. Flights closed before archiving existed can be compacted with:
+
+    python3 -m src.services.flight_archive --pending
+"""
+import asyncio
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from sqlalchemy import BigInteger, Text, cast, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.services.telemetry_storage import PACKET_FIELDS
+
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("ts", pa.timestamp("us", tz="UTC")),
+    ("throttle", pa.float64()),
+    ("voltage", pa.float64()),
+    ("current", pa.float64()),
+    ("mah_drawn", pa.int32()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("altitude", pa.float64()),
+    ("vx", pa.float64()),
+    ("vy", pa.float64()),
+    ("vz", pa.float64()),
+    ("roll", pa.float64()),
+    ("pitch", pa.float64()),
+    ("yaw", pa.float64()),
+    ("rssi", pa.int16()),
+    ("extra", pa.string()),   # JSON text
+])
+assert tuple(ARCHIVE_SCHEMA.names) == PACKET_FIELDS
+
+# Rows fetched from PostgreSQL per round trip, and per Parquet row group
+ARCHIVE_CHUNK_ROWS = 50_000
+
+
+def resolve_uri(uri: str) -> str:
+    """Plain paths are local directories"""
+    return uri if "://" in uri else Path(uri).resolve().as_uri()
+
+
+def flight_archive_uri(drone_id: uuid.UUID, flight_id: uuid.UUID, base_uri: str = settings.ARCHIVE_URI) -> str:
+    base, _, query = resolve_uri(base_uri).partition("?")
+    uri = f"{base.rstrip('/')}/drone_id={drone_id}/{flight_id}.parquet"
+    return f"{uri}?{query}" if query else uri
+
+
+def batch_columns() -> list:
+    """ARCHIVE_SCHEMA columns of telemetry_raw, in order, ready for chunk_to_batch().
+
+    Converting aware datetimes and decoding + re-encoding JSON one row at a time dominates
+    the conversion: PostgreSQL hands out epoch microseconds and the JSON text instead.
+    """
+    return [
+        cast(func.extract("epoch", TelemetryRaw.ts) * 1_000_000, BigInteger),
+        *(getattr(TelemetryRaw, name) for name in PACKET_FIELDS[1:-1]),
+        cast(TelemetryRaw.extra, Text),
+    ]
+
+
+def chunk_to_batch(rows: list[tuple]) -> pa.RecordBatch:
+    """Rows starting with the batch_columns() (trailing columns are ignored)"""
+    columns = list(zip(*rows))
+    arrays = [pa.array(columns[0], type=pa.int64()).view(ARCHIVE_SCHEMA.field("ts").type)]
+    arrays += [pa.array(values, type=field.type) for values, field in zip(columns[1:], list(ARCHIVE_SCHEMA)[1:])]
+    return pa.RecordBatch.from_arrays(arrays, schema=ARCHIVE_SCHEMA)
+
+
+async def write_flight_archive(db: AsyncSession, flight: Flight, uri: str) -> int:
+    """Stream the flight's rows out of PostgreSQL into a Parquet file, one row group per chunk.
+
+    Memory stays at one chunk whatever the flight length. The file is written under
+    a temporary name and moved in place, a reader never sees a partial archive.
+    """
+    query = (
+        select(*batch_columns())
+        .where(TelemetryRaw.flight_id == flight.id, TelemetryRaw.ts >= flight.start_ts)
+        .order_by(TelemetryRaw.ts)
+        .execution_options(yield_per=ARCHIVE_CHUNK_ROWS)
+    )
+    if flight.end_ts is not None:
+        query = query.where(TelemetryRaw.ts <= flight.end_ts)
+
+    fs, path = pafs.FileSystem.from_uri(uri)
+    fs.create_dir(path.rsplit("/", 1)[0], recursive=True)
+    tmp_path = f"{path}.tmp"
+    metadata = {b"flight_id": str(flight.id).encode(), b"drone_id": str(flight.drone_id).encode()}
+
+    rows = 0
+    with pq.ParquetWriter(
+        tmp_path,
+        ARCHIVE_SCHEMA.with_metadata(metadata),
+        filesystem=fs,
+        compression=settings.ARCHIVE_COMPRESSION,
+    ) as writer:
+        result = await db.stream(query)
+        async for chunk in result.partitions():
+            # Encoding + compression release the GIL: keep them off the event loop
+            await asyncio.to_thread(writer.write_batch, chunk_to_batch(chunk), ARCHIVE_CHUNK_ROWS)
+            rows += len(chunk)
+    fs.move(tmp_path, path)
+    return rows
+
+
+async def archive_flight(
+    db: AsyncSession,
+    flight_id: uuid.UUID,
+    base_uri: str = settings.ARCHIVE_URI,
+    delete_raw: bool = settings.ARCHIVE_DELETE_RAW,
+) -> str | None:
+    """Archive a closed flight, record the file on the flight and optionally drop its raw rows.
+
+    Idempotent: an already archived flight is left alone (its raw rows may be gone).
+
+    Returns:
+        str | None: archive URI, None if the flight does not exist or is still open
+    """
+    flight = (await db.execute(select(Flight).where(Flight.id == flight_id))).scalar_one_or_none()
+    if flight is None or flight.end_ts is None:
+        return None
+    if flight.archive_uri:
+        return flight.archive_uri
+
+    uri = flight_archive_uri(flight.drone_id, flight.id, base_uri)
+    rows = await write_flight_archive(db, flight, uri)
+
+    await db.execute(update(Flight).where(Flight.id == flight.id).values(archive_uri=uri, raw_deleted=delete_raw))
+    if delete_raw:
+        await db.execute(
+            delete(TelemetryRaw)
+            .where(TelemetryRaw.flight_id == flight.id)
+            .where(TelemetryRaw.ts >= flight.start_ts, TelemetryRaw.ts <= flight.end_ts)
+        )
+    await db.commit()
+    print(f"[Archive] Flight {flight.id}: {rows} rows → {uri}")
+    return uri
+
+
+def read_flight_archive(uri: str, columns: list[str] | None = None) -> pa.Table:
+    """Read an archive (only `columns`); local files are memory-mapped instead of copied in"""
+    fs, path = pafs.FileSystem.from_uri(uri)
+    if isinstance(fs, pafs.LocalFileSystem):
+        return pq.read_table(path, columns=columns, memory_map=True)
+    return pq.read_table(path, columns=columns, filesystem=fs)
+
+
+def read_archive_columns(uri: str, names: tuple[str, ...]) -> dict[str, np.ndarray]:
+    """Flight columns as NumPy arrays: ts_us (int64 epoch µs) plus float64 columns, NULL → NaN"""
+    fields = [name for name in names if name != "ts_us"]
+    table = read_flight_archive(uri, ["ts", *fields])
+    arrays = {"ts_us": table.column("ts").cast(pa.int64()).to_numpy()}
+    for name in fields:
+        arrays[name] = table.column(name).cast(pa.float64()).to_numpy()
+    return arrays
+
+
+async def pending_flights(db: AsyncSession) -> list[uuid.UUID]:
+    result = await db.execute(
+        select(Flight.id)
+        .where(Flight.end_ts.is_not(None), Flight.archive_uri.is_(None))
+        .order_by(Flight.end_ts)
+    )
+    return list(result.scalars())
+
+
+async def main(flight_ids: list[uuid.UUID], pending: bool) -> None:
+    from src.db.session import AnalyticsSessionLocal
+
+    if pending:
+        async with AnalyticsSessionLocal() as db:
+            flight_ids = [*flight_ids, *await pending_flights(db)]
+    for flight_id in flight_ids:
+        async with AnalyticsSessionLocal() as db:
+            await archive_flight(db, flight_id)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive closed flights to Parquet")
+    parser.add_argument("flight_ids", nargs="*", type=uuid.UUID)
+    parser.add_argument("--pending", action="store_true", help="every closed flight not archived yet")
+    args = parser.parse_args()
+    asyncio.run(main(args.flight_ids, args.pending))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import orjson
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.flight import Flight
+
+
+HIGH_THROTTLE_THRESHOLD = 0.10   # 10%
+IDLE_TIMEOUT_SECONDS = 15        # if throttle ≤ 10% for 15s → flight ends
+UTC = timezone.utc
+
+
+@dataclass
+class BatchSegments:
+    """Flight boundaries found inside one (ts-sorted) telemetry batch.
+
+    Segment 0 is the flight carried over from the previous batch (if any),
+    segments 1..n are the flights started inside this batch, in order.
+    """
+    segment: np.ndarray          # per row segment number, -1 when outside any flight
+    starts: np.ndarray           # row indices where a new flight starts
+    ends: np.ndarray             # row indices where the idle timeout closes a flight
+    ended_segments: np.ndarray   # segment number closed at each index in `ends`
+    active: bool                 # a flight is still open after the last row
+    last_high_ts: float | None   # epoch seconds of the last high-throttle row of the open flight
+
+
+def segment_batch(
+    ts: np.ndarray,
+    throttle: np.ndarray,
+    active: bool = False,
+    last_high_ts: float | None = None,
+    threshold: float = HIGH_THROTTLE_THRESHOLD,
+    idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+) -> BatchSegments:
+    """Find flight start/end boundaries with array operations only.
+
+    A flight starts on the first high-throttle row while no flight is open and
+    ends on the first row whose distance from the last high-throttle row is at
+    least `idle_timeout` seconds. Several flights may start and end in one batch.
+
+    Args:
+        ts (np.ndarray): sorted epoch seconds
+        throttle (np.ndarray): throttle in [0, 1]
+        active (bool): a flight was open before this batch
+        last_high_ts (float | None): last high-throttle epoch seconds of the open flight
+    """
+    high = throttle > threshold
+
+    # Timestamp of the most recent high-throttle row seen so far (carried state included)
+    seed = -np.inf
+    if active:
+        seed = last_high_ts if last_high_ts is not None else ts[0]
+    last_high = np.maximum.accumulate(np.where(high, ts, -np.inf))
+    np.maximum(last_high, seed, out=last_high)
+
+    in_flight = high | (ts - last_high < idle_timeout)
+    was_in_flight = np.empty_like(in_flight)
+    was_in_flight[0] = active
+    was_in_flight[1:] = in_flight[:-1]
+
+    start_mask = high & ~was_in_flight
+    counter = np.cumsum(start_mask)
+    ends = np.flatnonzero(was_in_flight & ~in_flight)
+
+    still_active = bool(in_flight[-1])
+    return BatchSegments(
+        segment=np.where(in_flight, counter, -1),
+        starts=np.flatnonzero(start_mask),
+        ends=ends,
+        ended_segments=counter[ends],
+        active=still_active,
+        last_high_ts=float(last_high[-1]) if still_active else None,
+    )
+
+
+def state_key(drone_id) -> str:
+    return f"drone:{drone_id}:flight_state"
+
+
+def parse_flight_state(raw_state: bytes | str | None) -> dict:
+    """Flight state as read from state_key() (DroneBatch.begin())"""
+    if raw_state:
+        return orjson.loads(raw_state)
+    return {
+        "current_flight_id": None,
+        "last_high_throttle_ts": None,
+        "flight_start_ts": None,
+    }
+
+
+def save_flight_state(pipe, drone_id, state: dict) -> None:
+    """Queue the new state on the pipeline closing the batch"""
+    pipe.set(state_key(drone_id), orjson.dumps(state))
+
+
+async def detect_flights(
+    db: AsyncSession,
+    drone_id: uuid.UUID,
+    rows: list[tuple],
+    state: dict,
+) -> tuple[list[uuid.UUID | None], list[uuid.UUID], dict]:
+    """Segment a ts-sorted batch and create/close the matching Flight rows.
+
+    Runs before the telemetry insert so every row is written with its flight_id.
+    Flight rows are added to the session transaction, the caller commits.
+
+    Returns:
+        tuple: (flight_id per row, closed flight ids, new flight state)
+    """
+    ts = np.fromiter((r[0].timestamp() for r in rows), dtype=np.float64, count=len(rows))
+    throttle = np.fromiter((r[1] or 0.0 for r in rows), dtype=np.float64, count=len(rows))
+
+    current_flight_id = state["current_flight_id"]
+    last_high = state["last_high_throttle_ts"]
+    seg = segment_batch(
+        ts,
+        throttle,
+        active=current_flight_id is not None,
+        last_high_ts=datetime.fromisoformat(last_high).timestamp() if last_high else None,
+    )
+
+    # Segment number → flight id (new flights get client-side ids, no round trip)
+    flight_ids = [uuid.UUID(current_flight_id) if current_flight_id else None]
+    new_flights = []
+    for idx in seg.starts:
+        flight_id = uuid.uuid4()
+        flight_ids.append(flight_id)
+        new_flights.append({"id": flight_id, "drone_id": drone_id, "start_ts": rows[idx][0], "end_ts": None})
+        print(f"[Flight] Started new flight {flight_id} for drone {drone_id}")
+
+    # Late packets joining the open flight: keep its start_ts a lower bound of its rows,
+    # flight queries rely on [start_ts, end_ts] to prune telemetry partitions
+    flight_start = state.get("flight_start_ts")
+    if current_flight_id and flight_start:
+        carried = np.flatnonzero(seg.segment == 0)
+        if carried.size and rows[carried[0]][0] < datetime.fromisoformat(flight_start):
+            flight_start = rows[carried[0]][0].isoformat()
+            await db.execute(
+                update(Flight)
+                .where(Flight.id == flight_ids[0])
+                .values(start_ts=rows[carried[0]][0])
+            )
+
+    closed = []
+    for idx, segment in zip(seg.ends, seg.ended_segments):
+        closed.append(flight_ids[segment])
+        if segment == 0:
+            await db.execute(
+                update(Flight)
+                .where(Flight.id == flight_ids[0])
+                .values(end_ts=rows[idx][0])
+            )
+        else:
+            new_flights[segment - 1]["end_ts"] = rows[idx][0]
+        print(f"[Flight] Flight {flight_ids[segment]} ended")
+
+    if new_flights:
+        await db.execute(insert(Flight), new_flights)
+        flight_start = new_flights[-1]["start_ts"].isoformat()
+
+    new_state = {
+        "current_flight_id": str(flight_ids[-1]) if seg.active else None,
+        "last_high_throttle_ts": (
+            datetime.fromtimestamp(seg.last_high_ts, UTC).isoformat() if seg.active else None
+        ),
+        "flight_start_ts": flight_start if seg.active else None,
+    }
+    return [flight_ids[s] if s >= 0 else None for s in seg.segment.tolist()], closed, new_state
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Streaming export of a whole flight (GET /v1/flights/{id}): NDJSON, CSV or Arrow IPC.
+
+Rows are read in keyset pages on (ts, id) within the flight, each page with a short
+query on its own pooled connection (no cursor or connection is held while the client
+reads), or batch by batch from the flight's Parquet archive. Every page is encoded and
+sent before the next one is read, so server memory stays at one page whatever the
+flight length, and the first bytes (the flight document) go out before any row is read.
+"""
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from sqlalchemy import select, tuple_
+
+from src.core.config import settings
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.db.session import ReadSessionLocal
+from src.services.flight_archive import ARCHIVE_SCHEMA, batch_columns, chunk_to_batch
+from src.services.flight_accumulator import EPOCH
+
+
+def flight_document(flight: Flight) -> dict:
+    """Flight metadata and analytics, the header of every export"""
+    return {
+        "id": str(flight.id),
+        "drone_id": str(flight.drone_id),
+        "start_ts": flight.start_ts.isoformat(),
+        "end_ts": flight.end_ts.isoformat() if flight.end_ts else None,
+        "duration_s": flight.duration_s,
+        "total_mah": flight.total_mah,
+        "max_current": flight.max_current,
+        "min_voltage": flight.min_voltage,
+        "archived": flight.archive_uri is not None,
+        "computed_metrics": flight.computed_metrics or {},
+    }
+
+
+async def database_batches(flight: Flight, page_rows: int) -> AsyncIterator[pa.RecordBatch]:
+    """Keyset pages: WHERE (ts, id) > (last ts, last id) ORDER BY ts, id LIMIT page_rows"""
+    query = (
+        select(*batch_columns(), TelemetryRaw.id)
+        .where(TelemetryRaw.flight_id == flight.id, TelemetryRaw.ts >= flight.start_ts)
+        .order_by(TelemetryRaw.ts, TelemetryRaw.id)
+        .limit(page_rows)
+    )
+    if flight.end_ts is not None:
+        query = query.where(TelemetryRaw.ts <= flight.end_ts)
+
+    page = query
+    while True:
+        async with ReadSessionLocal() as db:
+            rows = (await db.execute(page)).all()
+        if not rows:
+            return
+        yield chunk_to_batch(rows)
+        if len(rows) < page_rows:
+            return
+        last_ts = EPOCH + timedelta(microseconds=rows[-1][0])
+        page = query.where(tuple_(TelemetryRaw.ts, TelemetryRaw.id) > tuple_(last_ts, rows[-1][-1]))
+
+
+async def archive_batches(uri: str, page_rows: int) -> AsyncIterator[pa.RecordBatch]:
+    """Record batches straight from the Parquet archive (memory-mapped when local)"""
+    fs, path = pafs.FileSystem.from_uri(uri)
+    if isinstance(fs, pafs.LocalFileSystem):
+        source = pa.memory_map(path)
+    else:
+        source = fs.open_input_file(path)
+    with source:
+        batches = pq.ParquetFile(source).iter_batches(batch_size=page_rows)
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            yield batch
+
+
+def flight_batches(flight: Flight, page_rows: int = settings.EXPORT_PAGE_ROWS) -> AsyncIterator[pa.RecordBatch]:
+    if flight.archive_uri:
+        return archive_batches(flight.archive_uri, page_rows)
+    return database_batches(flight, page_rows)
+
+
+async def ndjson_chunks(flight: Flight, batches: AsyncIterator[pa.RecordBatch]) -> AsyncIterator[bytes]:
+    """{"type": "flight", ...} first, then one {"type": "telemetry", ...} line per row"""
+    yield orjson.dumps({"type": "flight", **flight_document(flight)}) + b"\n"
+    async for batch in batches:
+        lines = []
+        for row in batch.to_pylist():
+            row["extra"] = orjson.loads(row["extra"]) if row["extra"] else {}
+            lines.append(orjson.dumps({"type": "telemetry", **row}))
+        lines.append(b"")
+        yield b"\n".join(lines)
+
+
+async def csv_chunks(flight: Flight, batches: AsyncIterator[pa.RecordBatch]) -> AsyncIterator[bytes]:
+    """One header line then the rows (extra as a JSON text column); no flight document"""
+    header = True
+    async for batch in batches:
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(batch, sink, pacsv.WriteOptions(include_header=header))
+        header = False
+        yield sink.getvalue().to_pybytes()
+
+
+class _ChunkSink:
+    """File-like object collecting what the IPC writer emits, drained after every batch"""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+async def arrow_chunks(flight: Flight, batches: AsyncIterator[pa.RecordBatch]) -> AsyncIterator[bytes]:
+    """Arrow IPC stream, the flight document as JSON in the schema metadata"""
+    schema = ARCHIVE_SCHEMA.with_metadata({b"flight": orjson.dumps(flight_document(flight))})
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    async for batch in batches:
+        writer.write_batch(pa.RecordBatch.from_arrays(batch.columns, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# format → (media type, file extension, encoder(flight, flight_batches(flight)))
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson", ndjson_chunks),
+    "csv": ("text/csv", "csv", csv_chunks),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows", arrow_chunks),
+}
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import asyncio
+import uuid
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.services.flight_archive import read_archive_columns
+
+
+# Columns the analytics need, NULL → 0.0 like the historical `row.x or 0.0` defaults
+ZERO_DEFAULT_COLUMNS = ("throttle", "current", "mah_drawn", "roll", "pitch", "yaw", "vx", "vy", "vz")
+# Columns where NULL stays missing (NaN)
+NULLABLE_COLUMNS = ("voltage", "latitude", "longitude")
+FLIGHT_COLUMNS = ("ts_us", *ZERO_DEFAULT_COLUMNS, *NULLABLE_COLUMNS)
+
+
+def flight_columns_query(flight_id: uuid.UUID, start_ts=None, end_ts=None):
+    """Projection of only the analytics columns, ts as exact epoch microseconds.
+
+    start_ts/end_ts (the flight's time range) let PostgreSQL skip the telemetry partitions outside it.
+    """
+    ts_us = cast(func.extract("epoch", TelemetryRaw.ts) * 1_000_000, BigInteger)
+    query = (
+        select(
+            ts_us.label("ts_us"),
+            *(getattr(TelemetryRaw, name) for name in (*ZERO_DEFAULT_COLUMNS, *NULLABLE_COLUMNS)),
+        )
+        .where(TelemetryRaw.flight_id == flight_id)
+        .order_by(TelemetryRaw.ts)
+    )
+    if start_ts is not None:
+        query = query.where(TelemetryRaw.ts >= start_ts)
+    if end_ts is not None:
+        query = query.where(TelemetryRaw.ts <= end_ts)
+    return query
+
+
+def apply_zero_defaults(arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    for name in ZERO_DEFAULT_COLUMNS:
+        arrays[name][np.isnan(arrays[name])] = 0.0
+    return arrays
+
+
+def rows_to_arrays(rows) -> dict[str, np.ndarray]:
+    """Transpose raw result tuples into one NumPy array per column"""
+    columns = list(zip(*rows))
+    arrays = {"ts_us": np.array(columns[0], dtype=np.int64)}
+    for name, values in zip(FLIGHT_COLUMNS[1:], columns[1:]):
+        arrays[name] = np.array(values, dtype=np.float64)   # NULL → NaN
+    return apply_zero_defaults(arrays)
+
+
+def archive_to_arrays(uri: str) -> dict[str, np.ndarray] | None:
+    """Same columns from the flight's Parquet archive (memory-mapped when local)"""
+    arrays = read_archive_columns(uri, FLIGHT_COLUMNS)
+    if arrays["ts_us"].size == 0:
+        return None
+    # Arrow hands out read-only views where it can: the defaults need writable arrays
+    return apply_zero_defaults({name: np.array(values) for name, values in arrays.items()})
+
+
+async def load_flight_columns(db: AsyncSession, flight_id: uuid.UUID) -> dict[str, np.ndarray] | None:
+    """Load a flight's telemetry as NumPy columns, without building ORM objects.
+
+    Archived flights are read from their Parquet file, the others from telemetry_raw.
+
+    Returns:
+        dict[str, np.ndarray] | None: FLIGHT_COLUMNS arrays sorted by ts, None if the flight has no rows
+    """
+    flight = (await db.execute(
+        select(Flight.start_ts, Flight.end_ts, Flight.archive_uri).where(Flight.id == flight_id)
+    )).one_or_none()
+    if flight is None:
+        return None
+    if flight.archive_uri:
+        return await asyncio.to_thread(archive_to_arrays, flight.archive_uri)
+
+    result = await db.execute(flight_columns_query(flight_id, flight.start_ts, flight.end_ts))
+    rows = result.tuples().all()
+    if not rows:
+        return None
+    return rows_to_arrays(rows)
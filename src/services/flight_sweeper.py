@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Close flights whose drone went silent.
+
+Detection only ends a flight when a packet arrives IDLE_TIMEOUT_SECONDS after the last
+high-throttle one: a drone that loses its link or powers off mid-air would keep its
+flight open forever. Ingest keeps every open flight in the sorted set
+
+    flights:active      member drone_id, score = server time of the drone's last batch
+
+and each worker runs flight_sweeper(): every FLIGHT_SWEEP_INTERVAL_S it leases the drones
+silent for FLIGHT_SWEEP_IDLE_S (one Lua call, so two workers never get the same drone),
+closes their flight at its last stored packet and queues the `flight_closed` job.
+
+    flights:sweeping    member drone_id, score = lease expiry (FLIGHT_SWEEP_LEASE_S)
+
+A leased drone leaves flights:active for flights:sweeping; the job, the flight state
+reset and the lease release go out in one pipeline once the close is committed. A worker
+dying in between leaves the lease behind: it expires and the next sweep closes the flight
+again (a no-op UPDATE) and queues the job. Analytics therefore start at most
+FLIGHT_SWEEP_IDLE_S + FLIGHT_SWEEP_INTERVAL_S after the last packet, whatever the drone
+does, plus FLIGHT_SWEEP_LEASE_S if a worker dies mid-close.
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+
+from src.core.config import settings
+from src.core.metrics import FLIGHTS_SWEPT
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+from src.db.session import AsyncSessionLocal
+from src.services.drone_lanes import drone_batch
+from src.services.flight_detection import parse_flight_state, save_flight_state
+from src.services.job_queue import JobQueue
+
+
+ACTIVE_FLIGHTS_KEY = "flights:active"
+SWEEPING_KEY = "flights:sweeping"
+
+# Lease up to ARGV[2] drones until ARGV[4]: expired leases (ARGV[3] = now) first, then the
+# flights:active members scored at or below ARGV[1], which move to flights:sweeping
+LEASE_DUE_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[3], 'LIMIT', 0, ARGV[2])
+local leased = {}
+for _, member in ipairs(due) do leased[member] = true end
+local left = tonumber(ARGV[2]) - #due
+if left > 0 then
+    for _, member in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, left)) do
+        redis.call('ZREM', KEYS[1], member)
+        if not leased[member] then table.insert(due, member) end
+    end
+end
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[2], ARGV[4], member)
+end
+return due
+"""
+
+
+def track_active_flight(pipe, drone_id: uuid.UUID, state: dict) -> None:
+    """Queue the drone's flights:active entry on the pipeline closing an ingest batch"""
+    if state["current_flight_id"]:
+        pipe.zadd(ACTIVE_FLIGHTS_KEY, {str(drone_id): time.time()})
+    else:
+        pipe.zrem(ACTIVE_FLIGHTS_KEY, str(drone_id))
+
+
+async def lease_idle_drones(redis_client, idle_s: float, limit: int, lease_s: float = settings.FLIGHT_SWEEP_LEASE_S) -> list[str]:
+    now = time.time()
+    return await redis_client.eval(LEASE_DUE_LUA, 2, ACTIVE_FLIGHTS_KEY, SWEEPING_KEY, now - idle_s, limit, now, now + lease_s)
+
+
+async def close_idle_flight(redis_client, drone_id: uuid.UUID, jobs: JobQueue) -> uuid.UUID | None:
+    """Close the drone's open flight at its last stored packet, queue its analytics and drop the lease.
+
+    Runs in the drone's ingest lane: a batch arriving meanwhile either went first (the
+    drone is back in flights:active, the flight is left open) or waits for the close.
+    Idempotent: a lease that expired after a crash closes the same flight again.
+
+    Returns:
+        uuid.UUID | None: flight closed, None if there was nothing to close
+    """
+    async with drone_batch(redis_client, drone_id) as batch:
+        raw_state, _ = (await batch.begin())[drone_id]
+        state = parse_flight_state(raw_state)
+        # Check if a batch came in after the lease
+        if not state["current_flight_id"] or await redis_client.zscore(ACTIVE_FLIGHTS_KEY, str(drone_id)) is not None:
+            batch.pipe.zrem(SWEEPING_KEY, str(drone_id))
+            return None
+
+        flight_id = uuid.UUID(state["current_flight_id"])
+        async with AsyncSessionLocal() as db:
+            last_ts = await db.scalar(
+                select(func.max(TelemetryRaw.ts))
+                .where(TelemetryRaw.flight_id == flight_id)
+                .where(TelemetryRaw.ts >= datetime.fromisoformat(state["flight_start_ts"]))
+            )
+            end_ts = last_ts or datetime.fromisoformat(state["last_high_throttle_ts"] or state["flight_start_ts"])
+            await db.execute(
+                update(Flight)
+                .where(Flight.id == flight_id, Flight.end_ts.is_(None))
+                .values(end_ts=end_ts)
+            )
+            await db.commit()
+        batch.committed = True
+
+        save_flight_state(batch.pipe, drone_id, parse_flight_state(None))
+        jobs.enqueue_on(batch.pipe, "flight_closed", flight_id=str(flight_id))
+        # Queued last: whatever stops this close early leaves the lease to expire and be swept again
+        batch.pipe.zrem(SWEEPING_KEY, str(drone_id))
+
+    print(f"[Flight] Flight {flight_id} of silent drone {drone_id} closed at {end_ts.isoformat()}")
+    return flight_id
+
+
+async def sweep_idle_flights(
+    redis_client,
+    idle_s: float = settings.FLIGHT_SWEEP_IDLE_S,
+    batch_size: int = settings.FLIGHT_SWEEP_BATCH,
+) -> list[uuid.UUID]:
+    """One sweep: close the flights of every drone silent for `idle_s` and queue their analytics"""
+    jobs = JobQueue(redis_client)
+    closed = []
+    while drone_ids := await lease_idle_drones(redis_client, idle_s, batch_size):
+        results = await asyncio.gather(
+            *(close_idle_flight(redis_client, uuid.UUID(drone_id), jobs) for drone_id in drone_ids),
+            return_exceptions=True,
+        )
+        failed = []
+        for drone_id, result in zip(drone_ids, results):
+            if isinstance(result, BaseException):
+                print(f"[Flight] Closing the idle flight of drone {drone_id} failed: {result!r}")
+                failed.append(drone_id)
+            elif result is not None:
+                closed.append(result)
+        if failed:
+            # Back in the set, retried on the next tick (unless a batch put the drone back meanwhile);
+            # if this fails too, the lease expires and the next sweeps retry anyway
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.zadd(ACTIVE_FLIGHTS_KEY, {drone_id: time.time() - idle_s for drone_id in failed}, nx=True)
+            pipe.zrem(SWEEPING_KEY, *failed)
+            await pipe.execute()
+        if len(drone_ids) < batch_size or failed:
+            break
+
+    FLIGHTS_SWEPT.inc(len(closed))
+    return closed
+
+
+async def flight_sweeper(redis_client, interval_s: float = settings.FLIGHT_SWEEP_INTERVAL_S) -> None:
+    """Sweep forever (worker background task)"""
+    while True:
+        try:
+            await sweep_idle_flights(redis_client)
+        except Exception as e:
+            print(f"[Flight] Idle flight sweep failed: {e!r}")
+        await asyncio.sleep(interval_s)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import asyncio
+import uuid
+from operator import itemgetter
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.metrics import INGEST_BATCH_ROWS, INGEST_ROWS
+from src.core.tracing import stage, tracer
+from src.services.dedup import behind_mark, drop_seen, record_stored
+from src.services.drone_lanes import drone_batch
+from src.services.flight_accumulator import mark_incomplete, update_flight_accumulators
+from src.services.flight_detection import detect_flights, parse_flight_state, save_flight_state
+from src.services.flight_sweeper import track_active_flight
+from src.services.live_keys import LIVE_TTL_SECONDS, live_channel, live_key
+from src.services.rollups import upsert_rollups
+from src.services.telemetry_storage import PACKET_FIELDS, find_stored_many, insert_telemetry_many
+
+
+async def ingest_rows(db: AsyncSession, redis_client, drone_id: uuid.UUID, rows: list[tuple]) -> list[uuid.UUID]:
+    """Shared ingest pipeline: dedup → flight detection → telemetry insert + rollups → streaming analytics → live cache.
+
+    Batches of one drone run one at a time (drone_batch(): in-process lane + Redis lock),
+    so flight detection always starts from the state the previous batch left.
+    Retransmitted packets are dropped first (Redis seen-set, then a PostgreSQL lookup for the
+    rows the seen-set cannot vouch for) so they neither open nor stretch a flight, and count
+    neither in the rollups nor in the running analytics. ON CONFLICT stays as the last guard.
+    Flight detection runs before the insert so each row is written once, already
+    carrying its flight_id. Flight rows, telemetry and rollups share one transaction.
+
+    Redis round trips per batch: lock + flight state + dedup mark, the seen-set bits (only
+    for rows behind the mark), the accumulators, then every write and the unlock at once.
+
+    Args:
+        db (AsyncSession): database session
+        redis_client: Redis client
+        drone_id (uuid.UUID): drone the rows belong to
+        rows (list[tuple]): rows built with packet_rows()
+
+    Returns:
+        list[uuid.UUID]: flights closed by this batch, ready for analytics
+
+    Raises:
+        DroneBusy: another node kept the drone's ingest lock for DETECTION_LOCK_WAIT_S
+    """
+    if not rows:
+        return []
+
+    with tracer.start_as_current_span("ingest_rows", attributes={"drone.id": str(drone_id), "batch.rows": len(rows)}):
+        INGEST_BATCH_ROWS.observe(len(rows))
+        return await _ingest_batches(db, redis_client, {drone_id: rows})
+
+
+async def ingest_gateway_rows(db: AsyncSession, redis_client, batches: dict[uuid.UUID, list[tuple]]) -> list[uuid.UUID]:
+    """ingest_rows() for the drones relayed by one gateway, every round trip shared.
+
+    One Redis round trip takes the locks and reads the state of all the drones, one COPY
+    writes all their rows, then one rollup upsert, one commit, one accumulator MGET and
+    one closing pipeline (dedup marks, flight states, live cache + publish, unlocks).
+    Detection still runs drone by drone, each from its own state.
+
+    Args:
+        db (AsyncSession): database session
+        redis_client: Redis client
+        batches (dict[uuid.UUID, list[tuple]]): drone_id → rows built with packet_rows()
+
+    Returns:
+        list[uuid.UUID]: flights closed by this batch, ready for analytics
+
+    Raises:
+        DroneBusy: another node kept one of the drones' ingest lock for DETECTION_LOCK_WAIT_S
+    """
+    batches = {drone_id: rows for drone_id, rows in batches.items() if rows}
+    if not batches:
+        return []
+
+    n_rows = sum(len(rows) for rows in batches.values())
+    with tracer.start_as_current_span("ingest_gateway_rows", attributes={"batch.drones": len(batches), "batch.rows": n_rows}):
+        INGEST_BATCH_ROWS.observe(n_rows)
+        return await _ingest_batches(db, redis_client, batches)
+
+
+async def _ingest_batches(db: AsyncSession, redis_client, batches: dict[uuid.UUID, list[tuple]]) -> list[uuid.UUID]:
+    # Detection needs packets sorted by timestamp
+    for rows in batches.values():
+        rows.sort(key=itemgetter(0))
+
+    closed = []
+    async with drone_batch(redis_client, *batches) as batch:
+        reads = await batch.begin()
+        with stage("dedup"):
+            deduped = await asyncio.gather(*(
+                drop_seen(redis_client, drone_id, rows, reads[drone_id][1]) for drone_id, rows in batches.items()
+            ))
+            # Rows behind the mark (outside the seen-set window, or Redis lost the keys, or raw
+            # rows archived away): one lookup for all drones, before detection sees them
+            known = await find_stored_many(db, {
+                drone_id: behind_mark(rows, hwm) for drone_id, (rows, _, hwm) in zip(batches, deduped)
+            })
+        drones = []
+        for drone_id, (rows, dropped_redis, hwm) in zip(batches, deduped):
+            fresh = [row for row in rows if row[0] not in known[drone_id]]
+            if fresh:
+                drones.append({"id": drone_id, "rows": fresh, "dropped_redis": dropped_redis, "dropped_known": len(rows) - len(fresh), "hwm": hwm})
+            else:
+                record_stored(batch.pipe, drone_id, [], hwm, dropped_redis, len(rows))
+        if not drones:
+            return closed
+
+        with stage("detect"):
+            for drone in drones:
+                state = parse_flight_state(reads[drone["id"]][0])
+                drone["flight_ids"], drone_closed, drone["state"] = await detect_flights(db, drone["id"], drone["rows"], state)
+                closed.extend(drone_closed)
+
+        with stage("insert"):
+            stored = await insert_telemetry_many(db, [(d["id"], d["rows"], d["flight_ids"]) for d in drones])
+        for drone in drones:
+            drone["stored_ts"] = stored[drone["id"]]
+            dropped_conflict = len(drone["rows"]) - len(drone["stored_ts"])
+            drone["dropped_db"] = drone["dropped_known"] + dropped_conflict
+            if dropped_conflict:
+                # Written since the lookup: only if the drone's lock expired mid-batch
+                stored_ts = set(drone["stored_ts"])
+                kept = [i for i, row in enumerate(drone["rows"]) if row[0] in stored_ts]
+                drone["rows"] = [drone["rows"][i] for i in kept]
+                drone["flight_ids"] = [drone["flight_ids"][i] for i in kept]
+
+        # Drone after drone: flights stay contiguous and ts-sorted, as rollups and accumulators expect
+        rows = [row for drone in drones for row in drone["rows"]]
+        flight_ids = [flight_id for drone in drones for flight_id in drone["flight_ids"]]
+        with stage("rollups"):
+            await upsert_rollups(db, rows, flight_ids, PACKET_FIELDS)
+        with stage("commit"):
+            await db.commit()
+        batch.committed = True
+        INGEST_ROWS.inc(len(rows))
+
+        # Queued first: these go out even if the accumulators or the live cache fail below
+        for drone in drones:
+            save_flight_state(batch.pipe, drone["id"], drone["state"])
+            track_active_flight(batch.pipe, drone["id"], drone["state"])
+            record_stored(batch.pipe, drone["id"], drone["stored_ts"], drone["hwm"], drone["dropped_redis"], drone["dropped_db"])
+        if not rows:
+            return closed
+
+        # Keep the running analytics of every flight touched by this batch up to date
+        with stage("accumulators"):
+            try:
+                await update_flight_accumulators(redis_client, rows, flight_ids, PACKET_FIELDS, batch.pipe)
+            except Exception as e:
+                # The rows are committed and their dedup marks go out: a retry would be dropped as
+                # duplicate, so these accumulators can never catch up. The close reloads the flights
+                touched = {flight_id for flight_id in flight_ids if flight_id is not None}
+                mark_incomplete(batch.pipe, touched)
+                print(f"[Flight] Accumulator update failed, {len(touched)} flights left to the full reload: {e!r}")
+
+        # Update live cache with the latest packet and push it to live subscribers
+        for drone in drones:
+            if not drone["rows"]:
+                continue
+            latest_packet = dict(zip(PACKET_FIELDS, drone["rows"][-1]))
+            latest_packet["drone_id"] = str(drone["id"])
+            payload = orjson.dumps(latest_packet)
+            batch.pipe.set(live_key(drone["id"]), payload, ex=LIVE_TTL_SECONDS)
+            batch.pipe.publish(live_channel(drone["id"]), payload)
+
+    return closed
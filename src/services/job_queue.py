@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import time
+from dataclasses import dataclass
+
+import orjson
+from redis.exceptions import ResponseError
+
+from src.core.config import settings
+from src.core.metrics import JOBS_ENQUEUED
+
+
+JOB_STREAM = "jobs:flights"
+JOB_GROUP = "flight-workers"
+DEAD_LETTER_STREAM = "jobs:flights:dead"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: dict
+    attempts: int = 0
+
+
+class JobQueue:
+    """Durable job queue on a Redis Stream with a consumer group.
+
+    - enqueue: XADD (capped with MAXLEN ~)
+    - read: XREADGROUP for new jobs, XAUTOCLAIM for jobs left pending by a dead consumer
+    - ack: XACK + XDEL once the job is done
+    - retry: failed jobs are re-added with attempts + 1, then dead-lettered after max_deliveries
+
+    Works with any redis.asyncio-compatible client (decode_responses=True), including fakeredis.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        stream: str = JOB_STREAM,
+        group: str = JOB_GROUP,
+        dead_letter_stream: str = DEAD_LETTER_STREAM,
+        max_deliveries: int = settings.JOB_MAX_DELIVERIES,
+        claim_idle_ms: int = settings.JOB_CLAIM_IDLE_MS,
+        maxlen: int = 1_000_000,
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.group = group
+        self.dead_letter_stream = dead_letter_stream
+        self.max_deliveries = max_deliveries
+        self.claim_idle_ms = claim_idle_ms
+        self.maxlen = maxlen
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _fields(self, kind: str, payload: dict, attempts: int = 0) -> dict:
+        return {
+            "kind": kind,
+            "payload": orjson.dumps(payload).decode(),
+            "attempts": attempts,
+            "enqueued_at": time.time(),
+        }
+
+    async def enqueue(self, kind: str, **payload) -> str:
+        JOBS_ENQUEUED.labels(kind).inc()
+        return await self.redis.xadd(self.stream, self._fields(kind, payload), maxlen=self.maxlen, approximate=True)
+
+    def enqueue_on(self, pipe, kind: str, **payload) -> None:
+        """Queue the XADD on the caller's pipeline: the job goes out with the writes it belongs to"""
+        pipe.xadd(self.stream, self._fields(kind, payload), maxlen=self.maxlen, approximate=True)
+        JOBS_ENQUEUED.labels(kind).inc()
+
+    async def enqueue_many(self, kind: str, payloads: list[dict]) -> None:
+        """One round trip for a whole list of jobs of the same kind"""
+        if not payloads:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for payload in payloads:
+            pipe.xadd(self.stream, self._fields(kind, payload), maxlen=self.maxlen, approximate=True)
+        await pipe.execute()
+        JOBS_ENQUEUED.labels(kind).inc(len(payloads))
+
+    def _job(self, message_id: str, fields: dict) -> Job:
+        return Job(
+            id=message_id,
+            kind=fields["kind"],
+            payload=orjson.loads(fields["payload"]),
+            attempts=int(fields.get("attempts", 0)),
+        )
+
+    async def read(self, consumer: str, count: int = 10, block_ms: int = 5000) -> list[Job]:
+        """Next jobs for `consumer`: stale jobs of dead consumers first, then new ones"""
+        jobs = await self._claim_stale(consumer, count)
+        if jobs:
+            return jobs
+
+        response = await self.redis.xreadgroup(self.group, consumer, {self.stream: ">"}, count=count, block=block_ms)
+        return [
+            self._job(message_id, fields)
+            for _, messages in response or []
+            for message_id, fields in messages
+            if fields
+        ]
+
+    async def _claim_stale(self, consumer: str, count: int) -> list[Job]:
+        _, messages, *_ = await self.redis.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=count
+        )
+        jobs = []
+        for message_id, fields in messages:
+            if not fields:    # trimmed/deleted while pending
+                await self.redis.xack(self.stream, self.group, message_id)
+                continue
+            job = self._job(message_id, fields)
+            # A consumer died while holding it: each lost delivery counts as an attempt
+            pending = await self.redis.xpending_range(self.stream, self.group, min=message_id, max=message_id, count=1)
+            job.attempts += max(0, pending[0]["times_delivered"] - 1) if pending else 0
+            if job.attempts >= self.max_deliveries:
+                await self.dead_letter(job, "consumer lost too many times")
+                continue
+            jobs.append(job)
+        return jobs
+
+    async def backlog(self) -> tuple[int, int]:
+        """(jobs waiting for a consumer, jobs delivered and not acked yet).
+
+        Acked jobs are XDELed: whatever is left in the stream and not pending is waiting.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xlen(self.stream)
+        pipe.xpending(self.stream, self.group)
+        length, pending = await pipe.execute()
+        return length - pending["pending"], pending["pending"]
+
+    async def ack(self, job: Job) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xack(self.stream, self.group, job.id)
+        pipe.xdel(self.stream, job.id)
+        await pipe.execute()
+
+    async def retry(self, job: Job, error: str) -> None:
+        """Re-queue a failed job, or dead-letter it once it used all its deliveries"""
+        attempts = job.attempts + 1
+        if attempts >= self.max_deliveries:
+            await self.dead_letter(job, error)
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xadd(self.stream, self._fields(job.kind, job.payload, attempts), maxlen=self.maxlen, approximate=True)
+        pipe.xack(self.stream, self.group, job.id)
+        pipe.xdel(self.stream, job.id)
+        await pipe.execute()
+
+    async def dead_letter(self, job: Job, error: str) -> None:
+        fields = self._fields(job.kind, job.payload, job.attempts)
+        fields["error"] = error[:1000]
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xadd(self.dead_letter_stream, fields, maxlen=self.maxlen, approximate=True)
+        pipe.xack(self.stream, self.group, job.id)
+        pipe.xdel(self.stream, job.id)
+        await pipe.execute()
+        print(f"[Jobs] {job.kind} job {job.id} dead-lettered: {error}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Queue the analytics of closed flights whose `flight_closed` job never made it to the stream.
+
+Ingest enqueues the job after its transaction is committed: a crash or a Redis error in
+between leaves a closed flight nobody analyzes, and a retransmit of the batch does not
+close it again (its rows are duplicates). Each worker runs job_recovery(): every
+JOB_RECOVERY_INTERVAL_S it looks for flights closed more than JOB_RECOVERY_AFTER_S ago
+(past any normal queue delay) and still without metrics, and queues their job again.
+
+    flight:{id}:requeued    SET NX marker: one requeue per flight per JOB_RECOVERY_WINDOW_S,
+                            whichever worker gets there first (a flight whose job keeps
+                            failing ends in the dead-letter stream, not in a loop)
+
+Flights closed before the window are left to `python3 -m src.services.recompute --stale`.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from src.core.config import settings
+from src.core.metrics import FLIGHT_JOBS_RECOVERED
+from src.db.models.flight import Flight
+from src.db.session import AnalyticsSessionLocal
+from src.services.job_queue import JobQueue
+
+
+RECOVERY_BATCH = 500
+
+
+def requeued_key(flight_id) -> str:
+    return f"flight:{flight_id}:requeued"
+
+
+async def requeue_missed_analytics(
+    redis_client,
+    after_s: float = settings.JOB_RECOVERY_AFTER_S,
+    window_s: float = settings.JOB_RECOVERY_WINDOW_S,
+    limit: int = RECOVERY_BATCH,
+) -> list[uuid.UUID]:
+    """Queue `flight_closed` for the closed flights left without analytics (served by ix_flights_unanalyzed)"""
+    now = datetime.now(timezone.utc)
+    async with AnalyticsSessionLocal() as db:
+        flight_ids = (await db.execute(
+            select(Flight.id)
+            .where(Flight.end_ts.is_not(None), Flight.metrics_version.is_(None))
+            .where(Flight.updated_at >= now - timedelta(seconds=window_s))
+            .where(Flight.updated_at < now - timedelta(seconds=after_s))
+            .order_by(Flight.updated_at)
+            .limit(limit)
+        )).scalars().all()
+    if not flight_ids:
+        return []
+
+    pipe = redis_client.pipeline(transaction=False)
+    for flight_id in flight_ids:
+        pipe.set(requeued_key(flight_id), 1, nx=True, ex=int(window_s))
+    missed = [flight_id for flight_id, ok in zip(flight_ids, await pipe.execute()) if ok]
+
+    await JobQueue(redis_client).enqueue_many("flight_closed", [{"flight_id": str(f)} for f in missed])
+    FLIGHT_JOBS_RECOVERED.inc(len(missed))
+    for flight_id in missed:
+        print(f"[Jobs] Flight {flight_id} closed without analytics → flight_closed queued again")
+    return missed
+
+
+async def job_recovery(redis_client, interval_s: float = settings.JOB_RECOVERY_INTERVAL_S) -> None:
+    """Look for missed flight jobs forever (worker background task)"""
+    while True:
+        try:
+            await requeue_missed_analytics(redis_client)
+        except Exception as e:
+            print(f"[Jobs] Missed analytics recovery failed: {e!r}")
+        await asyncio.sleep(interval_s)
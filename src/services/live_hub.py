@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from src.core.config import settings
+from src.core.metrics import LIVE_FRAMES_COALESCED, LIVE_FRAMES_SENT, LIVE_SUBSCRIBERS
+from src.services.live_keys import live_channel, live_key
+
+
+class LiveSubscriber:
+    """One client of the live feed: a single-slot mailbox, newer frames replace older ones.
+
+    A slow client never builds a backlog, it just gets the newest frame when it is ready,
+    and never more than `max_hz` frames per second.
+    """
+
+    def __init__(self, drone_id: uuid.UUID, max_hz: float):
+        self.drone_id = drone_id
+        self.min_interval = 1 / max_hz
+        self.latest: bytes | None = None
+        self._ready = asyncio.Event()
+
+    def offer(self, payload: bytes) -> None:
+        if self.latest is not None:
+            LIVE_FRAMES_COALESCED.inc()
+        self.latest = payload
+        self._ready.set()
+
+    async def frames(self, heartbeat: float | None = None) -> AsyncIterator[bytes | None]:
+        """Yield raw frames as they come (rate limited), or None every `heartbeat` seconds of silence"""
+        last_sent = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+
+            # Wait out the rate limit; frames arriving meanwhile replace `latest`
+            delay = last_sent + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self._ready.clear()
+            payload, self.latest = self.latest, None
+            last_sent = time.monotonic()
+            LIVE_FRAMES_SENT.inc()
+            yield payload
+
+
+class LiveHub:
+    """Fans the live packets published by ingest out to every subscriber of this process.
+
+    One Redis pub/sub connection per process, subscribed only to the drones somebody is
+    watching. The client must not decode responses: payloads stay the bytes ingest
+    published, all the way to the socket.
+    """
+
+    def __init__(self, redis_client, max_hz: float = settings.LIVE_MAX_RATE_HZ):
+        self.redis = redis_client
+        self.max_hz = max_hz
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+        self._subscribers: dict[str, set[LiveSubscriber]] = {}
+        self._idle_channels: set[str] = set()
+        self._subscribed = asyncio.Event()
+
+    async def start(self) -> None:
+        self._pubsub = self.redis.pubsub()
+        self._reader = asyncio.create_task(self._read())
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def latest(self, drone_id: uuid.UUID) -> bytes | None:
+        """Last packet of the drone, straight from the live cache"""
+        return await self.redis.get(live_key(drone_id))
+
+    async def subscribe(self, drone_id: uuid.UUID, max_hz: float | None = None) -> LiveSubscriber:
+        max_hz = min(max_hz or self.max_hz, self.max_hz)
+        subscriber = LiveSubscriber(drone_id, max_hz)
+        channel = live_channel(drone_id)
+
+        subscribers = self._subscribers.setdefault(channel, set())
+        subscribers.add(subscriber)
+        if len(subscribers) == 1:
+            await self._pubsub.subscribe(channel)
+            self._subscribed.set()
+        LIVE_SUBSCRIBERS.inc()
+
+        # Start with the cached packet instead of waiting for the next one
+        cached = await self.latest(drone_id)
+        if cached is not None:
+            subscriber.offer(cached)
+        return subscriber
+
+    def unsubscribe(self, subscriber: LiveSubscriber) -> None:
+        """Synchronous, so it also runs from a cancelled handler; the reader drops idle channels"""
+        channel = live_channel(subscriber.drone_id)
+        subscribers = self._subscribers.get(channel)
+        if not subscribers or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        LIVE_SUBSCRIBERS.dec()
+        if not subscribers:
+            del self._subscribers[channel]
+            self._idle_channels.add(channel)
+
+    async def _read(self) -> None:
+        while True:
+            # The pub/sub connection only exists after the first subscribe
+            await self._subscribed.wait()
+            try:
+                # Unsubscribe from the drones nobody watches anymore (unless somebody came back)
+                idle = [c for c in self._idle_channels if c not in self._subscribers]
+                self._idle_channels.clear()
+                if idle:
+                    await self._pubsub.unsubscribe(*idle)
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # redis-py reconnects and re-subscribes on the next read
+                print(f"[Live] pub/sub read failed: {e!r}")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+
+            channel = message["channel"].decode()
+            for subscriber in self._subscribers.get(channel, ()):
+                subscriber.offer(message["data"])
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""Redis keys of the live feed, shared by ingest (writer) and the live hub (reader).
+
+Kept apart from ingest_service so the `api` role does not import the ingest pipeline.
+"""
+
+
+LIVE_TTL_SECONDS = 60   # expire after 60 seconds of no data
+
+
+def live_key(drone_id) -> str:
+    return f"drone:{drone_id}:live"
+
+
+def live_channel(drone_id) -> str:
+    """Pub/sub channel the latest packet of each batch is published on"""
+    return f"drone:{drone_id}:live:channel"
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Recompute flight analytics: one flight on demand, or a backfill after a metric changes.
+
+POST /v1/flights/{id}/recompute queues a `flight_recompute` job for the workers. The batch
+mode selects closed flights by drone, start date range and/or stale METRICS_VERSION, walks
+them in (start_ts, id) order one chunk at a time and loads + crunches them in a process pool:
+
+    python3 -m src.services.recompute --stale --workers 8
+    python3 -m src.services.recompute --drone DRONE_ID --since 2026-01-01 --until 2026-02-01
+
+Every chunk is written in one transaction, then the last (start_ts, id) done is checkpointed
+to RECOMPUTE_CHECKPOINT_DIR/<name>.json, with the ids of the flights that failed: the same
+command started again retries those first, then resumes after it (--restart starts over).
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import orjson
+from sqlalchemy import func, select, tuple_, update
+
+from src.core.config import settings
+from src.db.models.flight import Flight
+from src.db.session import AnalyticsSessionLocal
+from src.services.analytics_kernel import METRICS_VERSION, compute_flight_metrics
+from src.services.flight_loader import load_flight_columns
+
+
+@dataclass
+class FlightSelection:
+    """Closed flights to recompute; every filter is optional"""
+    drone_id: str | None = None
+    since: str | None = None    # ISO start_ts bounds, [since, until)
+    until: str | None = None
+    stale: bool = False         # only flights computed by an older METRICS_VERSION (or never)
+
+    def where(self, after: tuple[str, str] | None = None) -> list:
+        """Filters of the selection, plus the keyset bound past the `after` (start_ts, id) flight"""
+        clauses = [Flight.end_ts.is_not(None)]
+        if self.drone_id:
+            clauses.append(Flight.drone_id == uuid.UUID(self.drone_id))
+        if self.since:
+            clauses.append(Flight.start_ts >= datetime.fromisoformat(self.since))
+        if self.until:
+            clauses.append(Flight.start_ts < datetime.fromisoformat(self.until))
+        if self.stale:
+            clauses.append(Flight.metrics_version.is_(None) | (Flight.metrics_version < METRICS_VERSION))
+        if after is not None:
+            bound = tuple_(datetime.fromisoformat(after[0]), uuid.UUID(after[1]))
+            clauses.append(tuple_(Flight.start_ts, Flight.id) > bound)
+        return clauses
+
+
+@dataclass
+class Checkpoint:
+    selection: dict
+    after: tuple[str, str] | None = None   # (start_ts, id) of the last flight done
+    done: int = 0
+    failed: int = 0                          # len(failed_ids)
+    failed_ids: list[str] = field(default_factory=list)   # retried first when the run resumes
+    elapsed_s: float = 0.0
+
+    @classmethod
+    def load(cls, path: Path, selection: FlightSelection, restart: bool) -> "Checkpoint":
+        if restart or not path.exists():
+            return cls(selection=asdict(selection))
+        checkpoint = cls(**orjson.loads(path.read_bytes()))
+        if checkpoint.selection != asdict(selection):
+            raise SystemExit(f"{path} belongs to another selection ({checkpoint.selection}), use --restart or --name")
+        return checkpoint
+
+    def save(self, path: Path) -> None:
+        """Write-then-rename: a crash leaves the previous checkpoint, never half of one"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps(asdict(self), option=orjson.OPT_INDENT_2))
+        os.replace(tmp, path)
+
+
+async def count_flights(selection: FlightSelection, after: tuple[str, str] | None = None) -> int:
+    async with AnalyticsSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Flight).where(*selection.where(after)))
+
+
+async def next_chunk(selection: FlightSelection, after: tuple[str, str] | None, size: int) -> list:
+    """Keyset page of (id, start_ts) after the checkpointed flight"""
+    async with AnalyticsSessionLocal() as db:
+        return (await db.execute(
+            select(Flight.id, Flight.start_ts)
+            .where(*selection.where(after))
+            .order_by(Flight.start_ts, Flight.id)
+            .limit(size)
+        )).all()
+
+
+# Event loop of a pool process, kept across flights so its connection pool is reused
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _init_worker() -> None:
+    global _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+
+
+async def _load_and_compute(flight_id: uuid.UUID) -> dict | None:
+    async with AnalyticsSessionLocal() as db:
+        columns = await load_flight_columns(db, flight_id)
+    return compute_flight_metrics(columns) if columns is not None else None
+
+
+def recompute_in_worker(flight_id: uuid.UUID) -> dict | None:
+    """Load + crunch one flight inside a pool process: only the metrics come back to the parent"""
+    return _worker_loop.run_until_complete(_load_and_compute(flight_id))
+
+
+async def recompute_chunk(flight_ids: list[uuid.UUID], pool: ProcessPoolExecutor) -> tuple[int, list[uuid.UUID]]:
+    """Recompute a chunk of flights across the pool, then store their metrics in one transaction.
+
+    Returns:
+        tuple[int, list[uuid.UUID]]: flights updated, flights failed (flights without telemetry are neither)
+    """
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(pool, recompute_in_worker, flight_id) for flight_id in flight_ids),
+        return_exceptions=True,
+    )
+    updates, failed = [], []
+    for flight_id, metrics in zip(flight_ids, results):
+        if isinstance(metrics, BaseException):
+            failed.append(flight_id)
+            print(f"[Recompute] Flight {flight_id} failed: {metrics!r}")
+        elif metrics is not None:
+            updates.append({"id": flight_id, "computed_metrics": metrics, "metrics_version": METRICS_VERSION})
+
+    if updates:
+        async with AnalyticsSessionLocal() as db:
+            # ORM bulk UPDATE by primary key: one executemany for the chunk
+            await db.execute(update(Flight), updates)
+            await db.commit()
+    return len(updates), failed
+
+
+async def retry_failed(checkpoint: Checkpoint, path: Path, pool: ProcessPoolExecutor, chunk_size: int) -> None:
+    """Recompute the flights a previous run could not, before resuming after the checkpoint"""
+    retry, still_failed = checkpoint.failed_ids, []
+    print(f"[Recompute] Retrying {len(retry)} flights that failed before")
+    for i in range(0, len(retry), chunk_size):
+        ids = retry[i:i + chunk_size]
+        _, failed = await recompute_chunk([uuid.UUID(flight_id) for flight_id in ids], pool)
+        still_failed += map(str, failed)
+
+        # Flights failing again stay listed, and so do the ones not retried yet
+        checkpoint.failed_ids = still_failed + retry[i + chunk_size:]
+        checkpoint.failed = len(checkpoint.failed_ids)
+        checkpoint.done += len(ids) - len(failed)
+        checkpoint.save(path)
+
+
+async def run_backfill(
+    selection: FlightSelection,
+    name: str = "backfill",
+    workers: int = settings.RECOMPUTE_WORKERS,
+    chunk_size: int = settings.RECOMPUTE_CHUNK_FLIGHTS,
+    restart: bool = False,
+) -> Checkpoint:
+    path = Path(settings.RECOMPUTE_CHECKPOINT_DIR) / f"{name}.json"
+    checkpoint = Checkpoint.load(path, selection, restart)
+    remaining = await count_flights(selection, checkpoint.after)
+    if checkpoint.after is not None:
+        print(f"[Recompute] Resuming {name} after flight {checkpoint.after[1]} ({checkpoint.done} done)")
+    print(f"[Recompute] {remaining} flights to recompute with {workers} workers (metrics version {METRICS_VERSION})")
+
+    # Decoding the telemetry rows costs more CPU than the metrics: both run in the pool
+    # (spawn: children import the services, never a copy of this process)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+    start = time.perf_counter()
+    elapsed_before = checkpoint.elapsed_s
+    processed = 0
+    try:
+        if checkpoint.failed_ids:
+            await retry_failed(checkpoint, path, pool, chunk_size)
+
+        while chunk := await next_chunk(selection, checkpoint.after, chunk_size):
+            _, failed = await recompute_chunk([row.id for row in chunk], pool)
+
+            checkpoint.after = (chunk[-1].start_ts.isoformat(), str(chunk[-1].id))
+            checkpoint.done += len(chunk) - len(failed)
+            checkpoint.failed_ids += map(str, failed)
+            checkpoint.failed = len(checkpoint.failed_ids)
+            checkpoint.elapsed_s = elapsed_before + time.perf_counter() - start
+            checkpoint.save(path)
+
+            processed += len(chunk)
+            rate = processed / (time.perf_counter() - start)
+            print(f"[Recompute] {processed}/{remaining} flights ({checkpoint.failed} failed), {rate:.1f} flights/s")
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    if checkpoint.failed_ids:
+        print(f"[Recompute] {checkpoint.failed} flights failed, listed in {path}: run the same command again to retry them")
+    print(f"[Recompute] {name}: {processed} flights in {elapsed:.1f} s ({processed / elapsed if elapsed else 0:.1f} flights/s)")
+    return checkpoint
+
+
+def parse_ts(value: str) -> str:
+    """ISO date or datetime, naive values are UTC"""
+    ts = datetime.fromisoformat(value)
+    return (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).isoformat()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drone", dest="drone_id", type=lambda v: str(uuid.UUID(v)))
+    parser.add_argument("--since", type=parse_ts, help="flights starting at or after (UTC)")
+    parser.add_argument("--until", type=parse_ts, help="flights starting before (UTC)")
+    parser.add_argument("--stale", action="store_true", help=f"only flights below metrics version {METRICS_VERSION}")
+    parser.add_argument("--workers", type=int, default=settings.RECOMPUTE_WORKERS)
+    parser.add_argument("--chunk", type=int, default=settings.RECOMPUTE_CHUNK_FLIGHTS, help="flights per transaction + checkpoint")
+    parser.add_argument("--name", default="backfill", help="checkpoint name, one per concurrent backfill")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    selection = FlightSelection(args.drone_id, args.since, args.until, args.stale)
+    asyncio.run(run_backfill(selection, args.name, args.workers, args.chunk, args.restart))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Multi-resolution rollups of flight telemetry (flight_rollups), for time-series charts.
+
+Every ingest batch is folded into the 1 s, 10 s and 1 min buckets of the flights it
+touches, in the same transaction as the raw rows: a bucket spanning two batches is
+merged with LEAST/GREATEST/+ on conflict. A chart then reads a few hundred buckets
+instead of every raw row.
+
+Flights ingested before the rollups existed can be rebuilt from telemetry_raw:
+
+    python3 -m src.services.rollups FLIGHT_ID [FLIGHT_ID ...]
+"""
+import asyncio
+import math
+import uuid
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.db.models.flight import Flight
+from src.db.models.rollup import FlightRollup
+from src.db.models.telemetry import TelemetryRaw
+from src.services.flight_accumulator import EPOCH, rows_to_columns
+
+
+ROLLUP_RESOLUTIONS_S = tuple(sorted(settings.ROLLUP_RESOLUTIONS_S))
+ROLLUP_METRICS = ("throttle", "voltage", "current", "power", "roll", "pitch", "yaw")
+
+_upsert = pg_insert(FlightRollup)
+UPSERT_ROLLUPS = _upsert.on_conflict_do_update(
+    index_elements=[FlightRollup.flight_id, FlightRollup.resolution_s, FlightRollup.bucket],
+    set_={
+        "samples": FlightRollup.samples + _upsert.excluded.samples,
+        **{
+            column: expression
+            for metric in ROLLUP_METRICS
+            for column, expression in (
+                # LEAST/GREATEST skip NULLs: an empty side never wins
+                (f"{metric}_min", func.least(getattr(FlightRollup, f"{metric}_min"), _upsert.excluded[f"{metric}_min"])),
+                (f"{metric}_max", func.greatest(getattr(FlightRollup, f"{metric}_max"), _upsert.excluded[f"{metric}_max"])),
+                (f"{metric}_sum", getattr(FlightRollup, f"{metric}_sum") + _upsert.excluded[f"{metric}_sum"]),
+                (f"{metric}_n", getattr(FlightRollup, f"{metric}_n") + _upsert.excluded[f"{metric}_n"]),
+            )
+        },
+    },
+)
+
+
+def resolution_label(seconds: int) -> str:
+    return f"{seconds // 60}m" if seconds % 60 == 0 else f"{seconds}s"
+
+
+RESOLUTION_LABELS = {resolution_label(s): s for s in ROLLUP_RESOLUTIONS_S}
+
+
+def pick_resolution(duration_s: float, max_points: int) -> int:
+    """Finest rollup level whose bucket count fits the point budget (the coarsest one otherwise)"""
+    for seconds in ROLLUP_RESOLUTIONS_S:
+        if math.ceil(duration_s / seconds) <= max_points:
+            return seconds
+    return ROLLUP_RESOLUTIONS_S[-1]
+
+
+def _nullable(values: np.ndarray) -> list:
+    return [None if math.isnan(v) else v for v in values.tolist()]
+
+
+def compute_rollups(
+    rows: list[tuple],
+    flight_ids: list[uuid.UUID | None],
+    fields: tuple[str, ...],
+) -> list[dict]:
+    """Bucket a ts-sorted batch at every resolution, one record per (flight, resolution, bucket).
+
+    Rows of one flight are contiguous in a sorted batch and their buckets are
+    non-decreasing, so each group is a contiguous slice reduced with ufunc.reduceat.
+    """
+    in_flight = np.array([f is not None for f in flight_ids], dtype=bool)
+    if not in_flight.any():
+        return []
+
+    index = np.flatnonzero(in_flight)
+    flights = [flight_ids[i] for i in index.tolist()]
+    columns = rows_to_columns([rows[i] for i in index.tolist()], fields)
+    columns["power"] = columns["voltage"] * columns["current"]
+
+    # A new group starts whenever the flight changes...
+    new_flight = np.ones(index.size, dtype=bool)
+    new_flight[1:] = [a != b for a, b in zip(flights[1:], flights[:-1])]
+
+    present = {m: ~np.isnan(columns[m]) for m in ROLLUP_METRICS}
+    zeroed = {m: np.where(present[m], columns[m], 0.0) for m in ROLLUP_METRICS}
+
+    records = []
+    for seconds in ROLLUP_RESOLUTIONS_S:
+        # ...or the bucket does
+        bucket = columns["ts_us"] // (seconds * 1_000_000)
+        boundary = new_flight.copy()
+        boundary[1:] |= bucket[1:] != bucket[:-1]
+        starts = np.flatnonzero(boundary)
+
+        group = {
+            "samples": np.diff(np.append(starts, index.size)).tolist(),
+            "bucket": [EPOCH + timedelta(seconds=int(b) * seconds) for b in bucket[starts].tolist()],
+        }
+        for metric in ROLLUP_METRICS:
+            # fmin/fmax ignore NaN unless the whole group is NaN
+            group[f"{metric}_min"] = _nullable(np.fmin.reduceat(columns[metric], starts))
+            group[f"{metric}_max"] = _nullable(np.fmax.reduceat(columns[metric], starts))
+            group[f"{metric}_sum"] = np.add.reduceat(zeroed[metric], starts).tolist()
+            group[f"{metric}_n"] = np.add.reduceat(present[metric].astype(np.int64), starts).tolist()
+
+        for i, start in enumerate(starts.tolist()):
+            record = {name: values[i] for name, values in group.items()}
+            record["flight_id"] = flights[start]
+            record["resolution_s"] = seconds
+            records.append(record)
+    return records
+
+
+async def upsert_rollups(
+    db: AsyncSession,
+    rows: list[tuple],
+    flight_ids: list[uuid.UUID | None],
+    fields: tuple[str, ...],
+) -> int:
+    """Merge a ts-sorted batch into flight_rollups. The caller owns the commit."""
+    records = compute_rollups(rows, flight_ids, fields)
+    if records:
+        await db.execute(UPSERT_ROLLUPS, records)
+    return len(records)
+
+
+async def rebuild_flight_rollups(db: AsyncSession, flight_id: uuid.UUID) -> int:
+    """Recompute every rollup level of a flight from telemetry_raw (in SQL). The caller owns the commit."""
+    flight = (await db.execute(
+        select(Flight.start_ts, Flight.end_ts).where(Flight.id == flight_id)
+    )).first()
+    if flight is None:
+        return 0
+
+    # Archived flights may have no raw rows left: keep their rollups
+    has_rows = (await db.execute(
+        select(TelemetryRaw.id)
+        .where(TelemetryRaw.flight_id == flight_id, TelemetryRaw.ts >= flight.start_ts)
+        .limit(1)
+    )).first()
+    if not has_rows:
+        return 0
+
+    await db.execute(delete(FlightRollup).where(FlightRollup.flight_id == flight_id))
+    aggregates = ", ".join(
+        f"min({m}), max({m}), coalesce(sum({m}), 0), count({m})" for m in ROLLUP_METRICS
+    )
+    columns = ", ".join(f"{m}_min, {m}_max, {m}_sum, {m}_n" for m in ROLLUP_METRICS)
+    end_bound = "AND ts <= :end_ts" if flight.end_ts else ""
+    inserted = 0
+    for seconds in ROLLUP_RESOLUTIONS_S:
+        result = await db.execute(text(
+            f"INSERT INTO {FlightRollup.__tablename__} (flight_id, resolution_s, bucket, samples, {columns}) "
+            f"SELECT flight_id, {seconds}, date_bin(interval '{seconds} seconds', ts, 'epoch'), count(*), {aggregates} "
+            "FROM (SELECT flight_id, ts, throttle, voltage, current, voltage * current AS power, roll, pitch, yaw "
+            f"      FROM telemetry_raw WHERE flight_id = :flight_id AND ts >= :start_ts {end_bound}) AS raw "
+            "GROUP BY flight_id, 3"
+        ), {"flight_id": flight_id, "start_ts": flight.start_ts, "end_ts": flight.end_ts})
+        inserted += result.rowcount
+    return inserted
+
+
+async def load_series(db: AsyncSession, flight_id: uuid.UUID, resolution_s: int) -> dict:
+    """Columnar series of one rollup level: {"ts": [...], "samples": [...], metric: {"min", "max", "mean"}}"""
+    columns = [FlightRollup.bucket, FlightRollup.samples] + [
+        getattr(FlightRollup, f"{metric}_{part}") for metric in ROLLUP_METRICS for part in ("min", "max", "sum", "n")
+    ]
+    result = await db.execute(
+        select(*columns)
+        .where(FlightRollup.flight_id == flight_id, FlightRollup.resolution_s == resolution_s)
+        .order_by(FlightRollup.bucket)
+    )
+    # Row tuples → one list per column
+    values = list(zip(*result.all())) or [()] * len(columns)
+
+    series = {"ts": values[0], "samples": values[1]}
+    for i, metric in enumerate(ROLLUP_METRICS):
+        minimum, maximum, total, count = values[2 + 4 * i: 6 + 4 * i]
+        series[metric] = {
+            "min": minimum,
+            "max": maximum,
+            "mean": [t / n if n else None for t, n in zip(total, count)],
+        }
+    return series
+
+
+async def main(flight_ids: list[uuid.UUID]) -> None:
+    from src.db.session import AnalyticsSessionLocal
+
+    for flight_id in flight_ids:
+        async with AnalyticsSessionLocal() as db:
+            inserted = await rebuild_flight_rollups(db, flight_id)
+            await db.commit()
+        print(f"[Rollups] Flight {flight_id}: {inserted} buckets")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the rollups of flights from telemetry_raw")
+    parser.add_argument("flight_ids", nargs="+", type=uuid.UUID)
+    args = parser.parse_args()
+    asyncio.run(main(args.flight_ids))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import asyncio
+import contextlib
+import time
+import uuid
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from src.core.config import settings
+from src.core.metrics import (
+    WS_BACKPRESSURE_WAITS,
+    WS_BATCH_ROWS,
+    WS_CONNECTIONS,
+    WS_FLUSH_SECONDS,
+)
+from src.db.session import AsyncSessionLocal
+from src.schemas.telemetry import TelemetryBatch, TelemetryIngestRequest
+from src.services.ingest_service import ingest_rows
+from src.services.job_queue import JobQueue
+from src.services.telemetry_storage import packet_rows
+from src.services.wire_format import TELEMETRY_RECORD, decode_records, records_to_rows
+
+
+def decode_text_frame(text: str, max_packets: int) -> list[TelemetryIngestRequest]:
+    """A text frame holds one JSON packet or a JSON array of at most `max_packets` packets.
+
+    The array is counted before any packet is validated: parsing first costs no more than
+    validate_json, and a frame over the limit costs only the orjson.loads.
+    """
+    try:
+        packets = orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from None
+    if isinstance(packets, dict):
+        packets = [packets]
+    elif isinstance(packets, list) and len(packets) > max_packets:
+        raise ValueError(f"Max {max_packets} packets per frame")
+    return TelemetryBatch.validate_python(packets)
+
+
+class TelemetryStream:
+    """Ingest side of one telemetry WebSocket.
+
+    The receive loop only validates frames and appends rows to a buffer; a flush task
+    writes the buffer through ingest_rows() as soon as it holds `batch_size` rows, or
+    `window_ms` after its first row, with a fresh DB session per batch (no connection
+    is held between batches). After every flush the drone gets an ack:
+
+        {"type": "ack", "received": <packets accepted>, "stored": <packets committed>, "pending": <buffered>}
+
+    A frame holds at most `batch_size` packets, like a POST (413 above 500): a larger
+    one gets an error frame and is dropped before it is validated or buffered.
+
+    Backpressure: once `max_pending` rows are buffered the receive loop stops reading
+    the socket until the next flush, so TCP flow control slows the drone down.
+    Packets past the last `stored` count are not durable: on reconnect, resend them.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        drone_id: uuid.UUID,
+        redis_client,
+        jobs: JobQueue,
+        batch_size: int = settings.WS_BATCH_SIZE,
+        window_ms: int = settings.WS_BATCH_WINDOW_MS,
+        max_pending: int = settings.WS_MAX_PENDING_ROWS,
+    ):
+        self.websocket = websocket
+        self.drone_id = drone_id
+        self.redis = redis_client
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.window = window_ms / 1000
+        self.max_pending = max(max_pending, batch_size)
+
+        self.received = 0
+        self.stored = 0
+        self._buffer: list[tuple] = []
+        self._has_rows = asyncio.Event()     # first row of a batch arrived
+        self._full = asyncio.Event()         # batch_size reached
+        self._space = asyncio.Event()        # buffer below max_pending
+        self._space.set()
+        self._closed = False
+        self._failed = False
+
+    async def run(self) -> None:
+        WS_CONNECTIONS.inc()
+        flusher = asyncio.create_task(self._flush_loop())
+        try:
+            await self._receive_loop()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            # Store what was already received, even if the drone is gone
+            self._closed = True
+            self._has_rows.set()
+            self._full.set()
+            await flusher
+            WS_CONNECTIONS.dec()
+
+    async def _receive_loop(self) -> None:
+        while not self._failed:
+            # Check if the buffer is full: stop reading until the flush catches up
+            if not self._space.is_set():
+                WS_BACKPRESSURE_WAITS.inc()
+                await self._space.wait()
+                continue
+
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+
+            try:
+                rows = self._decode(message)
+            except (ValidationError, ValueError) as e:
+                # Like a 400 on the HTTP endpoint: the frame is dropped, the stream goes on
+                await self._send({"type": "error", "detail": str(e)[:500]})
+                continue
+            self._append(rows)
+
+    def _decode(self, message: dict) -> list[tuple]:
+        if message.get("text") is not None:
+            return packet_rows(decode_text_frame(message["text"], self.batch_size))
+        # Binary frames carry fixed-size wire format records (see wire_format.py)
+        payload = message["bytes"]
+        if len(payload) > self.batch_size * TELEMETRY_RECORD.itemsize:
+            raise ValueError(f"Max {self.batch_size} packets per frame")
+        return records_to_rows(decode_records(payload))
+
+    def _append(self, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        self._buffer.extend(rows)
+        self.received += len(rows)
+        self._has_rows.set()
+        if len(self._buffer) >= self.batch_size:
+            self._full.set()
+        if len(self._buffer) >= self.max_pending:
+            self._space.clear()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._has_rows.wait()
+            # Wait for a full batch, at most one window after the first row
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.window)
+            except asyncio.TimeoutError:
+                pass
+
+            if self._buffer:
+                await self._flush()
+            if self._closed and not self._buffer:
+                return
+            if self._failed:
+                return
+
+    async def _flush(self) -> None:
+        rows, self._buffer = self._buffer, []
+        self._has_rows.clear()
+        self._full.clear()
+        self._space.set()
+
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                closed_flights = await ingest_rows(db, self.redis, self.drone_id, rows)
+            await self.jobs.enqueue_many("flight_closed", [{"flight_id": str(f)} for f in closed_flights])
+        except Exception as e:
+            # Nothing past the last ack is stored: close so the drone reconnects and resends
+            print(f"[Telemetry] WebSocket flush failed for drone {self.drone_id}: {e!r}")
+            self._failed = True
+            self._buffer = []
+            if not self._closed:
+                with contextlib.suppress(RuntimeError):
+                    await self.websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            return
+        finally:
+            WS_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+        WS_BATCH_ROWS.observe(len(rows))
+        self.stored += len(rows)
+        await self._send({"type": "ack", "received": self.received, "stored": self.stored, "pending": len(self._buffer)})
+
+    async def _send(self, payload: dict) -> None:
+        if self._closed:
+            return
+        try:
+            await self.websocket.send_text(orjson.dumps(payload).decode())
+        except (WebSocketDisconnect, RuntimeError):
+            self._closed = True
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import uuid
+from datetime import datetime
+from itertools import repeat
+from operator import attrgetter
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.db.models.flight import Flight
+from src.db.models.telemetry import TelemetryRaw
+
+
+# Packet fields, in the order they are carried around as row tuples
+PACKET_FIELDS = (
+    "ts",
+    "throttle",
+    "voltage",
+    "current",
+    "mah_drawn",
+    "latitude",
+    "longitude",
+    "altitude",
+    "vx",
+    "vy",
+    "vz",
+    "roll",
+    "pitch",
+    "yaw",
+    "rssi",
+    "extra",
+)
+
+# telemetry_raw columns written by the COPY path
+TELEMETRY_COLUMNS = ("drone_id", *PACKET_FIELDS, "flight_id")
+
+_packet_getter = attrgetter(*PACKET_FIELDS)
+
+
+def packet_rows(packets) -> list[tuple]:
+    """Flatten validated packets into plain tuples ordered like PACKET_FIELDS"""
+    return [_packet_getter(p) for p in packets]
+
+
+async def supports_copy(db: AsyncSession) -> bool:
+    """COPY is only available when talking to PostgreSQL through asyncpg"""
+    conn = await db.connection()
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+
+
+# Per connection scratch table the COPY lands in: COPY itself cannot skip duplicates.
+# Emptied by the INSERT that reads it; ON COMMIT DELETE ROWS reclaims its pages at commit.
+STAGING_TABLE = "telemetry_staging"
+_columns = ", ".join(TELEMETRY_COLUMNS)
+CREATE_STAGING = text(
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DELETE ROWS AS "
+    f"SELECT {_columns} FROM {TelemetryRaw.__tablename__} WITH NO DATA"
+)
+INSERT_FROM_STAGING = text(
+    f"WITH batch AS (DELETE FROM {STAGING_TABLE} RETURNING *) "
+    f"INSERT INTO {TelemetryRaw.__tablename__} ({_columns}) SELECT {_columns} FROM batch "
+    "ON CONFLICT (drone_id, ts) DO NOTHING RETURNING drone_id, ts"
+)
+
+# Rows of a batch that are already stored: in telemetry_raw, or inside a flight whose raw
+# rows were deleted once archived (flights.raw_deleted, ARCHIVE_DELETE_RAW). Archived flights
+# that kept their rows are covered by the first test: a late packet never received is kept.
+# Probes the (drone_id, ts) unique index and ix_flights_drone_id_start_ts, one lookup per row.
+STORED_ROWS = text(
+    "SELECT b.drone_id, b.ts FROM unnest(CAST(:drone_ids AS uuid[]), CAST(:ts AS timestamptz[])) AS b(drone_id, ts) "
+    f"WHERE EXISTS (SELECT 1 FROM {TelemetryRaw.__tablename__} t WHERE t.drone_id = b.drone_id AND t.ts = b.ts) "
+    f"OR EXISTS (SELECT 1 FROM {Flight.__tablename__} f WHERE f.drone_id = b.drone_id "
+    "AND f.raw_deleted AND f.start_ts <= b.ts AND f.end_ts >= b.ts)"
+)
+
+
+async def find_stored_many(db: AsyncSession, candidates: dict[uuid.UUID, list[datetime]]) -> dict[uuid.UUID, set[datetime]]:
+    """ts of `candidates` (drone_id → ts) already stored, in one round trip.
+
+    Meant to run before flight detection: a retransmit must neither open nor stretch a flight.
+    Batches of a drone are serialized (drone_lanes), so nothing is written in between.
+    """
+    stored = {drone_id: set() for drone_id in candidates}
+    drone_ids = [drone_id for drone_id, ts in candidates.items() for _ in ts]
+    if not drone_ids:
+        return stored
+
+    result = await db.execute(
+        STORED_ROWS,
+        {"drone_ids": drone_ids, "ts": [t for ts in candidates.values() for t in ts]},
+    )
+    for drone_id, ts in result:
+        stored[drone_id].add(ts)
+    return stored
+
+
+# (drone_id, rows built with packet_rows(), flight of each row or None)
+DroneRows = tuple[uuid.UUID, list[tuple], list[uuid.UUID | None] | None]
+
+
+def _stored_by_drone(result, batches: list[DroneRows]) -> dict[uuid.UUID, list[datetime]]:
+    stored = {drone_id: [] for drone_id, _, _ in batches}
+    for drone_id, ts in result:
+        stored[drone_id].append(ts)
+    return stored
+
+
+async def copy_telemetry_many(db: AsyncSession, batches: list[DroneRows]) -> dict[uuid.UUID, list[datetime]]:
+    """Binary COPY into a temporary staging table, then INSERT … ON CONFLICT DO NOTHING (no ORM objects).
+
+    Creating the staging table opens the session transaction, so the COPY joins it.
+    """
+    await db.execute(CREATE_STAGING)
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+
+    # The JSON codec registered by SQLAlchemy expects already serialized text
+    records = [
+        (drone_id, *row[:-1], orjson.dumps(row[-1]).decode(), flight_id)
+        for drone_id, rows, flight_ids in batches
+        for row, flight_id in zip(rows, flight_ids or repeat(None))
+    ]
+
+    await raw.driver_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=records,
+        columns=TELEMETRY_COLUMNS,
+    )
+    return _stored_by_drone(await db.execute(INSERT_FROM_STAGING), batches)
+
+
+async def add_telemetry_many(db: AsyncSession, batches: list[DroneRows]) -> dict[uuid.UUID, list[datetime]]:
+    """Fallback without COPY: one multi-row INSERT … ON CONFLICT DO NOTHING.
+
+    Still PostgreSQL only, like the rest of the schema (UUID/JSONB columns, rollup upserts,
+    find_stored_many): it covers TELEMETRY_COPY off and PostgreSQL drivers other than asyncpg.
+    """
+    result = await db.execute(
+        pg_insert(TelemetryRaw)
+        .on_conflict_do_nothing(index_elements=[TelemetryRaw.drone_id, TelemetryRaw.ts])
+        .returning(TelemetryRaw.drone_id, TelemetryRaw.ts),
+        [
+            {"drone_id": drone_id, "flight_id": flight_id, **dict(zip(PACKET_FIELDS, row))}
+            for drone_id, rows, flight_ids in batches
+            for row, flight_id in zip(rows, flight_ids or repeat(None))
+        ],
+    )
+    return _stored_by_drone(result, batches)
+
+
+async def copy_telemetry(
+    db: AsyncSession,
+    drone_id: uuid.UUID,
+    rows: list[tuple],
+    flight_ids: list[uuid.UUID | None] | None = None,
+) -> list[datetime]:
+    """copy_telemetry_many() of one drone"""
+    return (await copy_telemetry_many(db, [(drone_id, rows, flight_ids)]))[drone_id]
+
+
+async def add_telemetry(
+    db: AsyncSession,
+    drone_id: uuid.UUID,
+    rows: list[tuple],
+    flight_ids: list[uuid.UUID | None] | None = None,
+) -> list[datetime]:
+    """add_telemetry_many() of one drone"""
+    return (await add_telemetry_many(db, [(drone_id, rows, flight_ids)]))[drone_id]
+
+
+async def insert_telemetry_many(db: AsyncSession, batches: list[DroneRows]) -> dict[uuid.UUID, list[datetime]]:
+    """insert_telemetry() of several drones in one statement (gateway relays). The caller owns the commit.
+
+    Returns:
+        dict[uuid.UUID, list[datetime]]: drone_id → ts of its rows written
+    """
+    batches = [batch for batch in batches if batch[1]]
+    if not batches:
+        return {}
+
+    if settings.TELEMETRY_COPY and await supports_copy(db):
+        return await copy_telemetry_many(db, batches)
+    return await add_telemetry_many(db, batches)
+
+
+async def insert_telemetry(
+    db: AsyncSession,
+    drone_id: uuid.UUID,
+    rows: list[tuple],
+    flight_ids: list[uuid.UUID | None] | None = None,
+) -> list[datetime]:
+    """Write a validated batch to telemetry_raw, skipping rows already stored. The caller owns the commit.
+
+    Args:
+        db (AsyncSession): database session
+        drone_id (uuid.UUID): drone the rows belong to
+        rows (list[tuple]): rows built with packet_rows()
+        flight_ids (list[uuid.UUID | None], optional): flight of each row. Defaults to None.
+
+    Returns:
+        list[datetime]: ts of the rows written; a (drone_id, ts) already stored is a retransmit and is skipped
+    """
+    if not rows:
+        return []
+
+    if settings.TELEMETRY_COPY and await supports_copy(db):
+        return await copy_telemetry(db, drone_id, rows, flight_ids)
+    return await add_telemetry(db, drone_id, rows, flight_ids)
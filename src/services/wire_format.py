@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Compact binary telemetry wire format (alternative to JSON ingest).
+
+A batch is a plain concatenation of fixed-size little-endian records (no header,
+no padding), sent with Content-Type `application/x-telemetry-v1` over HTTP or as a
+binary WebSocket frame. Missing values: NaN for floats, the type's minimum for ints.
+
+    offset  field      type
+    0       ts_us      int64    epoch microseconds (UTC)
+    8       throttle   float32  0.0 – 1.0
+    12      voltage    float32
+    16      current    float32
+    20      mah_drawn  int32
+    24      latitude   float64
+    32      longitude  float64
+    40      altitude   float32
+    44      vx         float32
+    48      vy         float32
+    52      vz         float32
+    56      roll       float32
+    60      pitch      float32
+    64      yaw        float32
+    68      rssi       int16
+    (70 bytes)
+
+Sensor values travel as float32 (about 7 significant digits), GPS as float64.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+
+CONTENT_TYPE = "application/x-telemetry-v1"
+
+TELEMETRY_RECORD = np.dtype([
+    ("ts_us", "<i8"),
+    ("throttle", "<f4"),
+    ("voltage", "<f4"),
+    ("current", "<f4"),
+    ("mah_drawn", "<i4"),
+    ("latitude", "<f8"),
+    ("longitude", "<f8"),
+    ("altitude", "<f4"),
+    ("vx", "<f4"),
+    ("vy", "<f4"),
+    ("vz", "<f4"),
+    ("roll", "<f4"),
+    ("pitch", "<f4"),
+    ("yaw", "<f4"),
+    ("rssi", "<i2"),
+])
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Same bounds as TelemetryIngestRequest, plus a sane timestamp range (2000 – 2100)
+MIN_TS_US = 946_684_800_000_000
+MAX_TS_US = 4_102_444_800_000_000
+
+
+class WireFormatError(ValueError):
+    """The payload is not a valid batch of telemetry records"""
+
+
+def decode_records(payload: bytes) -> np.ndarray:
+    """Decode a whole batch in one shot (zero-copy view over the payload) and validate it.
+
+    Raises:
+        WireFormatError: truncated payload, or records failing the range checks
+    """
+    if len(payload) % TELEMETRY_RECORD.itemsize:
+        raise WireFormatError(
+            f"Payload size {len(payload)} is not a multiple of the {TELEMETRY_RECORD.itemsize}-byte record"
+        )
+    records = np.frombuffer(payload, dtype=TELEMETRY_RECORD)
+
+    # Vectorized range checks (NaN fails every comparison, so a NaN throttle is rejected)
+    ts_us = records["ts_us"]
+    throttle = records["throttle"]
+    invalid = (
+        (ts_us < MIN_TS_US) | (ts_us > MAX_TS_US)
+        | ~((throttle >= 0.0) & (throttle <= 1.0))
+    )
+    if invalid.any():
+        bad = np.flatnonzero(invalid)
+        raise WireFormatError(
+            f"{bad.size} invalid records (ts or throttle out of range), first at index {int(bad[0])}"
+        )
+    return records
+
+
+def widen_float32(values: np.ndarray) -> np.ndarray:
+    """float32 → float64 rounded to float32's 7 significant digits (16.8, not 16.799999237060547)"""
+    wide = values.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(wide)))
+        scale = 10.0 ** (6 - np.where(np.isfinite(magnitude), magnitude, 0))
+        return np.where(np.isfinite(magnitude), np.round(wide * scale) / scale, wide)
+
+
+def _nullable(values: np.ndarray, missing: np.ndarray) -> list:
+    """Column as Python values with None where missing"""
+    if not missing.any():
+        return values.tolist()
+    out = values.astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+def records_to_rows(records: np.ndarray) -> list[tuple]:
+    """Rows ordered like PACKET_FIELDS, ready for ingest_rows() / the COPY path"""
+    if records.size == 0:
+        return []
+
+    ts = [EPOCH + timedelta(microseconds=us) for us in records["ts_us"].tolist()]
+    columns = [ts]
+    for name in TELEMETRY_RECORD.names[1:]:
+        values = records[name]
+        if values.dtype.kind == "f":
+            if values.dtype.itemsize == 4:
+                values = widen_float32(values)
+            columns.append(_nullable(values, np.isnan(values)))
+        else:
+            columns.append(_nullable(values, values == np.iinfo(values.dtype).min))
+    extra = [{}] * records.size   # COPY only reads it
+    return list(zip(*columns, extra))
+
+
+def encode_packets(packets: list[dict]) -> bytes:
+    """Client side: pack packets (dicts shaped like TelemetryIngestRequest, ts as datetime) into records"""
+    records = np.zeros(len(packets), dtype=TELEMETRY_RECORD)
+    for name in TELEMETRY_RECORD.names[1:]:
+        kind = TELEMETRY_RECORD[name]
+        missing = np.nan if kind.kind == "f" else np.iinfo(kind).min
+        records[name] = [missing if p.get(name) is None else p[name] for p in packets]
+    records["ts_us"] = [(p["ts"] - EPOCH) // timedelta(microseconds=1) for p in packets]
+    return records.tobytes()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Flight jobs worker: consumes the Redis Stream job queue and runs flight analytics.
+
+Scale out by starting more workers (on any node), the consumer group spreads jobs between them:
+
+    python3 -m src.worker --consumer worker-1 --concurrency 4
+"""
+import argparse
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+from prometheus_client import start_http_server
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.core.metrics import ACTIVE_FLIGHTS, JOBS_BACKLOG, JOB_SECONDS
+from src.core.tracing import setup_tracing, tracer
+from src.db.partitions import maintain_partitions
+from src.db.session import AnalyticsSessionLocal, engine
+from src.services.analytics_executor import AnalyticsExecutor
+from src.services.flight_archive import archive_flight
+from src.services.flight_service import run_flight_analytics
+from src.services.flight_sweeper import ACTIVE_FLIGHTS_KEY, flight_sweeper
+from src.services.job_queue import Job, JobQueue
+from src.services.job_recovery import job_recovery
+
+
+async def handle_flight_closed(job: Job, redis_client, executor: AnalyticsExecutor) -> None:
+    await run_flight_analytics(uuid.UUID(job.payload["flight_id"]), redis_client, executor)
+    # Compact the flight once its analytics are stored (own job: retried on its own)
+    if settings.ARCHIVE_ENABLED:
+        await JobQueue(redis_client).enqueue("flight_archive", flight_id=job.payload["flight_id"])
+
+
+async def handle_flight_archive(job: Job, redis_client, executor: AnalyticsExecutor) -> None:
+    async with AnalyticsSessionLocal() as db:
+        await archive_flight(db, uuid.UUID(job.payload["flight_id"]))
+
+
+async def handle_flight_recompute(job: Job, redis_client, executor: AnalyticsExecutor) -> None:
+    # No accumulator: metrics are recomputed from the stored telemetry
+    await run_flight_analytics(uuid.UUID(job.payload["flight_id"]), executor=executor)
+
+
+JOB_HANDLERS = {
+    "flight_closed": handle_flight_closed,
+    "flight_archive": handle_flight_archive,
+    "flight_recompute": handle_flight_recompute,
+}
+
+
+async def process(job: Job, queue: JobQueue, redis_client, executor: AnalyticsExecutor) -> None:
+    handler = JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        await queue.dead_letter(job, f"unknown job kind {job.kind!r}")
+        return
+
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        with tracer.start_as_current_span(f"job.{job.kind}", attributes={"job.id": job.id, "job.attempts": job.attempts}):
+            await handler(job, redis_client, executor)
+        await queue.ack(job)
+    except Exception as e:
+        outcome = "retry"
+        print(f"[Jobs] {job.kind} job {job.id} failed (attempt {job.attempts + 1}): {e!r}")
+        # Back off before handing the job back to the group
+        await asyncio.sleep(min(2 ** job.attempts, 30))
+        await queue.retry(job, repr(e))
+    finally:
+        JOB_SECONDS.labels(job.kind, outcome).observe(time.perf_counter() - start)
+
+
+async def run_worker(
+    redis_client,
+    consumer: str,
+    concurrency: int = settings.WORKER_CONCURRENCY,
+    executor: AnalyticsExecutor | None = None,
+    stop: asyncio.Event | None = None,
+) -> None:
+    """Consume jobs until `stop` is set. Usable in-process with any Redis-compatible client."""
+    queue = JobQueue(redis_client)
+    await queue.ensure_group()
+    stop = stop or asyncio.Event()
+    running: set[asyncio.Task] = set()
+
+    while not stop.is_set():
+        free = concurrency - len(running)
+        if free <= 0:
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            continue
+
+        for job in await queue.read(consumer, count=free, block_ms=1000):
+            task = asyncio.create_task(process(job, queue, redis_client, executor))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+    if running:
+        await asyncio.wait(running)
+
+
+PARTITION_MAINTENANCE_INTERVAL_S = 3600
+
+
+async def partition_maintenance() -> None:
+    """Keep telemetry_raw partitions ahead of time and apply retention (serialized across workers)"""
+    while True:
+        try:
+            await maintain_partitions(engine)
+        except Exception as e:
+            print(f"[Partitions] Maintenance failed: {e!r}")
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL_S)
+
+
+BACKLOG_REPORT_INTERVAL_S = 10
+
+
+async def report_backlog(redis_client) -> None:
+    """Job stream backlog and open flights as gauges on the worker's /metrics"""
+    queue = JobQueue(redis_client)
+    while True:
+        try:
+            waiting, pending = await queue.backlog()
+            JOBS_BACKLOG.labels("waiting").set(waiting)
+            JOBS_BACKLOG.labels("pending").set(pending)
+            ACTIVE_FLIGHTS.set(await redis_client.zcard(ACTIVE_FLIGHTS_KEY))
+        except Exception as e:
+            print(f"[Jobs] Backlog report failed: {e!r}")
+        await asyncio.sleep(BACKLOG_REPORT_INTERVAL_S)
+
+
+async def main(consumer: str, concurrency: int) -> None:
+    redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    executor = AnalyticsExecutor()
+    executor.start()
+    maintenance = asyncio.create_task(partition_maintenance())
+    sweeper = asyncio.create_task(flight_sweeper(redis_client))
+    recovery = asyncio.create_task(job_recovery(redis_client))
+    backlog = asyncio.create_task(report_backlog(redis_client))
+    print(f"[Worker] {consumer} consuming flight jobs (concurrency {concurrency})")
+    try:
+        await run_worker(redis_client, consumer, concurrency, executor)
+    finally:
+        maintenance.cancel()
+        sweeper.cancel()
+        recovery.cancel()
+        backlog.cancel()
+        await executor.shutdown()
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    start_http_server(settings.WORKER_METRICS_PORT)
+    setup_tracing("telemetry-worker")
+    asyncio.run(main(args.consumer, args.concurrency))